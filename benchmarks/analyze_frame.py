@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Frame Analysis Benchmark - Old full-size analysis vs the downscaled FrameAnalyzer,
+and how much change detection saves on a scene that barely moves
+Run: python3 benchmarks/analyze_frame.py camera_capture_*.jpg
+(uses made-up frames if you don't give it any pictures or videos)
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from camera import FrameAnalyzer
+
+def legacy_analyze_frame(frame):
+    """The original Camera._analyze_frame, kept here to compare against"""
+    height, width = frame.shape[:2]
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    brightness = frame.mean()
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 50, 150)
+    edge_count = cv2.countNonZero(edges)
+
+    if brightness < 50:
+        scene = "dark room"
+    elif brightness < 100:
+        scene = "dimly lit area"
+    elif brightness > 200:
+        scene = "bright area"
+    else:
+        scene = "normally lit room"
+
+    if edge_count > 10000:
+        objects = "multiple objects"
+    elif edge_count > 5000:
+        objects = "some objects"
+    else:
+        objects = "few objects"
+
+    return f"{scene} with {objects}, image size {width}x{height}"
+
+def load_frames(paths, limit):
+    """Read recorded frames from image files and/or videos"""
+    frames = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is not None:
+            frames.append(image)
+            continue
+
+        video = cv2.VideoCapture(path)
+        while len(frames) < limit:
+            ret, frame = video.read()
+            if not ret:
+                break
+            frames.append(frame)
+        video.release()
+    return frames[:limit]
+
+def synthetic_frames(count, width, height):
+    """Made-up frames with shapes and noise, from dark to bright"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        frame = np.full((height, width, 3), 20 + (i * 230 // max(1, count - 1)), dtype=np.uint8)
+        for _ in range(i % 12):
+            x, y = rng.integers(0, width - 40), rng.integers(0, height - 40)
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.rectangle(frame, (int(x), int(y)), (int(x) + 80, int(y) + 60), color, 2)
+        noise = rng.integers(0, 12, frame.shape, dtype=np.uint8)
+        frames.append(cv2.add(frame, noise))
+    return frames
+
+def time_per_frame(analyze, frames, repeats):
+    """Average milliseconds per frame"""
+    for frame in frames[:3]:
+        analyze(frame)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for frame in frames:
+            analyze(frame)
+    return (time.perf_counter() - start) * 1000 / (repeats * len(frames))
+
+def still_scene(frame, count, noise=4):
+    """A robot sitting still: the same view with sensor noise, and something passing by halfway"""
+    rng = np.random.default_rng(1)
+    height, width = frame.shape[:2]
+    frames = []
+    for i in range(count):
+        view = frame.copy()
+        if count // 2 <= i < count // 2 + count // 8:
+            x = int(width * (i - count // 2) / max(1, count // 8))
+            cv2.circle(view, (x, height // 2), height // 10, (240, 240, 240), -1)
+        frames.append(cv2.add(view, rng.integers(0, noise, view.shape, dtype=np.uint8)))
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark camera frame analysis")
+    parser.add_argument('inputs', nargs='*', help="recorded images or videos")
+    parser.add_argument('--frames', type=int, default=60, help="max frames to use")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--width', type=int, default=640, help="synthetic frame width")
+    parser.add_argument('--height', type=int, default=480, help="synthetic frame height")
+    parser.add_argument('--analysis-width', type=int, nargs='+', default=[80, 160, 320])
+    parser.add_argument('--change-threshold', type=float, nargs='+', default=[2.0, 3.0, 5.0])
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    frames = load_frames(args.inputs, args.frames) if args.inputs else []
+    if not frames:
+        print("🎨 No recorded frames given - using synthetic ones")
+        frames = synthetic_frames(args.frames, args.width, args.height)
+
+    height, width = frames[0].shape[:2]
+    print(f"📊 {len(frames)} frames at {width}x{height}, {args.repeats} repeats")
+
+    legacy_ms = time_per_frame(legacy_analyze_frame, frames, args.repeats)
+    legacy_results = [legacy_analyze_frame(frame) for frame in frames]
+    print(f"  legacy full-size      {legacy_ms:7.3f} ms/frame")
+
+    for analysis_width in args.analysis_width:
+        analyzer = FrameAnalyzer(analysis_width, change_threshold=0)
+        describe = lambda frame: analyzer.analyze(frame)[2]
+        fast_ms = time_per_frame(describe, frames, args.repeats)
+        same = sum(describe(frame) == expected for frame, expected in zip(frames, legacy_results))
+        print(f"  FrameAnalyzer @ {analysis_width:<5} {fast_ms:7.3f} ms/frame  "
+              f"{legacy_ms / fast_ms:5.1f}x faster, {same}/{len(frames)} same answers")
+
+    # Change detection only pays off when frames repeat, so use a still scene
+    still = still_scene(frames[len(frames) // 2], args.frames)
+    plain = FrameAnalyzer(args.analysis_width[0], change_threshold=0)
+    expected = [plain.analyze(frame)[2] for frame in still]
+    plain_ms = time_per_frame(lambda frame: plain.analyze(frame), still, args.repeats)
+    print(f"\n📷 Still scene, {len(still)} frames @ {args.analysis_width[0]}")
+    print(f"  every frame analysed  {plain_ms:7.3f} ms/frame")
+    for threshold in args.change_threshold:
+        cached = FrameAnalyzer(args.analysis_width[0], change_threshold=threshold)
+        same = sum(cached.analyze(frame)[2] == answer for frame, answer in zip(still, expected))
+        cached_ms = time_per_frame(lambda frame: cached.analyze(frame), still, args.repeats)
+        stats = cached.stats()
+        print(f"  change threshold {threshold:<4g} {cached_ms:7.3f} ms/frame  "
+              f"{plain_ms / cached_ms:5.1f}x faster, hit ratio {stats['hit_ratio']:.0%}, "
+              f"{stats['partial']} partial, {same}/{len(still)} same answers")
+
+if __name__ == "__main__":
+    main()
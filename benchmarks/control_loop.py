@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Control Loop Benchmark - Does the motor loop keep its rate while vision and the LLM load the CPU?
+Drives Motors on a fake GPIO with and without background load and reports tick jitter,
+missed ticks, how long commands really ran and the biggest duty jump between writes
+Run: python3 benchmarks/control_loop.py --seconds 10 --vision-threads 2 --busy-processes 2
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fakes import install_fake_gpio, percentiles
+from analyze_frame import synthetic_frames
+
+GPIO = install_fake_gpio()
+from camera import FrameAnalyzer
+from motors import JITTER_SECONDS, Motors
+
+def vision_load(stop, frames):
+    """Analyse frames as fast as possible, like the camera does"""
+    analyzer = FrameAnalyzer(change_threshold=0)
+    while not stop.is_set():
+        for frame in frames:
+            analyzer.analyze(frame)
+
+def token_load(stop):
+    """Pure-Python busy work holding the GIL, like decoding a streamed reply"""
+    while not stop.is_set():
+        text = ""
+        for i in range(2000):
+            text += str(i)
+        text.split("1")
+
+def busy_process(stop):
+    """A whole core kept busy, like the LLM running on the same Pi"""
+    while not stop.is_set():
+        sum(i * i for i in range(10000))
+
+def drive(motors, seconds):
+    """Back and forth, with turns - every change of direction has to ramp"""
+    moves = [motors.move_forward, motors.turn_left, motors.move_backward, motors.turn_right]
+    run_errors = []
+    deadline = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < deadline:
+        command = moves[i % len(moves)](seconds=0.3, speed=80)
+        command.wait(2.0)
+        if command.status == 'done':
+            run_errors.append(abs(command.finished_at - command.deadline))
+        i += 1
+    return run_errors
+
+def biggest_step(writes, acceleration):
+    """Largest duty change in one write, and how far over the ramp limit it was"""
+    last = {}
+    worst = over = 0.0
+    for written_at, pin, value in writes:
+        if not (isinstance(value, tuple) and value[0] == 'duty'):
+            continue
+        if pin in last:
+            previous_at, previous = last[pin]
+            step = abs(value[1] - previous)
+            worst = max(worst, step)
+            over = max(over, step - acceleration * (written_at - previous_at))
+        last[pin] = (written_at, value[1])
+    return worst, over
+
+def jitter_since(before, q):
+    """Quantile of the loop jitter recorded since a histogram snapshot"""
+    counts = [after - earlier for after, earlier in zip(JITTER_SECONDS.snapshot()[0], before)]
+    target = q * sum(counts)
+    seen = 0
+    for edge, count in zip(JITTER_SECONDS.buckets + (float('inf'),), counts):
+        seen += count
+        if seen >= target:
+            return edge
+    return float('inf')
+
+def run(label, seconds, vision_threads, token_threads, processes):
+    motors = Motors()
+    stop_threads = threading.Event()
+    stop_processes = multiprocessing.Event()
+    frames = synthetic_frames(20, 640, 480)
+
+    workers = [threading.Thread(target=vision_load, args=(stop_threads, frames), daemon=True)
+               for _ in range(vision_threads)]
+    workers += [threading.Thread(target=token_load, args=(stop_threads,), daemon=True)
+                for _ in range(token_threads)]
+    busy = [multiprocessing.Process(target=busy_process, args=(stop_processes,), daemon=True)
+            for _ in range(processes)]
+    for worker in workers + busy:
+        worker.start()
+
+    before = JITTER_SECONDS.snapshot()[0]
+    GPIO.writes.clear()
+    started = time.monotonic()
+    run_errors = drive(motors, seconds)
+    # Let the last ramp down finish - shutdown() cuts the pins straight to 0
+    while motors.is_moving():
+        time.sleep(motors.period)
+    elapsed = time.monotonic() - started
+
+    stop_threads.set()
+    stop_processes.set()
+    for worker in workers + busy:
+        worker.join(timeout=2)
+
+    stats = motors.scheduler_stats()
+    motors.shutdown()
+    worst_step, over_limit = biggest_step(list(GPIO.writes), motors.acceleration)
+
+    print(f"\n{label}: {vision_threads} vision + {token_threads} token threads, {processes} busy processes")
+    print(f"  ticks            {stats['loop_ticks']} in {elapsed:.1f}s "
+          f"({stats['loop_ticks'] / elapsed:.1f}/s, target {motors.rate})")
+    print(f"  jitter           p50 <{jitter_since(before, 0.5) * 1000:g} ms  "
+          f"p99 <{jitter_since(before, 0.99) * 1000:g} ms  max {stats['loop_max_jitter'] * 1000:.2f} ms")
+    print(f"  missed ticks     {stats['loop_missed_ticks']}")
+    print(f"  tick work        max {stats['loop_max_work'] * 1000:.3f} ms")
+    errors = percentiles(run_errors)
+    if errors:
+        print(f"  command timing   p50 {errors['p50'] * 1000:.2f} ms  p99 {errors['p99'] * 1000:.2f} ms "
+              f"({errors['count']} commands)")
+    print(f"  duty steps       biggest {worst_step:.1f}%  beyond ramp limit {max(over_limit, 0):.2f}%")
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Motor control loop timing under CPU load")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--vision-threads', type=int, default=2)
+    parser.add_argument('--token-threads', type=int, default=1)
+    parser.add_argument('--busy-processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    run("Idle", args.seconds, 0, 0, 0)
+    run("Loaded", args.seconds, args.vision_threads, args.token_threads, args.busy_processes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Object Detection Benchmark - Sustained fps and per-frame lag of the detector fed by a camera
+Plays frames at camera speed through the background grabber and the worker pool;
+--cpus pins everything to a few cores to get closer to a Raspberry Pi
+Run: python3 benchmarks/detection.py models/MobileNetSSD_deploy.caffemodel --config models/MobileNetSSD_deploy.prototxt
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fakes import FrameSource
+from analyze_frame import load_frames, synthetic_frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark object detection on CPU")
+    parser.add_argument('model', help=".caffemodel (ssd) or .onnx (yolo)")
+    parser.add_argument('inputs', nargs='*', help="images or videos to use as the camera")
+    parser.add_argument('--config', help="prototxt for Caffe models")
+    parser.add_argument('--kind', default="ssd", choices=["ssd", "yolo"])
+    parser.add_argument('--input-size', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=1, help="OpenCV threads per worker")
+    parser.add_argument('--max-lag', type=float, default=0.5)
+    parser.add_argument('--fps', type=float, default=30, help="camera frame rate")
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--cpus', type=int, help="only use this many cores (e.g. 4 like a Pi)")
+    args = parser.parse_args()
+
+    if args.cpus:
+        # Workers are started after this, so they inherit it
+        os.sched_setaffinity(0, range(args.cpus))
+
+    from camera import Camera
+    from detection import ObjectDetector
+
+    frames = load_frames(args.inputs, 100) if args.inputs else []
+    if not frames:
+        frames = synthetic_frames(60, 640, 480)
+    camera = Camera(capture=FrameSource(frames, fps=args.fps), save=False, detect=False, stream=False)
+
+    started = time.monotonic()
+    detector = ObjectDetector(args.model, args.config, kind=args.kind, input_size=args.input_size,
+                              workers=args.workers, threads_per_worker=args.threads, max_lag=args.max_lag)
+    print(f"⏱️ Workers up and model loaded in {time.monotonic() - started:.2f}s")
+
+    detector.start(camera)
+    time.sleep(args.seconds)
+    stats = detector.stats()
+    grabber = camera.grabber_stats()
+    detector.shutdown()
+    camera.stop_grabber()
+
+    print(f"\n📊 {args.kind} {args.input_size}px, {args.workers} worker(s) x {args.threads} thread(s)"
+          f"{f', {args.cpus} cores' if args.cpus else ''}, camera {grabber['fps']} fps")
+    print(f"  sustained        {stats['completed'] / args.seconds:.2f} detections/s (smoothed {stats['fps']})")
+    print(f"  inference        p50 {stats['inference_p50'] * 1000:.0f} ms  "
+          f"p90 {stats['inference_p90'] * 1000:.0f} ms")
+    print(f"  camera -> result p50 {stats['latency_p50'] * 1000:.0f} ms  "
+          f"p99 {stats['latency_p99'] * 1000:.0f} ms  max {stats['latency_max'] * 1000:.0f} ms  "
+          f"(deadline {args.max_lag * 1000:.0f} ms, {stats['late_results']} late)")
+    print(f"  frames           {stats['submitted']} detected, {stats['skipped_busy']} skipped (workers busy), "
+          f"{stats['skipped_old']} skipped (too old)")
+
+if __name__ == "__main__":
+    cv2.setNumThreads(1)
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Stand-in hardware for benchmarks - a fake RPi.GPIO, camera, microphone and Ollama
+Everything runs on a plain Linux box, so numbers can be compared run to run
+"""
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import types
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recognizers import stream_chunks, wav_chunks
+from voice import Utterance
+
+class FakeGPIO(types.ModuleType):
+    """RPi.GPIO look-alike that timestamps every pin write
+
+    A short trigger pulse is answered with an echo on every pin that has an edge
+    callback, as if an obstacle were echo_cm away (None: no echo, like a blind sensor)
+    """
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self):
+        super().__init__('RPi.GPIO')
+        self.writes = []
+        self.levels = {}
+        self.callbacks = {}
+        self.echo_cm = 200
+        self._written = threading.Condition()
+
+        gpio = self
+
+        class PWM:
+            def __init__(self, pin, frequency):
+                self.pin = pin
+                self.frequency = frequency
+
+            def start(self, duty):
+                gpio._record(self.pin, ('duty', duty))
+
+            def ChangeDutyCycle(self, duty):
+                gpio._record(self.pin, ('duty', duty))
+
+            def ChangeFrequency(self, frequency):
+                self.frequency = frequency
+
+            def stop(self):
+                gpio._record(self.pin, ('duty', 0))
+
+        self.PWM = PWM
+
+    def _record(self, pin, value):
+        with self._written:
+            self.writes.append((time.monotonic(), pin, value))
+            self.levels[pin] = value
+            self._written.notify_all()
+
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pins, direction, **kwargs):
+        pass
+
+    def output(self, pins, values):
+        # Like the real library: one pin or a list of pins, one value or one per pin
+        pins = pins if isinstance(pins, (list, tuple)) else [pins]
+        values = values if isinstance(values, (list, tuple)) else [values] * len(pins)
+        for pin, value in zip(pins, values):
+            raised_at = self._last_high(pin) if value == self.LOW else None
+            self._record(pin, value)
+            if raised_at is not None and time.monotonic() - raised_at < 0.001:
+                self._answer_ping()
+
+    def _last_high(self, pin):
+        with self._written:
+            if self.levels.get(pin) != self.HIGH:
+                return None
+            return next((t for t, written, _ in reversed(self.writes) if written == pin), None)
+
+    def _answer_ping(self):
+        """Trigger pulse ended - send the echo pulse to the edge callbacks"""
+        distance = self.echo_cm
+        if distance is None or not self.callbacks:
+            return
+
+        def _echo():
+            time.sleep(0.0002)
+            for pin, callback in list(self.callbacks.items()):
+                callback(pin)
+            time.sleep(distance / (34300 / 2))
+            for pin, callback in list(self.callbacks.items()):
+                callback(pin)
+        threading.Thread(target=_echo, daemon=True).start()
+
+    def input(self, pin):
+        return self.levels.get(pin, self.LOW)
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        if callback is not None:
+            self.callbacks[pin] = callback
+
+    def remove_event_detect(self, pin):
+        self.callbacks.pop(pin, None)
+
+    def cleanup(self, pins=None):
+        pass
+
+    def wait_for_write(self, after, timeout=1.0, pins=None):
+        """Time of the first pin write (to one of pins, if given) at or after a moment
+        (None if nothing was written)"""
+        deadline = time.monotonic() + timeout
+        with self._written:
+            while True:
+                # Writes are appended in time order, so search from the newest back
+                first = None
+                for written_at, pin, _ in reversed(self.writes):
+                    if written_at < after:
+                        break
+                    if pins is None or pin in pins:
+                        first = written_at
+                if first is not None:
+                    return first
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._written.wait(remaining)
+
+def install_fake_gpio():
+    """Make `import RPi.GPIO` give the fake (also patches modules that already imported it)"""
+    gpio = FakeGPIO()
+    package = types.ModuleType('RPi')
+    package.GPIO = gpio
+    sys.modules['RPi'] = package
+    sys.modules['RPi.GPIO'] = gpio
+    for name in ('motor_drivers', 'sensors'):
+        if name in sys.modules:
+            sys.modules[name].GPIO = gpio
+    return gpio
+
+class FrameSource:
+    """cv2.VideoCapture stand-in that plays a list of frames round and round"""
+
+    def __init__(self, frames, fps=None):
+        self.frames = frames
+        self.fps = fps
+        self.position = 0
+        self.opened = True
+        self.next_due = time.monotonic()
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        if not self.opened:
+            return False, None
+        if self.fps:
+            # Pretend to be a camera that delivers at a fixed rate
+            self.next_due += 1.0 / self.fps
+            time.sleep(max(0.0, self.next_due - time.monotonic()))
+        frame = self.frames[self.position % len(self.frames)]
+        self.position += 1
+        if image is not None and image.shape == frame.shape:
+            image[...] = frame
+            return True, image
+        return True, frame.copy()
+
+    def get(self, prop):
+        height, width = self.frames[0].shape[:2]
+        return {cv2.CAP_PROP_FRAME_WIDTH: width, cv2.CAP_PROP_FRAME_HEIGHT: height,
+                cv2.CAP_PROP_FPS: self.fps or 0}.get(prop, 0)
+
+    def set(self, prop, value):
+        return True
+
+    def release(self):
+        self.opened = False
+
+def write_tone_wav(path, seconds=1.0, sample_rate=16000):
+    """A short 16-bit mono beep to stand in for someone talking"""
+    frames = int(seconds * sample_rate)
+    samples = (int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate)) for i in range(frames))
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"".join(struct.pack('<h', sample) for sample in samples))
+    return path
+
+class WavVoice:
+    """Voice stand-in - 'hears' WAV files at real speed instead of the microphone"""
+
+    def __init__(self, utterances, sample_rate=16000, recognizer=None):
+        # utterances: (wav path, what was said) pairs, used in turn
+        self.utterances = list(utterances)
+        self.sample_rate = sample_rate
+        self.recognizer = recognizer
+        self.voice_available = True
+        self.last_latency = None
+        self.position = 0
+        self.spoken = []
+
+    def listen(self, timeout=5, on_partial=None):
+        path, transcript = self.utterances[self.position % len(self.utterances)]
+        self.position += 1
+        chunks = wav_chunks(path, self.sample_rate, realtime=True)
+
+        if self.recognizer is not None and self.recognizer.streaming:
+            text, self.last_latency = stream_chunks(self.recognizer, chunks, on_partial)
+            return text or None
+
+        # No offline recognizer - play the audio through, then "recognise" instantly
+        for _ in chunks:
+            pass
+        self.last_latency = 0.0
+        return transcript
+
+    def speak(self, text, wait=False, on_start=None):
+        self.spoken.append(text)
+        utterance = Utterance(text, on_start)
+        if on_start:
+            on_start()
+        utterance.started.set()
+        utterance.done.set()
+        return utterance
+
+    def interrupt(self):
+        pass
+
+    def is_speaking(self):
+        return False
+
+    def wait_until_done(self, timeout=None):
+        return True
+
+class FakeOllama:
+    """Local HTTP server that answers /api/generate like Ollama, at a set token rate"""
+
+    def __init__(self, tokens_per_second=20.0, prefill_seconds=0.2, load_seconds=0.0, reply=None):
+        self.tokens_per_second = tokens_per_second
+        self.prefill_seconds = prefill_seconds
+        self.load_seconds = load_seconds
+        self.reply = reply
+        self.requests = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def host(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, prompt):
+        """Made-up reply - mentions a move when asked to move"""
+        if self.reply:
+            return self.reply
+        text = prompt.lower()
+        for direction in ('forward', 'backward', 'left', 'right'):
+            if direction in text:
+                return f"Sure! I'll move {direction} now. Here I go."
+        return "Hello! I'm a little robot with a camera and wheels. What would you like me to do?"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                if self.path != '/api/generate':
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"{}")
+                fake.requests += 1
+                fake._generate(self, body)
+
+        return Handler
+
+    def _generate(self, handler, body):
+        prompt = body.get('prompt', "")
+        model = body.get('model', "fake")
+        stream = body.get('stream', True)
+        started = time.monotonic()
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/x-ndjson' if stream else 'application/json')
+        handler.end_headers()
+
+        def _send(message):
+            handler.wfile.write((json.dumps(message) + "\n").encode())
+            handler.wfile.flush()
+
+        def _chunk(text, done=False):
+            return {'model': model, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                    'response': text, 'done': done}
+
+        # An empty prompt only loads the model
+        if not prompt.strip():
+            time.sleep(self.load_seconds)
+            _send(dict(_chunk("", True), done_reason='load'))
+            return
+
+        new_tokens = len(prompt.split())
+        prompt_tokens = new_tokens + len(body.get('context') or [])
+        time.sleep(self.prefill_seconds)
+        prefill_done = time.monotonic()
+
+        words = self.answer(prompt).split(" ")
+        tokens = [word + " " for word in words[:-1]] + [words[-1]]
+        if stream:
+            for token in tokens:
+                time.sleep(1.0 / self.tokens_per_second)
+                _send(_chunk(token))
+        else:
+            time.sleep(len(tokens) / self.tokens_per_second)
+
+        finished = time.monotonic()
+        context = list(body.get('context') or []) + list(range(new_tokens + len(tokens)))
+        final = dict(_chunk("" if stream else "".join(tokens), True),
+                     done_reason='stop', context=context[-4096:],
+                     total_duration=int((finished - started) * 1e9),
+                     load_duration=0,
+                     prompt_eval_count=prompt_tokens,
+                     prompt_eval_duration=int((prefill_done - started) * 1e9),
+                     eval_count=len(tokens),
+                     eval_duration=int((finished - prefill_done) * 1e9))
+        _send(final)
+
+def percentiles(samples, points=(50, 90, 99)):
+    """p50/p90/p99 (plus count and mean) of a list of numbers"""
+    if not samples:
+        return {}
+    values = np.asarray(samples, dtype=float)
+    result = {f"p{point}": float(np.percentile(values, point)) for point in points}
+    result.update(mean=float(values.mean()), count=len(samples))
+    return result
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Conversation Memory Benchmark - Does the prompt stay the same size over a long conversation?
+Talks to the robot for many turns with and without the memory and reports, per block of
+turns, how many prompt tokens the AI had to read and how long that took
+Run: python3 benchmarks/memory.py --turns 200
+(against a real Ollama: python3 benchmarks/memory.py --real --turns 60)
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fakes import FakeOllama, FrameSource, install_fake_gpio, percentiles
+from analyze_frame import synthetic_frames
+
+GPIO = install_fake_gpio()
+from camera import Camera
+from robot import Robot
+
+PROMPTS = [
+    "hi, my name is Sam",
+    "what can you do?",
+    "tell me about your wheels",
+    "what did I say my name was?",
+    "tell me a short story about a cat",
+    "what is your favourite colour?",
+    "how far can you see with your sensor?",
+    "let's play a word game",
+]
+
+def run(robot, turns, block):
+    """Talk for a while - per block: prompt tokens and prefill seconds"""
+    blocks = []
+    tokens, prefill = [], []
+    for i in range(turns):
+        robot.think_stream(PROMPTS[i % len(PROMPTS)])
+        timing = robot.last_timing
+        if timing.get('prefill_tokens') is not None:
+            tokens.append(timing['prefill_tokens'])
+        if timing.get('prefill') is not None:
+            prefill.append(timing['prefill'])
+        if (i + 1) % block == 0:
+            blocks.append((i + 1, percentiles(tokens), percentiles(prefill)))
+            tokens, prefill = [], []
+    if robot.memory:
+        robot.memory.wait_idle()
+    return blocks
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt size over a long conversation")
+    parser.add_argument('--turns', type=int, default=120)
+    parser.add_argument('--block', type=int, default=20, help="turns per line of the report")
+    parser.add_argument('--real', action='store_true', help="use the Ollama in OLLAMA_HOST instead of a fake")
+    args = parser.parse_args()
+
+    server = None
+    if not args.real:
+        server = FakeOllama(tokens_per_second=500, prefill_seconds=0.01).start()
+        os.environ['OLLAMA_HOST'] = server.host
+
+    frames = synthetic_frames(4, 320, 240)
+    robot = Robot(lazy=False, parts={'camera': lambda: Camera(capture=FrameSource(frames), save=False,
+                                                              detect=False, stream=False)})
+    robot.response_cache = None
+    memory = robot.memory
+
+    for label, with_memory in (("Without memory", False), ("With memory", True)):
+        robot.context = None
+        robot.memory = memory if with_memory else None
+        if memory:
+            memory.clear()
+        started = time.monotonic()
+        blocks = run(robot, args.turns, args.block)
+        elapsed = time.monotonic() - started
+
+        print(f"\n🧠 {label}: {args.turns} turns in {elapsed:.1f}s")
+        for turn, tokens, prefill in blocks:
+            print(f"  turns {turn - args.block + 1:>4}-{turn:<4} prompt tokens p50 {tokens.get('p50', 0):6.0f}  "
+                  f"p99 {tokens.get('p99', 0):6.0f}   prefill p50 {prefill.get('p50', 0) * 1000:6.0f} ms")
+        if with_memory and memory:
+            stats = memory.stats()
+            print(f"  memory           {stats['tokens']} tokens (budget {stats['budget_tokens']}), "
+                  f"{stats['turns']} turns word for word, {stats['folded_turns']} summarised "
+                  f"in {stats['summaries']} summaries ({stats['summary_seconds']:.1f}s in the background), "
+                  f"{stats['forgotten_turns']} forgotten")
+
+    robot.motors.shutdown()
+    if server:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
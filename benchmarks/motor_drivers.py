@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Motor Driver Benchmark - CPU cost and command-to-pin latency of each motor backend
+CPU is measured for this process plus pigpiod (it does the PWM timing for pigpio),
+with the motors stopped and with two channels running at 50%
+Run on the Pi: python3 benchmarks/motor_drivers.py pigpio rpi_gpio
+(on any machine: python3 benchmarks/motor_drivers.py fake --fake-gpio rpi_gpio)
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fakes import install_fake_gpio, percentiles
+
+def daemon_cpu_seconds(name="pigpiod"):
+    """CPU seconds used so far by a daemon like pigpiod (0 if it isn't running)"""
+    ticks = os.sysconf('SC_CLK_TCK')
+    total = 0.0
+    for pid in filter(str.isdigit, os.listdir('/proc')):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(')', 1)
+            if fields[0].endswith(f"({name}"):
+                values = fields[1].split()
+                total += (int(values[11]) + int(values[12])) / ticks
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+def cpu_percent(seconds):
+    """Share of one core used by us and pigpiod while sleeping for a while"""
+    process_before, daemon_before = time.process_time(), daemon_cpu_seconds()
+    started = time.monotonic()
+    time.sleep(seconds)
+    elapsed = time.monotonic() - started
+    used = (time.process_time() - process_before) + (daemon_cpu_seconds() - daemon_before)
+    return 100.0 * used / elapsed
+
+def _us(stats, key):
+    return stats.get(key, 0) * 1e6
+
+def wait_for_write(driver, after, timeout=1.0):
+    """Poll until the driver wrote something at or after a moment"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        written = driver.last_write_at
+        if written is not None and written >= after:
+            return written
+        time.sleep(0.0001)
+    return None
+
+def bench_driver(driver, cpu_seconds, repeats):
+    """apply()/stop() call cost, CPU stopped and running"""
+    result = {}
+    driver.stop()
+    result['cpu_stopped'] = cpu_percent(cpu_seconds)
+    driver.apply({'left_forward': 50, 'right_forward': 50})
+    result['cpu_running'] = cpu_percent(cpu_seconds)
+    driver.stop()
+
+    apply_calls, unchanged_calls, stop_calls = [], [], []
+    for i in range(repeats):
+        duty = 20 + i % 60
+        started = time.perf_counter()
+        driver.apply({'left_forward': duty, 'left_backward': 0, 'right_forward': duty, 'right_backward': 0})
+        apply_calls.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        driver.apply({'left_forward': duty, 'left_backward': 0, 'right_forward': duty, 'right_backward': 0})
+        unchanged_calls.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        driver.stop()
+        stop_calls.append(time.perf_counter() - started)
+    result.update(apply=percentiles(apply_calls), unchanged=percentiles(unchanged_calls),
+                  stop=percentiles(stop_calls))
+    return result
+
+def bench_commands(motors, commands):
+    """move_forward() to the first pin write, through the control loop"""
+    latency = []
+    for i in range(commands):
+        asked = time.monotonic()
+        command = motors.move_forward(seconds=0.05, speed=60)
+        written = wait_for_write(motors.driver, asked)
+        if written is not None:
+            latency.append(written - asked)
+        command.wait(1.0)
+        while motors.is_moving():
+            time.sleep(motors.period)
+    return percentiles(latency)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare motor driver backends")
+    parser.add_argument('backends', nargs='*', default=['fake', 'pigpio', 'lgpio', 'rpi_gpio'])
+    parser.add_argument('--cpu-seconds', type=float, default=3.0)
+    parser.add_argument('--repeats', type=int, default=200)
+    parser.add_argument('--commands', type=int, default=20)
+    parser.add_argument('--fake-gpio', action='store_true', help="run rpi_gpio on a stand-in RPi.GPIO")
+    args = parser.parse_args()
+
+    if args.fake_gpio:
+        install_fake_gpio()
+    from motor_drivers import CHANNELS, make_driver
+    from motors import Motors
+    from config import load_config, setting
+
+    pins = dict(zip(CHANNELS, [setting(load_config(), f'hardware.motor_pins.{channel}', pin)
+                               for channel, pin in zip(CHANNELS, (17, 18, 22, 23))]))
+    for name in args.backends:
+        try:
+            driver = make_driver(name, pins)
+        except Exception as e:
+            print(f"\n⏭️ {name}: {e}")
+            continue
+
+        result = bench_driver(driver, args.cpu_seconds, args.repeats)
+        motors = Motors(driver=driver)
+        result['command'] = bench_commands(motors, args.commands)
+        motors.shutdown()
+        stats = driver.stats()
+        driver.close()
+
+        print(f"\n🔌 {name}{'' if driver.has_pwm else ' (no PWM)'}")
+        print(f"  CPU               {result['cpu_stopped']:.1f}% stopped, {result['cpu_running']:.1f}% running")
+        for key, label in (('apply', "apply (changed)"), ('unchanged', "apply (unchanged)"), ('stop', "stop")):
+            print(f"  {label:<17} p50 {_us(result[key], 'p50'):7.1f} us  p99 {_us(result[key], 'p99'):7.1f} us")
+        print(f"  command -> pin    p50 {_us(result['command'], 'p50'):7.1f} us  "
+              f"p99 {_us(result['command'], 'p99'):7.1f} us")
+        print(f"  writes            {stats['calls']} calls, {stats['channel_writes']} channel writes, "
+              f"{stats['skipped']} skipped as unchanged")
+
+if __name__ == "__main__":
+    main()
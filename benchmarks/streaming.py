@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Live Stream Benchmark - Encoding cost with no viewers, several viewers and a slow one
+Plays frames at camera speed through the grabber into FrameStream and connects
+plain socket "browsers" to /stream.mjpg; a slow viewer reads a little at a time
+Run: python3 benchmarks/streaming.py --viewers 3 --slow 1
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fakes import FrameSource
+from analyze_frame import load_frames, synthetic_frames
+
+def viewer(port, stop, read_delay=0.0, read_size=65536):
+    """Reads the MJPEG stream like a browser (slowly if read_delay is set)"""
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, read_size)
+    sock.sendall(b"GET /stream.mjpg HTTP/1.1\r\nHost: robot\r\n\r\n")
+    try:
+        while not stop.is_set():
+            if not sock.recv(read_size):
+                break
+            if read_delay:
+                time.sleep(read_delay)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+def measure(stream, seconds):
+    """Frames encoded and this process' CPU share over a while"""
+    encoded, cpu = stream.encoded, time.process_time()
+    time.sleep(seconds)
+    return stream.encoded - encoded, 100.0 * (time.process_time() - cpu) / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MJPEG live view")
+    parser.add_argument('inputs', nargs='*', help="images or videos to use as the camera")
+    parser.add_argument('--viewers', type=int, default=3)
+    parser.add_argument('--slow', type=int, default=1, help="how many of the viewers read slowly")
+    parser.add_argument('--fps', type=float, default=30, help="camera frame rate")
+    parser.add_argument('--max-fps', type=float, default=15, help="stream frame rate limit")
+    parser.add_argument('--quality', type=int, default=70)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    from camera import Camera
+    from streaming import FrameStream
+
+    frames = load_frames(args.inputs, 100) if args.inputs else []
+    if not frames:
+        frames = synthetic_frames(60, 640, 480)
+    camera = Camera(capture=FrameSource(frames, fps=args.fps), save=False, detect=False, stream=False)
+    stream = FrameStream(camera, host="127.0.0.1", port=0, quality=args.quality, max_fps=args.max_fps)
+    stream.start()
+
+    encoded, cpu = measure(stream, args.seconds)
+    print(f"\n📺 No viewers: {encoded} frames encoded, CPU {cpu:.1f}%")
+
+    stop = threading.Event()
+    delays = [0.0] * (args.viewers - args.slow) + [0.2] * args.slow
+    threads = [threading.Thread(target=viewer, args=(stream.port, stop, delay, 4096 if delay else 65536),
+                                daemon=True) for delay in delays]
+    for thread in threads:
+        # Slow ones last, so they get the highest viewer numbers
+        thread.start()
+        time.sleep(0.2)
+    time.sleep(1.0)
+    sent_before = {v['viewer']: v['sent'] for v in stream.viewer_stats()}
+    encoded, cpu = measure(stream, args.seconds)
+    viewers = stream.viewer_stats()
+    stats = stream.stats()
+    stop.set()
+
+    sent = sum(v['sent'] - sent_before.get(v['viewer'], 0) for v in viewers)
+    print(f"📺 {len(viewers)} viewers ({args.slow} slow): {encoded} frames encoded, {sent} sent "
+          f"({sent / encoded if encoded else 0:.1f} per encode), CPU {cpu:.1f}%")
+    print(f"  encode           {stats['encode_cpu_ms']:.2f} ms CPU ({stats['encode_ms']:.2f} ms wall), "
+          f"{stats['frame_bytes'] / 1024:.0f} KB per frame")
+    for v in viewers:
+        kind = "slow" if delays[v['viewer'] - 1] else "fast"
+        print(f"  viewer {v['viewer']} ({kind})  {v['fps']:5.1f} fps, {v['sent']} sent, {v['dropped']} dropped")
+
+    for thread in threads:
+        thread.join(timeout=2)
+    stream.stop()
+    camera.stop_grabber()
+
+if __name__ == "__main__":
+    cv2.setNumThreads(1)
+    main()
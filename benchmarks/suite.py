@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+End-to-end Benchmark Suite - startup, turns, conversation loops, frame analysis and motors, no Pi needed
+Uses a fake GPIO, synthetic (or recorded) frames, WAV "speech" and a local fake Ollama
+
+    python3 benchmarks/suite.py                      # run and print
+    python3 benchmarks/suite.py --save pi4           # ...and keep as baseline "pi4"
+    python3 benchmarks/suite.py --compare pi4        # ...and flag regressions against it
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fakes import (FakeOllama, FrameSource, WavVoice, install_fake_gpio, percentiles,
+                   write_tone_wav)
+from analyze_frame import load_frames, synthetic_frames
+
+# Fake GPIO has to be in place before motors.py imports RPi.GPIO
+GPIO = install_fake_gpio()
+from camera import Camera
+from robot import Robot
+from runtime import AsyncRuntime
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+PROMPTS = [
+    "hello there, who are you?",
+    "move forward a little",
+    "what can you do?",
+    "turn left please",
+    "tell me a short joke",
+    "go backward slowly",
+]
+
+# Chat, clear commands and unsure ones - the loops only differ on the unsure ones, which
+# the sequential loop leaves until the reply is done
+LOOP_PROMPTS = [
+    "hello there, who are you?",
+    "move forward a little",
+    "hmm, right then",
+    "tell me a short joke",
+    "maybe left after that",
+    "go backward slowly",
+]
+
+# Metrics where a bigger number is better (everything else is a time)
+HIGHER_IS_BETTER = ('fps',)
+
+def bench_startup(frames, voice, repeats):
+    """Seconds to build a whole Robot with the fake parts"""
+    totals = []
+    robot = None
+    for _ in range(repeats):
+        started = time.monotonic()
+        robot = Robot(lazy=False, parts={
+            'camera': lambda: Camera(capture=FrameSource(frames), save=False, stream=False),
+            'voice': lambda: voice,
+        })
+        totals.append(time.monotonic() - started)
+        robot.motors.shutdown()
+        if robot.sensors:
+            robot.sensors.shutdown()
+    result = {'total': percentiles(totals)}
+    result.update({name: seconds for name, seconds in robot.startup_times.items()})
+    return result
+
+def bench_turns(robot, turns):
+    """Hear a WAV, then stream the reply - latency from end of speech"""
+    listen, first_token, reply = [], [], []
+    for i in range(turns):
+        started = time.monotonic()
+        text = robot.voice.listen()
+        heard = time.monotonic()
+        listen.append(heard - started)
+
+        robot.think_stream(text or PROMPTS[i % len(PROMPTS)])
+        timing = robot.last_timing
+        if timing.get('first_token') is not None:
+            first_token.append(timing['first_token'])
+        reply.append(time.monotonic() - heard)
+
+    return {'listen': percentiles(listen), 'first_token': percentiles(first_token),
+            'reply': percentiles(reply)}
+
+def bench_loops(robot, turns):
+    """The same typed turns through the sequential loop, the overlapped one and the async runtime -
+    seconds from input to the first motor write (action) and to reply and actions both done (turn)"""
+    prompts = [LOOP_PROMPTS[i % len(LOOP_PROMPTS)] for i in range(turns)]
+    # The ultrasonic sensor writes its trigger pin all the time - only the wheels count
+    motor_pins = set(robot.motors.driver.pins.values())
+
+    def _settle():
+        # Every turn starts with the wheels still, so its first write is its own
+        robot.motors.stop()
+        while robot.motors.is_moving():
+            time.sleep(0.01)
+
+    def _action(asked):
+        written = GPIO.wait_for_write(asked, timeout=0.2, pins=motor_pins)
+        return written - asked if written is not None else None
+
+    def _summary(action, turn):
+        return {'action': percentiles([seconds for seconds in action if seconds is not None]),
+                'turn': percentiles(turn)}
+
+    results = {}
+    overlap = robot.overlap_actions
+    for mode in ('sequential', 'overlapped'):
+        robot.overlap_actions = mode == 'overlapped'
+        action, turn = [], []
+        for text in prompts:
+            _settle()
+            asked = time.monotonic()
+            robot._respond(text)
+            turn.append(time.monotonic() - asked)
+            action.append(_action(asked))
+        results[mode] = _summary(action, turn)
+    robot.overlap_actions = overlap
+
+    # The runtime asks for input on its own thread - type the next prompt once the last turn is done
+    runtime = AsyncRuntime(robot, use_voice=False)
+    action, turn = [], []
+    typed = []
+
+    def _type(prompt=""):
+        while len(runtime.finished_turns) < len(typed):
+            time.sleep(0.005)
+        if typed:
+            last = runtime.finished_turns[-1]
+            turn.append(max(last.reply_done, last.actions_done) - last.received_at)
+            action.append(_action(last.received_at))
+        if len(typed) == len(prompts):
+            return "quit"
+        _settle()
+        typed.append(prompts[len(typed)])
+        return typed[-1]
+
+    input_source = robot.input_source
+    robot.input_source = _type
+    try:
+        asyncio.run(runtime.run())
+    finally:
+        robot.input_source = input_source
+    results['async'] = _summary(action, turn)
+    return results
+
+def bench_analyze(camera, frames, repeats):
+    """Camera._analyze_frame throughput, and capture() end to end"""
+    for frame in frames[:3]:
+        camera._analyze_frame(frame)
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for frame in frames:
+            camera._analyze_frame(frame)
+    analyze_fps = repeats * len(frames) / (time.perf_counter() - started)
+
+    count = repeats * len(frames)
+    started = time.perf_counter()
+    for _ in range(count):
+        camera.capture()
+    capture_fps = count / (time.perf_counter() - started)
+    return {'analyze_fps': analyze_fps, 'capture_fps': capture_fps}
+
+def bench_motors(motors, commands):
+    """Time from asking for a move (or a stop) to the first GPIO write"""
+    start_latency, stop_latency = [], []
+    pins = set(motors.driver.pins.values())
+    moves = [motors.move_forward, motors.turn_left, motors.move_backward, motors.turn_right]
+    for i in range(commands):
+        asked = time.monotonic()
+        command = moves[i % len(moves)](seconds=0.02, speed=60)
+        written = GPIO.wait_for_write(asked, pins=pins)
+        if written is not None:
+            start_latency.append(written - asked)
+        command.wait(1.0)
+
+        # Stop while moving
+        moves[i % len(moves)](seconds=5, speed=60)
+        time.sleep(0.005)
+        asked = time.monotonic()
+        motors.stop()
+        written = GPIO.wait_for_write(asked, pins=pins)
+        if written is not None:
+            stop_latency.append(written - asked)
+    return {'start': percentiles(start_latency), 'stop': percentiles(stop_latency)}
+
+def flatten(results, prefix=""):
+    """{'a': {'b': 1}} -> {'a.b': 1} for saving and comparing"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not name.endswith('count'):
+            flat[name] = value
+    return flat
+
+def compare(flat, baseline, tolerance, noise_floor=0.001):
+    """Print each metric against the baseline, flagging ones that got worse
+    (times that moved by less than the noise floor never count)"""
+    regressions = 0
+    for name, value in sorted(flat.items()):
+        old = baseline.get(name)
+        if not old:
+            continue
+        change = (value - old) / old
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        if not name.endswith(HIGHER_IS_BETTER) and abs(value - old) < noise_floor:
+            worse = 0.0
+        flag = "❌" if worse > tolerance else ("✅" if worse < -tolerance else "  ")
+        regressions += worse > tolerance
+        print(f"  {flag} {name:<28} {old:10.4f} -> {value:10.4f}  ({change:+.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the robot with stand-in hardware")
+    parser.add_argument('inputs', nargs='*', help="recorded images or videos for the camera")
+    parser.add_argument('--wav', nargs='*', default=[], help="WAV files to 'hear' (16 kHz mono)")
+    parser.add_argument('--turns', type=int, default=12)
+    parser.add_argument('--loop-turns', type=int, default=6, help="typed turns per conversation loop")
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--motor-commands', type=int, default=20)
+    parser.add_argument('--tokens-per-second', type=float, default=20.0)
+    parser.add_argument('--prefill', type=float, default=0.2, help="fake prompt processing seconds")
+    parser.add_argument('--save', metavar='NAME', help="save results as a baseline")
+    parser.add_argument('--compare', metavar='NAME', help="compare with a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    frames = load_frames(args.inputs, args.frames) if args.inputs else []
+    if not frames:
+        frames = synthetic_frames(args.frames, 640, 480)
+
+    workdir = tempfile.mkdtemp(prefix="robot-bench-")
+    wavs = args.wav or [write_tone_wav(os.path.join(workdir, "speech.wav"), seconds=0.5)]
+    voice = WavVoice([(wavs[i % len(wavs)], PROMPTS[i % len(PROMPTS)])
+                      for i in range(max(len(wavs), len(PROMPTS)))])
+
+    # Point the Ollama client at the fake server
+    server = FakeOllama(args.tokens_per_second, args.prefill).start()
+    os.environ['OLLAMA_HOST'] = server.host
+
+    print(f"📊 Benchmarking: {len(frames)} frames, {args.turns} turns at "
+          f"{args.tokens_per_second:g} tokens/s, {args.motor_commands} motor commands")
+    results = {'startup': bench_startup(frames, voice, args.repeats)}
+
+    robot = Robot(lazy=False, parts={
+        'camera': lambda: Camera(capture=FrameSource(frames), save=False, stream=False),
+        'voice': lambda: voice,
+    })
+    robot.response_cache = None  # every turn should reach the (fake) model
+
+    results['turn'] = bench_turns(robot, args.turns)
+    results['loop'] = bench_loops(robot, args.loop_turns)
+    results['camera'] = bench_analyze(robot.camera, frames, args.repeats)
+    results['motor'] = bench_motors(robot.motors, args.motor_commands)
+    robot.motors.shutdown()
+    if robot.sensors:
+        robot.sensors.shutdown()
+    server.stop()
+
+    flat = flatten(results)
+    print("\n📈 Results")
+    for name, value in sorted(flat.items()):
+        unit = "" if name.endswith('fps') else "s"
+        print(f"  {name:<28} {value:10.4f}{unit}")
+
+    loops = results['loop']
+    print("\n🔁 Median seconds to first move / whole turn")
+    for mode, loop in loops.items():
+        print(f"  {mode:<12} {loop['action']['p50']:.3f} / {loop['turn']['p50']:.3f}")
+
+    regressions = 0
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json")) as f:
+            baseline = json.load(f)
+        print(f"\n🔍 Against baseline '{args.compare}' ({baseline.get('_saved', '?')})")
+        regressions = compare(flat, baseline, args.tolerance)
+        print(f"  {regressions} regression(s) beyond {args.tolerance:.0%}")
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save}.json")
+        with open(path, 'w') as f:
+            json.dump(dict(flat, _saved=time.strftime('%Y-%m-%d %H:%M')), f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved to {path}")
+
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
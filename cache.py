@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Response Cache - Remembers answers to commands the robot hears all the time
+Keeps recent replies in memory (LRU + expiry) and optionally on disk
+"""
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+def normalize_text(text):
+    """Make 'Move forward!' and 'move  forward' look the same"""
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    return " ".join(text.split())
+
+class ResponseCache:
+    def __init__(self, max_entries=256, ttl=3600, disk_path=None, save_delay=5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        # Changes are written by a background thread at most once per save_delay seconds
+        self.save_delay = save_delay
+        self._dirty = threading.Event()
+        self._save_lock = threading.Lock()
+
+        # key -> (time stored, response), oldest first
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_path:
+            self._load_from_disk()
+            threading.Thread(target=self._writer_loop, daemon=True).start()
+            # Whatever is still waiting gets written when the program exits
+            atexit.register(self.flush)
+
+    def make_key(self, user_input, model, hardware_summary):
+        """Build a cache key from what actually changes the answer"""
+        hardware_hash = hashlib.sha1(hardware_summary.encode()).hexdigest()[:12]
+        return f"{model}|{hardware_hash}|{normalize_text(user_input)}"
+
+    def get(self, key):
+        """Return a cached response, or None if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, response = entry
+            if self.ttl and time.time() - stored_at > self.ttl:
+                del self.entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            # Mark as recently used
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key, response):
+        """Remember a response, dropping the least recently used if full"""
+        with self.lock:
+            self.entries[key] = (time.time(), response)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+        # Never write the file on the reply path - the writer thread does it
+        self._dirty.set()
+
+    def clear(self):
+        """Forget everything"""
+        with self.lock:
+            self.entries.clear()
+        self._dirty.set()
+
+    def stats(self):
+        """Hit/miss counters for checking the cache is worth it"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _load_from_disk(self):
+        """Load the entries that survived the last restart"""
+        try:
+            with open(self.disk_path, 'r') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring broken response cache file: {e}")
+            return
+
+        now = time.time()
+        for key, stored_at, response in saved:
+            if self.ttl and now - stored_at > self.ttl:
+                continue
+            self.entries[key] = (stored_at, response)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+        print(f"💾 Loaded {len(self.entries)} cached responses")
+
+    def _writer_loop(self):
+        """Writer thread - save once things have changed, batching changes close together"""
+        while True:
+            self._dirty.wait()
+            time.sleep(self.save_delay)
+            self.flush()
+
+    def flush(self):
+        """Write pending changes to disk now (no-op if nothing changed)"""
+        if not self.disk_path or not self._dirty.is_set():
+            return
+        with self._save_lock:
+            self._dirty.clear()
+            self._save_to_disk()
+
+    def _save_to_disk(self):
+        """Write entries to disk (atomically, so a crash can't corrupt it)"""
+        # Copy under the lock, write outside it so lookups never wait for the SD card
+        with self.lock:
+            saved = [[key, stored_at, response] for key, (stored_at, response) in self.entries.items()]
+        tmp_path = f"{self.disk_path}.tmp"
+
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, self.disk_path)
+        except OSError as e:
+            print(f"⚠️ Could not save response cache: {e}")
@@ -6,26 +6,341 @@ Uses actual USB camera to see the real world
 import cv2
 import time
 import os
+import threading
+import numpy as np
+import metrics
+from config import load_config, setting
+from detection import ObjectDetector
+from snapshots import SnapshotWriter
+from streaming import FrameStream
+
+CAPTURE_SECONDS = metrics.histogram('camera_capture_seconds', "Camera.capture, read to description")
+ANALYZE_SECONDS = metrics.histogram('camera_analyze_seconds', "Camera._analyze_frame",
+                                    buckets=metrics.FAST_BUCKETS)
+
+class FrameAnalyzer:
+    """Describes a frame from a small grayscale copy, reusing the same buffers every call
+    
+    A cheap block-mean fingerprint of each frame is compared with the last one
+    analysed: an unchanged scene reuses the last answer, and a small change only
+    recomputes the blocks that changed.
+    """
+    
+    # Edge counts that meant "some"/"multiple" objects at full resolution
+    SOME_OBJECTS_EDGES = 5000
+    MANY_OBJECTS_EDGES = 10000
+    
+    def __init__(self, analysis_width=160, change_threshold=3.0, grid=(8, 6), refresh_fraction=0.5):
+        self.analysis_width = analysis_width
+        self.lock = threading.Lock()
+        
+        # Change detection (a threshold of 0 turns it off)
+        self.change_threshold = change_threshold
+        self.grid_columns, self.grid_rows = grid
+        self.refresh_fraction = refresh_fraction
+        
+        # Buffers are (re)made only when the frame size changes
+        self._frame_shape = None
+        self._halves = []
+        self._small = None
+        self._gray = None
+        self._edges = None
+        self._some_edges = self.SOME_OBJECTS_EDGES
+        self._many_edges = self.MANY_OBJECTS_EDGES
+        
+        # What the last analysis left behind, per block
+        self._last = None
+        self._last_small = None
+        self._fingerprint = None
+        
+        self.frames = 0
+        self.hits = 0
+        self.partial = 0
+        self.full = 0
+        self.blocks_recomputed = 0
+        self.full_cpu = None
+        self.cpu_saved = 0.0
+    
+    def _prepare(self, frame):
+        """Allocate the working buffers for this frame size"""
+        height, width = frame.shape[:2]
+        
+        small_width = min(width, self.analysis_width)
+        small_height = max(1, round(height * small_width / width))
+        
+        # OpenCV's area resize is only fast for exact halvings, so halve as far
+        # as possible and finish with one small linear resize
+        self._halves = []
+        half_width, half_height = width, height
+        while half_width // 2 >= small_width and half_height >= 2:
+            half_width, half_height = half_width // 2, half_height // 2
+            self._halves.append(np.empty((half_height, half_width, 3), dtype=np.uint8))
+        
+        self._small = None
+        if (half_width, half_height) != (small_width, small_height):
+            self._small = np.empty((small_height, small_width, 3), dtype=np.uint8)
+        
+        self._gray = np.empty((small_height, small_width), dtype=np.uint8)
+        self._edges = np.empty((small_height, small_width), dtype=np.uint8)
+        
+        # Edges are thin lines, so their count shrinks with the width, not the area
+        scale = small_width / width
+        self._some_edges = self.SOME_OBJECTS_EDGES * scale
+        self._many_edges = self.MANY_OBJECTS_EDGES * scale
+        self._frame_shape = frame.shape
+        
+        # Block edges in small-image pixels, and the same blocks in the full frame
+        columns = min(self.grid_columns, small_width)
+        rows = min(self.grid_rows, small_height)
+        self._small_xs = np.linspace(0, small_width, columns + 1).astype(int)
+        self._small_ys = np.linspace(0, small_height, rows + 1).astype(int)
+        self._frame_xs = np.round(self._small_xs * width / small_width).astype(int)
+        self._frame_ys = np.round(self._small_ys * height / small_height).astype(int)
+        
+        # The fingerprint is a tiny grayscale thumbnail with 2x2 cells per block,
+        # so a small object edging into a block still shows up
+        self._cells = (columns * 2, rows * 2)
+        self._sample = np.empty((rows * 8, columns * 8, 3), dtype=np.uint8)
+        self._last = None
+    
+    def _take_fingerprint(self, frame):
+        """Mean level of each cell (2x2 per block), from a sparse sample of the frame"""
+        # Pick a few pixels (nearest), then average them into cells (area)
+        cv2.resize(frame, (self._sample.shape[1], self._sample.shape[0]),
+                   dst=self._sample, interpolation=cv2.INTER_NEAREST)
+        cells = cv2.resize(self._sample, self._cells, interpolation=cv2.INTER_AREA)
+        return cells.astype(np.float32).mean(axis=2)
+    
+    def analyze(self, frame):
+        """Return (brightness, edge count at analysis size, description)"""
+        with self.lock:
+            started = time.thread_time()
+            if frame.shape != self._frame_shape:
+                self._prepare(frame)
+            self.frames += 1
+            
+            if not self.change_threshold:
+                return self._analyze_full(frame)
+            
+            fingerprint = self._take_fingerprint(frame)
+            changed = None
+            if self._last is not None:
+                changed_cells = np.abs(fingerprint - self._fingerprint) > self.change_threshold
+                rows, columns = len(self._small_ys) - 1, len(self._small_xs) - 1
+                changed = changed_cells.reshape(rows, 2, columns, 2).any(axis=(1, 3))
+            
+            if changed is not None and not changed.any():
+                # Same scene as last time
+                self.hits += 1
+                result = self._last
+            elif (changed is not None and self._last_small is not None
+                    and changed.mean() <= self.refresh_fraction):
+                # Only part of the scene moved
+                self.partial += 1
+                result = self._analyze_blocks(frame, changed)
+                cells = changed.repeat(2, axis=0).repeat(2, axis=1)
+                self._fingerprint[cells] = fingerprint[cells]
+            else:
+                result = self._analyze_full(frame)
+                self._fingerprint = fingerprint
+                self.full_cpu = time.thread_time() - started if self.full_cpu is None else (
+                    0.9 * self.full_cpu + 0.1 * (time.thread_time() - started))
+                return result
+            
+            if self.full_cpu is not None:
+                self.cpu_saved += max(0.0, self.full_cpu - (time.thread_time() - started))
+            return result
+    
+    def _analyze_full(self, frame):
+        """Run the whole pipeline on the frame"""
+        self.full += 1
+        height, width = frame.shape[:2]
+        
+        # Shrink once, then do everything on the small copy
+        small = frame
+        for half in self._halves:
+            small = cv2.resize(small, (half.shape[1], half.shape[0]),
+                               dst=half, interpolation=cv2.INTER_AREA)
+        if self._small is not None:
+            small = cv2.resize(small, (self._small.shape[1], self._small.shape[0]),
+                               dst=self._small, interpolation=cv2.INTER_LINEAR)
+        
+        # Average over all three colour channels, same as frame.mean()
+        blue, green, red, _ = cv2.mean(small)
+        brightness = (blue + green + red) / 3
+        
+        # Detect edges (simple object detection)
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.Canny(self._gray, 50, 150, edges=self._edges)
+        edge_count = cv2.countNonZero(self._edges)
+        
+        # Blocks get patched in place later, so never keep the caller's frame
+        self._last_small = small if small is not frame else None
+        
+        self._last = (brightness, edge_count, self._describe(brightness, edge_count, width, height))
+        return self._last
+    
+    def _analyze_blocks(self, frame, changed):
+        """Redo the small copy only where blocks changed, then recount"""
+        height, width = frame.shape[:2]
+        small = self._last_small
+        small_height, small_width = small.shape[:2]
+        
+        rows, columns = np.nonzero(changed)
+        for row, column in zip(rows, columns):
+            y0, y1 = self._small_ys[row], self._small_ys[row + 1]
+            x0, x1 = self._small_xs[column], self._small_xs[column + 1]
+            crop = frame[self._frame_ys[row]:self._frame_ys[row + 1],
+                         self._frame_xs[column]:self._frame_xs[column + 1]]
+            
+            # Same halvings as the full pipeline, so the pixels come out identical
+            for _ in self._halves:
+                crop = cv2.resize(crop, (crop.shape[1] // 2, crop.shape[0] // 2), interpolation=cv2.INTER_AREA)
+            if crop.shape[:2] != (y1 - y0, x1 - x0):
+                crop = cv2.resize(crop, (x1 - x0, y1 - y0), interpolation=cv2.INTER_LINEAR)
+            small[y0:y1, x0:x1] = crop
+            self._gray[y0:y1, x0:x1] = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+            self.blocks_recomputed += 1
+        
+        # Edges only around the changed area - with a block of margin so edges
+        # that continue into the neighbours are traced the same way
+        top, bottom = self._small_ys[rows.min()], self._small_ys[rows.max() + 1]
+        left, right = self._small_xs[columns.min()], self._small_xs[columns.max() + 1]
+        margin_y = self._small_ys[1]
+        margin_x = self._small_xs[1]
+        outer_top, outer_left = max(0, top - margin_y), max(0, left - margin_x)
+        outer_bottom, outer_right = min(small_height, bottom + margin_y), min(small_width, right + margin_x)
+        edges = cv2.Canny(self._gray[outer_top:outer_bottom, outer_left:outer_right], 50, 150)
+        self._edges[top:bottom, left:right] = edges[top - outer_top:bottom - outer_top,
+                                                    left - outer_left:right - outer_left]
+        
+        # Totals over the small copy are cheap
+        blue, green, red, _ = cv2.mean(small)
+        brightness = (blue + green + red) / 3
+        edge_count = cv2.countNonZero(self._edges)
+        
+        self._last = (brightness, edge_count, self._describe(brightness, edge_count, width, height))
+        return self._last
+    
+    def stats(self):
+        """How often the last answer could be reused, and the CPU time that saved"""
+        with self.lock:
+            return {
+                'frames': self.frames,
+                'hits': self.hits,
+                'partial': self.partial,
+                'full': self.full,
+                'hit_ratio': self.hits / self.frames if self.frames else 0.0,
+                'blocks_recomputed': self.blocks_recomputed,
+                'cpu_saved_seconds': round(self.cpu_saved, 4),
+                'full_analysis_ms': round(self.full_cpu * 1000, 3) if self.full_cpu else None,
+            }
+    
+    def _describe(self, brightness, edge_count, width, height):
+        """Turn the numbers into words for the AI"""
+        # Determine scene type
+        if brightness < 50:
+            scene = "dark room"
+        elif brightness < 100:
+            scene = "dimly lit area"
+        elif brightness > 200:
+            scene = "bright area"
+        else:
+            scene = "normally lit room"
+        
+        # Check if there are objects (edges)
+        if edge_count > self._many_edges:
+            objects = "multiple objects"
+        elif edge_count > self._some_edges:
+            objects = "some objects"
+        else:
+            objects = "few objects"
+        
+        return f"{scene} with {objects}, image size {width}x{height}"
 
 class Camera:
-    def __init__(self):
+    def __init__(self, camera_index=None, background=None, hardware=None, capture=None, save=None,
+                 detect=None, stream=None):
         print("📷 Initializing REAL camera...")
         
-        self.camera_index = 0  # /dev/video0
-        self.cap = None
+        config = load_config()
+        if camera_index is None:
+            camera_index = setting(config, 'hardware.camera.index', 0)
+        if background is None:
+            background = setting(config, 'hardware.camera.background_grabber', False)
+        if save is None:
+            save = setting(config, 'hardware.camera.captures.save', True)
+        
+        self.camera_index = camera_index  # /dev/video0
+        self.fps = setting(config, 'hardware.camera.fps', 30)
+        self.analyzer = FrameAnalyzer(
+            setting(config, 'hardware.camera.analysis_width', 160),
+            change_threshold=setting(config, 'hardware.camera.change_detection.threshold', 3.0),
+            grid=setting(config, 'hardware.camera.change_detection.grid', [8, 6]),
+            refresh_fraction=setting(config, 'hardware.camera.change_detection.refresh_fraction', 0.5),
+        )
+        self.ring_size = max(2, setting(config, 'hardware.camera.ring_size', 4))
+        self.cap = capture
         self.connected = False
         
-        # Try to connect to camera
-        self._connect_camera()
+        # Pictures are written by a background thread (or not at all)
+        self.snapshots = None
+        if save:
+            self.snapshots = SnapshotWriter(
+                directory=setting(config, 'hardware.camera.captures.directory', "captures"),
+                image_format=setting(config, 'hardware.camera.captures.format', "jpg"),
+                quality=setting(config, 'hardware.camera.captures.quality', 85),
+                queue_size=setting(config, 'hardware.camera.captures.queue_size', 4),
+                max_files=setting(config, 'hardware.camera.captures.max_files', 200),
+                max_megabytes=setting(config, 'hardware.camera.captures.max_megabytes', 100),
+                max_age_hours=setting(config, 'hardware.camera.captures.max_age_hours', 24),
+            )
+        
+        # Background grabber state (see start_grabber)
+        self.grabber_running = False
+        self._grab_thread = None
+        self._new_frame = threading.Condition()
+        self.ring = []
+        self.ring_times = []
+        self.latest_slot = -1
+        self.frame_seq = 0
+        self._taken_seq = 0
+        self.frames_skipped = 0
+        self.read_errors = 0
+        self.effective_fps = 0.0
+        
+        # Try to connect to camera (reusing the one Hardware already opened)
+        self._connect_camera(hardware)
+        
+        if background and self.connected:
+            self.start_grabber()
+        
+        # Real object detection in worker processes (needs the grabber, starts it if off)
+        self.detector = None
+        if detect is None:
+            detect = setting(config, 'hardware.camera.detection.enabled', False)
+        if detect and self.connected:
+            self.start_detector(config)
+        
+        # Live view over HTTP (encodes nothing until someone opens it)
+        self.stream = None
+        if stream is None:
+            stream = setting(config, 'hardware.camera.stream.enabled', False)
+        if stream and self.connected:
+            self.start_stream(config)
     
-    def _connect_camera(self):
+    def _connect_camera(self, hardware=None):
         """Connect to actual USB camera"""
         try:
             print(f"🔌 Connecting to camera /dev/video{self.camera_index}...")
-            self.cap = cv2.VideoCapture(self.camera_index)
+            if self.cap is None and hardware is not None:
+                self.cap = hardware.take_camera(self.camera_index)
+            if self.cap is None:
+                self.cap = cv2.VideoCapture(self.camera_index)
             
             # Test if camera works
             if self.cap.isOpened():
+                self.cap.set(cv2.CAP_PROP_FPS, self.fps)
                 ret, frame = self.cap.read()
                 if ret:
                     self.connected = True
@@ -39,6 +354,169 @@ class Camera:
         except Exception as e:
             print(f"❌ Camera error: {e}")
     
+    def start_grabber(self):
+        """Keep draining the camera in the background so the newest frame is always ready"""
+        if not self.connected or self.grabber_running:
+            return
+        
+        ret, frame = self.cap.read()
+        if not ret:
+            print("❌ Can't start frame grabber - camera not giving frames")
+            return
+        
+        # Preallocate the ring once; the grabber reads straight into these buffers
+        self.ring = [np.empty_like(frame) for _ in range(self.ring_size)]
+        self.ring_times = [0.0] * self.ring_size
+        self.ring[0][...] = frame
+        self.ring_times[0] = time.monotonic()
+        self.latest_slot = 0
+        self.frame_seq = 1
+        self._taken_seq = 0
+        
+        self.grabber_running = True
+        self._grab_thread = threading.Thread(target=self._grab_loop, daemon=True)
+        self._grab_thread.start()
+        print(f"🎞️ Frame grabber running ({self.ring_size} frame ring at {self.fps} fps)")
+    
+    def start_detector(self, config=None):
+        """Load the detection model into its worker processes and feed it the newest frames"""
+        config = config or load_config()
+        try:
+            self.detector = ObjectDetector(
+                model=setting(config, 'hardware.camera.detection.model'),
+                config=setting(config, 'hardware.camera.detection.config'),
+                kind=setting(config, 'hardware.camera.detection.kind', "ssd"),
+                labels=setting(config, 'hardware.camera.detection.labels'),
+                input_size=setting(config, 'hardware.camera.detection.input_size', 300),
+                confidence=setting(config, 'hardware.camera.detection.confidence', 0.5),
+                workers=setting(config, 'hardware.camera.detection.workers', 1),
+                threads_per_worker=setting(config, 'hardware.camera.detection.threads_per_worker', 1),
+                max_lag=setting(config, 'hardware.camera.detection.max_lag_seconds', 0.5),
+            )
+            self.detector.start(self)
+        except Exception as e:
+            print(f"⚠️ Object detection off: {e}")
+            self.detector = None
+    
+    def start_stream(self, config=None):
+        """Serve the live view (MJPEG) so it can be watched from a browser"""
+        config = config or load_config()
+        stream = FrameStream(
+            self,
+            host=setting(config, 'hardware.camera.stream.host', "127.0.0.1"),
+            port=setting(config, 'hardware.camera.stream.port', 8080),
+            quality=setting(config, 'hardware.camera.stream.quality', 70),
+            max_fps=setting(config, 'hardware.camera.stream.max_fps', 15),
+            width=setting(config, 'hardware.camera.stream.width'),
+            name=f"{setting(config, 'robot.name', 'Robot')} Camera",
+        )
+        try:
+            if stream.start():
+                self.stream = stream
+        except OSError as e:
+            print(f"⚠️ Live view not started: {e}")
+        return self.stream
+    
+    def stop_grabber(self):
+        """Stop the background frame grabber"""
+        if not self.grabber_running:
+            return
+        
+        self.grabber_running = False
+        with self._new_frame:
+            self._new_frame.notify_all()
+        if self._grab_thread and self._grab_thread is not threading.current_thread():
+            self._grab_thread.join(timeout=2)
+        self._grab_thread = None
+    
+    def _grab_loop(self):
+        """Grabber thread - read every frame the camera delivers into the ring"""
+        last_time = time.monotonic()
+        
+        while self.grabber_running:
+            slot = (self.latest_slot + 1) % self.ring_size
+            
+            try:
+                ret, frame = self.cap.read(self.ring[slot])
+            except Exception:
+                ret, frame = False, None
+            
+            if not ret:
+                self.read_errors += 1
+                time.sleep(1.0 / self.fps)
+                continue
+            
+            # OpenCV hands back a new array if the frame size changed
+            if frame is not self.ring[slot]:
+                self.ring[slot] = frame
+            
+            now = time.monotonic()
+            self.ring_times[slot] = now
+            
+            # Smooth the measured frame rate so it doesn't jump around
+            interval = now - last_time
+            last_time = now
+            if interval > 0:
+                instant_fps = 1.0 / interval
+                if self.effective_fps:
+                    self.effective_fps += 0.1 * (instant_fps - self.effective_fps)
+                else:
+                    self.effective_fps = instant_fps
+            
+            # The previous newest frame is about to be replaced - nobody took it
+            if self._taken_seq < self.frame_seq:
+                self.frames_skipped += 1
+            
+            with self._new_frame:
+                self.latest_slot = slot
+                self.frame_seq += 1
+                self._new_frame.notify_all()
+    
+    def latest_frame(self):
+        """Newest frame from the grabber without blocking or copying
+        
+        Returns (frame, age in seconds). The frame is a ring buffer slot that
+        gets reused after ring_size - 1 newer frames, so copy it to keep it.
+        """
+        if not self.grabber_running or self.latest_slot < 0:
+            return None, None
+        
+        slot = self.latest_slot
+        self._taken_seq = self.frame_seq
+        return self.ring[slot], time.monotonic() - self.ring_times[slot]
+    
+    def wait_for_frame(self, after_seq, timeout=1.0):
+        """Block until the grabber has a frame newer than after_seq"""
+        with self._new_frame:
+            self._new_frame.wait_for(
+                lambda: self.frame_seq > after_seq or not self.grabber_running,
+                timeout=timeout,
+            )
+        return self.frame_seq
+    
+    def grabber_stats(self):
+        """How the background grabber is keeping up"""
+        frame_age = None
+        if self.grabber_running and self.latest_slot >= 0:
+            frame_age = time.monotonic() - self.ring_times[self.latest_slot]
+        
+        return {
+            'running': self.grabber_running,
+            'frames': self.frame_seq,
+            'skipped': self.frames_skipped,
+            'read_errors': self.read_errors,
+            'fps': round(self.effective_fps, 1),
+            'frame_age': frame_age,
+        }
+    
+    def _read_frame(self):
+        """Get a frame - newest from the grabber, or read directly"""
+        if self.grabber_running:
+            frame, _ = self.latest_frame()
+            return frame is not None, frame
+        return self.cap.read()
+    
+    @metrics.timed(CAPTURE_SECONDS)
     def capture(self):
         """Capture REAL image from camera"""
         if not self.connected:
@@ -46,96 +524,63 @@ class Camera:
         
         try:
             # Capture frame
-            ret, frame = self.cap.read()
+            ret, frame = self._read_frame()
             
             if not ret:
                 return "Failed to capture image"
             
-            # Save the image so we can analyze it
-            timestamp = int(time.time())
-            filename = f"camera_capture_{timestamp}.jpg"
-            cv2.imwrite(filename, frame)
+            # Save the image in the background (never holds up the answer)
+            filename = self.snapshots.save(frame) if self.snapshots else None
             
-            # Analyze what we see
+            # Analyze what we see (and name what the detector recognised)
             analysis = self._analyze_frame(frame)
+            seen = self.detector.describe() if self.detector else ""
+            if seen:
+                analysis = f"{analysis}; objects: {seen}"
             
-            print(f"📸 Captured image: {filename}")
+            if filename:
+                print(f"📸 Captured image: {filename}")
+            elif self.snapshots:
+                print("📸 Captured image (not saved - writer busy)")
             return analysis
             
         except Exception as e:
             return f"Camera error: {e}"
     
+    @metrics.timed(ANALYZE_SECONDS)
     def _analyze_frame(self, frame):
         """Analyze what the camera sees"""
         try:
-            # Get basic image info
-            height, width = frame.shape[:2]
-            
-            # Convert to HSV for color analysis
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            
-            # Calculate brightness
-            brightness = frame.mean()
-            
-            # Detect edges (simple object detection)
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 50, 150)
-            edge_count = cv2.countNonZero(edges)
-            
-            # Determine scene type
-            if brightness < 50:
-                scene = "dark room"
-            elif brightness < 100:
-                scene = "dimly lit area"
-            elif brightness > 200:
-                scene = "bright area"
-            else:
-                scene = "normally lit room"
-            
-            # Check if there are objects (edges)
-            if edge_count > 10000:
-                objects = "multiple objects"
-            elif edge_count > 5000:
-                objects = "some objects"
-            else:
-                objects = "few objects"
-            
-            return f"{scene} with {objects}, image size {width}x{height}"
+            _, _, description = self.analyzer.analyze(frame)
+            return description
             
         except Exception as e:
             return f"image analysis failed: {e}"
     
     def show_live_view(self, duration=5):
-        """Show live camera feed - REAL preview"""
+        """Show live camera feed - in a browser, so it works without a screen on the robot"""
         if not self.connected:
             print("❌ Camera not available for live view")
             return
         
-        print(f"👀 Showing live camera view for {duration} seconds...")
-        print("Press 'q' to close early")
+        started_here = self.stream is None
+        if started_here and not self.start_stream():
+            return
         
-        start_time = time.time()
+        print(f"👀 Live camera view on {self.stream.url} for {duration} seconds...")
+        print("Press Ctrl+C to close early")
         
         try:
-            while (time.time() - start_time) < duration:
-                ret, frame = self.cap.read()
-                if ret:
-                    # Display the frame
-                    cv2.imshow('Robot Camera - Live View', frame)
-                    
-                    # Break if 'q' is pressed
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        break
-                else:
-                    print("❌ Lost camera connection")
-                    break
-            
-            cv2.destroyAllWindows()
-            print("✅ Live view closed")
-            
-        except Exception as e:
-            print(f"❌ Live view error: {e}")
-            cv2.destroyAllWindows()
+            time.sleep(duration)
+        except KeyboardInterrupt:
+            pass
+        
+        stats = self.stream.stats()
+        if started_here:
+            self.stream.stop()
+            self.stream = None
+        print(f"✅ Live view closed ({stats['encoded']} frames encoded, "
+              f"{stats['encode_cpu_ms']:.1f} ms CPU each)")
     
     def get_resolution(self):
         """Get actual camera resolution"""
@@ -151,9 +596,15 @@ class Camera:
     
     def __del__(self):
         """Release camera when done"""
+        if getattr(self, 'detector', None):
+            self.detector.shutdown()
+        if getattr(self, 'stream', None):
+            self.stream.stop()
+        self.stop_grabber()
+        if self.snapshots:
+            self.snapshots.close()
         if self.cap:
             self.cap.release()
-            cv2.destroyAllWindows()
 
 # Standalone camera test
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Robot Settings - Reads config.json so every part uses the same numbers
+"""
+import json
+import os
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+
+_loaded = {}
+
+def load_config(path=CONFIG_FILE):
+    """Load settings from config.json (only read from disk once)"""
+    if path in _loaded:
+        return _loaded[path]
+
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        print(f"⚠️ No config found at {path} - using defaults")
+        config = {}
+    except json.JSONDecodeError as e:
+        print(f"⚠️ Config file is broken ({e}) - using defaults")
+        config = {}
+
+    _loaded[path] = config
+    return config
+
+def setting(config, path, default=None):
+    """Look up a dotted setting like 'ai.model', falling back to default"""
+    value = config
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
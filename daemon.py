@@ -0,0 +1,783 @@
+#!/usr/bin/env python3
+"""
+Robot Daemon - One process owns the hardware; consoles and scripts talk to it over a Unix socket
+Every client gets its own session (its own conversation with the AI) while the motors,
+camera and sensors are shared. All LLM calls - from sessions and from other robot
+processes - go through one LLMPool: a single Ollama client whose HTTP connections are
+kept open and reused, a limit on how many requests generate at once, a queue where
+safety and motion go before chit-chat, and identical prompts asked at the same time
+answered by one request
+
+    POST   /sessions              {"name": ...}  -> {"session": id}
+    POST   /sessions/<id>/say     {"text": ..., "stream": false, "speak": false}
+    GET    /sessions[/<id>]       per-session queue wait and reply latency
+    DELETE /sessions/<id>
+    POST   /stop                  stop the motors right now (never queued)
+    GET    /status, /metrics
+    POST   /llm/generate          Ollama-style generate through the shared pool
+
+Run:  python3 start-robot.py --daemon      (or python3 daemon.py serve [--llm-only])
+Talk: python3 daemon.py console            (python3 daemon.py stop / status)
+"""
+import copy
+import hashlib
+import heapq
+import http.client
+import itertools
+import json
+import os
+import re
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn, UnixStreamServer
+
+import ollama
+
+import metrics
+from config import load_config, setting
+
+# Lower goes first
+PRIORITIES = {'safety': 0, 'motion': 1, 'chat': 2}
+MOVES = ('forward', 'backward', 'left', 'right')
+
+QUEUE_WAIT_SECONDS = metrics.histogram('llm_queue_wait_seconds', "Waiting for a free LLM slot",
+                                       labels=('priority',))
+LLM_SECONDS = metrics.histogram('llm_request_seconds', "LLM request from getting a slot to its last token",
+                                labels=('priority',))
+LLM_REQUESTS = metrics.counter('llm_requests', "LLM requests by priority and what happened to them",
+                               labels=('priority', 'result'))
+
+def _as_dict(response):
+    """Ollama response (pydantic model or dict) as plain JSON-able dict"""
+    if hasattr(response, 'model_dump'):
+        return response.model_dump(mode='json', exclude_none=True)
+    return dict(response)
+
+def _percentile(values, point):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(point * len(values)))] if values else 0.0
+
+def priority_for(intents):
+    """How urgent a turn is, from the commands in it"""
+    actions = {intent.action for intent in intents}
+    if 'stop' in actions:
+        return 'safety'
+    if actions & set(MOVES):
+        return 'motion'
+    return 'chat'
+
+class _SharedRequest:
+    """A generate in flight that identical requests wait on instead of asking again"""
+
+    def __init__(self):
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.done = False
+        self._changed = threading.Condition()
+
+    def add(self, chunk):
+        with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    def finish(self, result=None, error=None):
+        with self._changed:
+            self.result, self.error, self.done = result, error, True
+            self._changed.notify_all()
+
+    def wait(self):
+        with self._changed:
+            while not self.done:
+                self._changed.wait()
+        if self.error:
+            raise RuntimeError(f"shared request failed: {self.error}")
+        return self.result
+
+    def replay(self):
+        """The leader's stream, chunk by chunk as it arrives"""
+        seen = 0
+        while True:
+            with self._changed:
+                while seen >= len(self.chunks) and not self.done:
+                    self._changed.wait()
+                chunks = self.chunks[seen:]
+                done, error = self.done, self.error
+            seen += len(chunks)
+            yield from chunks
+            if done:
+                if error:
+                    raise RuntimeError(f"shared request failed: {error}")
+                return
+
+class LLMPool:
+    """Stands in for ollama.Client (same generate()) so every session shares one LLM host
+
+    ollama.Client keeps its HTTP connections open, so the pool holds one client for
+    everybody. Requests queue for one of max_concurrent slots by priority, then by arrival.
+    Use `with pool.request('motion', session):` to set the priority of the generate()
+    calls made on this thread (Robot.think doesn't know about priorities)
+    """
+
+    def __init__(self, client=None, max_concurrent=1, max_waiting=32, coalesce=True):
+        self.client = client or ollama.Client()
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.coalesce = coalesce
+        self.active = 0
+        self._waiting = []                # heap of (priority, arrival)
+        self._arrivals = itertools.count()
+        self._slots = threading.Condition()
+        self._in_flight = {}              # request key -> _SharedRequest
+        self._local = threading.local()
+
+        self.counts = {'requests': 0, 'coalesced': 0, 'rejected': 0, 'failed': 0}
+        self.max_waited = 0.0
+        # session -> recent (queue wait, seconds generating) and counts
+        self.sessions = {}
+
+    @contextmanager
+    def request(self, priority='chat', session=None):
+        """Give generate() calls on this thread a priority and the session they belong to"""
+        previous = getattr(self._local, 'options', None)
+        self._local.options = (priority if priority in PRIORITIES else 'chat', session)
+        self._local.waited = 0.0
+        try:
+            yield self
+        finally:
+            self._local.options = previous
+
+    def waited(self):
+        """Seconds this thread spent queueing since its request() began"""
+        return getattr(self._local, 'waited', 0.0)
+
+    def generate(self, priority=None, **kwargs):
+        """Like ollama.Client.generate - waits its turn, or joins an identical request in flight"""
+        default, session = getattr(self._local, 'options', None) or ('chat', None)
+        priority = priority if priority in PRIORITIES else default
+        if kwargs.get('stream'):
+            return self._stream(priority, session, kwargs)
+
+        shared, leader = self._join(priority, kwargs)
+        if not leader:
+            return shared.wait()
+        try:
+            with self._slot(priority, session):
+                result = self.client.generate(**kwargs)
+        except Exception as e:
+            self._finish(shared, error=e)
+            raise
+        self._finish(shared, result=result)
+        return result
+
+    def _stream(self, priority, session, kwargs):
+        # Everything happens on the first next(), so a stream nobody reads never holds a slot
+        shared, leader = self._join(priority, kwargs)
+        if not leader:
+            yield from shared.replay()
+            return
+        error = None
+        try:
+            with self._slot(priority, session):
+                for chunk in self.client.generate(**kwargs):
+                    shared.add(chunk)
+                    yield chunk
+        except BaseException as e:
+            error = e if isinstance(e, Exception) else RuntimeError("the asker went away")
+            raise
+        finally:
+            self._finish(shared, error=error)
+
+    def _join(self, priority, kwargs):
+        """The in-flight request for these exact arguments - and whether we're the one asking"""
+        if not self.coalesce:
+            return _SharedRequest(), True
+        key = hashlib.sha1(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()
+        with self._slots:
+            shared = self._in_flight.get(key)
+            if shared is None:
+                shared = self._in_flight[key] = _SharedRequest()
+                shared.key = key
+                return shared, True
+            self.counts['coalesced'] += 1
+        LLM_REQUESTS.labels(priority, 'coalesced').inc()
+        return shared, False
+
+    def _finish(self, shared, result=None, error=None):
+        with self._slots:
+            if self._in_flight.get(getattr(shared, 'key', None)) is shared:
+                del self._in_flight[shared.key]
+            if error:
+                self.counts['failed'] += 1
+        shared.finish(result, error)
+
+    @contextmanager
+    def _slot(self, priority, session):
+        """Wait for a free slot - higher priority first, then first come first served"""
+        asked = time.monotonic()
+        with self._slots:
+            if priority == 'chat' and len(self._waiting) >= self.max_waiting:
+                self.counts['rejected'] += 1
+                LLM_REQUESTS.labels(priority, 'rejected').inc()
+                raise RuntimeError("too many questions waiting for the AI - try again in a moment")
+            ticket = (PRIORITIES[priority], next(self._arrivals))
+            heapq.heappush(self._waiting, ticket)
+            while self.active >= self.max_concurrent or self._waiting[0] != ticket:
+                self._slots.wait()
+            heapq.heappop(self._waiting)
+            self.active += 1
+            self.counts['requests'] += 1
+            # With more than one slot, the next in line may be able to go too
+            self._slots.notify_all()
+
+        started = time.monotonic()
+        waited = started - asked
+        self._local.waited = getattr(self._local, 'waited', 0.0) + waited
+        self.max_waited = max(self.max_waited, waited)
+        QUEUE_WAIT_SECONDS.labels(priority).observe(waited)
+        LLM_REQUESTS.labels(priority, 'run').inc()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - started
+            LLM_SECONDS.labels(priority).observe(seconds)
+            with self._slots:
+                self.active -= 1
+                self._note(session, waited, seconds)
+                self._slots.notify_all()
+
+    def _note(self, session, waited, seconds):
+        session = session or 'default'
+        if session not in self.sessions:
+            if len(self.sessions) >= 64:
+                # Oldest first - forget a session nobody closed
+                del self.sessions[next(iter(self.sessions))]
+            self.sessions[session] = {'requests': 0, 'recent': deque(maxlen=256)}
+        stats = self.sessions[session]
+        stats['requests'] += 1
+        stats['recent'].append((waited, seconds))
+
+    def session_stats(self, session):
+        """Queue wait and generating time of one session's LLM requests"""
+        with self._slots:
+            stats = self.sessions.get(session)
+            recent = list(stats['recent']) if stats else []
+            requests = stats['requests'] if stats else 0
+        waits = [waited for waited, _ in recent]
+        seconds = [generating for _, generating in recent]
+        return {
+            'llm_requests': requests,
+            'queue_wait_p50': _percentile(waits, 0.5),
+            'queue_wait_p99': _percentile(waits, 0.99),
+            'queue_wait_max': max(waits, default=0.0),
+            'llm_p50': _percentile(seconds, 0.5),
+            'llm_max': max(seconds, default=0.0),
+        }
+
+    def forget(self, session):
+        with self._slots:
+            self.sessions.pop(session, None)
+
+    def stats(self):
+        with self._slots:
+            waiting = len(self._waiting)
+            in_flight = len(self._in_flight)
+        return dict(self.counts, active=self.active, waiting=waiting, in_flight=in_flight,
+                    max_concurrent=self.max_concurrent, max_waited=self.max_waited)
+
+class Session:
+    """One console or script talking to the robot - its own conversation, the shared hardware"""
+
+    def __init__(self, robot, name=None):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name or self.id
+        # A shallow copy, so everything not reset here is shared on purpose:
+        # - the subsystems (_ready: motors, sensors, camera, voice, AI) - there is one robot
+        # - the response cache - with memory on it only answers opening questions, which
+        #   don't depend on who asks, and it has its own lock
+        # - config, intents and the other settings, which are only read
+        # The conversation - AI context, memory, timings, intent counts - is per session
+        self.brain = copy.copy(robot)
+        self.brain.context = None
+        self.brain._context_hardware = None
+        self.brain.memory = robot._make_memory()
+        self.brain.last_timing = {}
+        self.brain.intent_counts = {name: 0 for name in robot.intent_counts}
+        self.created = self.last_used = time.monotonic()
+        self.turns = 0
+        # One turn at a time per session, like a person waiting for the answer
+        self.lock = threading.Lock()
+        # Recent (first token, whole reply) seconds
+        self.recent = deque(maxlen=256)
+
+    def stats(self):
+        recent = list(self.recent)
+        first_tokens = [first for first, _ in recent if first is not None]
+        replies = [total for _, total in recent]
+        return {
+            'turns': self.turns,
+            'fast_path_rate': self.brain.intent_stats()['fast_path_rate'],
+            'idle_seconds': time.monotonic() - self.last_used,
+            'first_token_p50': _percentile(first_tokens, 0.5),
+            'first_token_p90': _percentile(first_tokens, 0.9),
+            'reply_p50': _percentile(replies, 0.5),
+            'reply_p90': _percentile(replies, 0.9),
+            'reply_max': max(replies, default=0.0),
+        }
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+class RobotDaemon:
+    """Serves a Robot (or just the LLM pool, with robot=None) on a Unix socket"""
+
+    def __init__(self, robot=None, socket_path=None, config=None):
+        config = config or load_config()
+        self.robot = robot
+        self.socket_path = socket_path or setting(config, 'daemon.socket', "robot.sock")
+        self.max_sessions = setting(config, 'daemon.max_sessions', 16)
+        self.idle_timeout = setting(config, 'daemon.session_idle_seconds', 1800)
+
+        self.pool = LLMPool(
+            robot.ai if robot else None,
+            max_concurrent=setting(config, 'daemon.llm_concurrency', 1),
+            max_waiting=setting(config, 'daemon.llm_max_waiting', 32),
+            coalesce=setting(config, 'daemon.coalesce_prompts', True),
+        )
+        if robot:
+            # Every session's think() now goes through the pool
+            robot.ai = self.pool
+        self.sessions = {}
+        self._lock = threading.Lock()
+        self.server = None
+
+        metrics.register_collector('llm_pool', self.pool.stats)
+        metrics.register_collector('sessions', self.session_gauges)
+
+    def open_session(self, name=None):
+        if not self.robot:
+            raise LookupError("this daemon only serves the LLM (started with --llm-only)")
+        with self._lock:
+            now = time.monotonic()
+            for session_id, session in list(self.sessions.items()):
+                if now - session.last_used > self.idle_timeout and not session.lock.locked():
+                    self._drop(session_id)
+            if len(self.sessions) >= self.max_sessions:
+                raise RuntimeError(f"already {self.max_sessions} sessions open")
+            session = Session(self.robot, name)
+            self.sessions[session.id] = session
+        print(f"🔌 Session {session.id} opened ({session.name})")
+        return session
+
+    def close_session(self, session_id):
+        with self._lock:
+            self._drop(session_id)
+        print(f"🔌 Session {session_id} closed")
+
+    def _drop(self, session_id):
+        self.sessions.pop(session_id)
+        self.pool.forget(session_id)
+
+    def session(self, session_id):
+        with self._lock:
+            session = self.sessions.get(session_id)
+        if session is None:
+            raise LookupError(f"no session {session_id}")
+        return session
+
+    def say(self, session, text, on_token=None, speak=False):
+        """One turn: clear commands run at once, then the AI answers at the turn's priority"""
+        with session.lock:
+            started = time.monotonic()
+            session.last_used = started
+            robot = session.brain
+            matched = robot.intents.actionable(text)
+            priority = priority_for(matched)
+
+            # A stop is obeyed here, before this turn waits for anything
+            handled = robot.fast_path(text)
+            actions = [intent.describe() for intent in handled]
+
+            queue_wait = 0.0
+            if handled and robot.intents.skip_llm:
+                reply = " ".join(actions)
+                robot.last_timing = {}
+            else:
+                speaking = speak and robot.voice.voice_available
+                with self.pool.request(priority, session.id):
+                    reply = robot.think_stream(text, on_token=on_token,
+                                               on_sentence=robot.voice.speak if speaking else None)
+                    queue_wait = self.pool.waited()
+                if not handled:
+                    actions += [intent.describe() for intent in matched]
+                robot.do_actions(text, reply, spoken=not speak or speaking, handled=bool(handled))
+
+            total = time.monotonic() - started
+            first_token = robot.last_timing.get('first_token')
+            session.turns += 1
+            session.recent.append((first_token, total))
+            session.last_used = time.monotonic()
+
+        timing = {key: value for key, value in robot.last_timing.items() if value is not None}
+        timing.update(queue_wait=queue_wait, total=total)
+        return {'reply': reply, 'actions': actions, 'priority': priority, 'timing': timing}
+
+    def emergency_stop(self):
+        if self.robot:
+            self.robot.emergency_stop()
+
+    def session_stats(self, session):
+        return dict(session.stats(), name=session.name, **self.pool.session_stats(session.id))
+
+    def session_gauges(self):
+        """Per-session numbers for the metrics endpoint - sessions and remote pool users alike"""
+        gauges = {}
+        with self._lock:
+            sessions = list(self.sessions.values())
+        names = {session.id for session in sessions} | set(self.pool.sessions)
+        for name in names:
+            values = dict(self.pool.session_stats(name))
+            session = next((session for session in sessions if session.id == name), None)
+            if session:
+                values.update(session.stats())
+            prefix = re.sub(r'\W', '_', name)
+            gauges.update({f"{prefix}_{key}": value for key, value in values.items()})
+        return gauges
+
+    def status(self):
+        robot = self.robot
+        result = {'sessions': len(self.sessions), 'llm': self.pool.stats()}
+        if robot:
+            motors = robot._ready.get('motors')
+            result.update(name=robot.name, hardware=robot.hardware.summary(),
+                          moving=bool(motors and motors.is_moving()))
+        return result
+
+    def serve_forever(self):
+        """Listen on the socket until Ctrl+C"""
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise RuntimeError(f"a robot daemon is already running on {self.socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a daemon that didn't shut down cleanly
+                os.unlink(self.socket_path)
+            finally:
+                probe.close()
+
+        self.server = _UnixHTTPServer(self.socket_path, self._handler())
+        os.chmod(self.socket_path, 0o660)
+        what = "LLM pool" if self.robot is None else self.robot.name
+        print(f"📡 {what} listening on {self.socket_path} "
+              f"(LLM: {self.pool.max_concurrent} at a time, up to {self.pool.max_waiting} waiting)")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🤖 Robot: Goodbye! Shutting down...")
+        finally:
+            self.emergency_stop()
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def _handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep connections open so clients don't reconnect for every turn
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                daemon._route(self, 'GET')
+
+            def do_POST(self):
+                daemon._route(self, 'POST')
+
+            def do_DELETE(self):
+                daemon._route(self, 'DELETE')
+
+            def send_json(self, status, data):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def start_lines(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+            def send_line(self, data):
+                line = (json.dumps(data) + "\n").encode()
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+
+            def end_lines(self):
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def _route(self, handler, method):
+        parts = [part for part in handler.path.split('?')[0].split('/') if part]
+        try:
+            length = int(handler.headers.get('Content-Length') or 0)
+            body = json.loads(handler.rfile.read(length) or b"{}") if length else {}
+
+            if method == 'POST' and parts == ['stop']:
+                self.emergency_stop()
+                handler.send_json(200, {'stopped': True})
+            elif method == 'GET' and parts == ['status']:
+                handler.send_json(200, self.status())
+            elif method == 'GET' and parts == ['metrics']:
+                text = metrics.REGISTRY.prometheus_text().encode()
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'text/plain; version=0.0.4')
+                handler.send_header('Content-Length', str(len(text)))
+                handler.end_headers()
+                handler.wfile.write(text)
+            elif method == 'POST' and parts == ['llm', 'generate']:
+                self._generate(handler, body)
+            elif method == 'POST' and parts == ['sessions']:
+                handler.send_json(200, {'session': self.open_session(body.get('name')).id})
+            elif method == 'GET' and parts == ['sessions']:
+                with self._lock:
+                    sessions = list(self.sessions.values())
+                handler.send_json(200, {session.id: self.session_stats(session) for session in sessions})
+            elif len(parts) == 2 and parts[0] == 'sessions' and method in ('GET', 'DELETE'):
+                session = self.session(parts[1])
+                if method == 'DELETE':
+                    self.close_session(session.id)
+                    handler.send_json(200, {'closed': session.id})
+                else:
+                    handler.send_json(200, self.session_stats(session))
+            elif method == 'POST' and len(parts) == 3 and parts[0] == 'sessions' and parts[2] == 'say':
+                self._say(handler, self.session(parts[1]), body)
+            else:
+                handler.send_json(404, {'error': f"no such endpoint: {method} {handler.path}"})
+        except LookupError as e:
+            handler.send_json(404, {'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            handler.close_connection = True
+        except Exception as e:
+            print(f"❌ Daemon request failed: {e}")
+            handler.send_json(500, {'error': str(e)})
+
+    def _say(self, handler, session, body):
+        text = str(body.get('text', "")).strip()
+        if not text:
+            handler.send_json(400, {'error': "nothing to say"})
+            return
+        if not body.get('stream'):
+            handler.send_json(200, self.say(session, text, speak=body.get('speak', False)))
+            return
+
+        handler.start_lines()
+        try:
+            result = self.say(session, text, on_token=lambda token: handler.send_line({'token': token}),
+                              speak=body.get('speak', False))
+            handler.send_line(dict(result, done=True))
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except Exception as e:
+            handler.send_line({'error': str(e), 'done': True})
+        handler.end_lines()
+
+    def _generate(self, handler, body):
+        priority = body.pop('priority', None)
+        who = body.pop('session', None) or 'remote'
+        with self.pool.request(priority, who):
+            if not body.get('stream'):
+                handler.send_json(200, _as_dict(self.pool.generate(**body)))
+                return
+            handler.start_lines()
+            try:
+                for chunk in self.pool.generate(**body):
+                    handler.send_line(_as_dict(chunk))
+            except (BrokenPipeError, ConnectionResetError):
+                raise
+            except Exception as e:
+                handler.send_line({'error': str(e), 'done': True})
+            handler.end_lines()
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+class DaemonClient:
+    """Talks to a running daemon - one kept-open connection per thread"""
+
+    def __init__(self, socket_path=None, timeout=300):
+        self.socket_path = socket_path or setting(load_config(), 'daemon.socket', "robot.sock")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _send(self, method, path, body=None):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                return connection.getresponse()
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.CannotSendRequest):
+                # The daemon closed the connection we kept - nothing was sent, so ask again
+                connection.close()
+        connection = self._local.connection = _UnixConnection(self.socket_path, self.timeout)
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+        except (FileNotFoundError, ConnectionRefusedError):
+            self._local.connection = None
+            raise RuntimeError(f"no robot daemon on {self.socket_path} - start it with start-robot.py --daemon")
+        return connection.getresponse()
+
+    def request(self, method, path, body=None):
+        response = self._send(method, path, body)
+        data = json.loads(response.read() or b"{}")
+        if response.status >= 400:
+            raise RuntimeError(data.get('error', f"daemon answered {response.status}"))
+        return data
+
+    def lines(self, method, path, body=None):
+        """Streamed reply, one dict per line"""
+        response = self._send(method, path, body)
+        if response.status >= 400:
+            data = json.loads(response.read() or b"{}")
+            raise RuntimeError(data.get('error', f"daemon answered {response.status}"))
+        finished = False
+        try:
+            while True:
+                line = response.readline()
+                if not line:
+                    finished = True
+                    return
+                data = json.loads(line)
+                if data.get('error'):
+                    raise RuntimeError(data['error'])
+                yield data
+        finally:
+            if not finished:
+                # Stopped reading halfway - this connection can't be reused
+                self._local.connection.close()
+                self._local.connection = None
+
+    def open_session(self, name=None):
+        return self.request('POST', '/sessions', {'name': name})['session']
+
+    def close_session(self, session_id):
+        return self.request('DELETE', f"/sessions/{session_id}")
+
+    def say(self, session_id, text, stream=False, speak=False):
+        """The reply to one turn - with stream=True, {'token': ...} dicts and then the reply"""
+        body = {'text': text, 'stream': stream, 'speak': speak}
+        if stream:
+            return self.lines('POST', f"/sessions/{session_id}/say", body)
+        return self.request('POST', f"/sessions/{session_id}/say", body)
+
+    def stop(self):
+        return self.request('POST', '/stop')
+
+    def status(self):
+        return self.request('GET', '/status')
+
+class RemoteLLM:
+    """Stand-in for ollama.Client that asks a daemon's shared pool instead of Ollama directly
+
+    Lets simulated robots share one LLM host:
+        Robot(parts={'ai': lambda: RemoteLLM(name="sim-1")})
+    """
+
+    def __init__(self, socket_path=None, name=None, priority=None):
+        self.daemon = DaemonClient(socket_path)
+        self.name = name or f"remote-{os.getpid()}"
+        self.priority = priority
+
+    def generate(self, priority=None, **kwargs):
+        body = dict(kwargs, session=self.name, priority=priority or self.priority)
+        if kwargs.get('stream'):
+            return self.daemon.lines('POST', '/llm/generate', body)
+        return self.daemon.request('POST', '/llm/generate', body)
+
+def serve(llm_only=False):
+    """Start the robot (or only the LLM pool) and serve it until Ctrl+C"""
+    robot = None
+    if not llm_only:
+        from robot import Robot
+        robot = Robot()
+    RobotDaemon(robot).serve_forever()
+
+def console(socket_path=None):
+    """Chat with a running daemon, like start-robot.py does with a local robot"""
+    client = DaemonClient(socket_path)
+    session_id = client.open_session(f"console-{os.getpid()}")
+    print(f"💬 Connected (session {session_id}) - type 'quit' to leave")
+    try:
+        while True:
+            try:
+                text = input("👤 You: ").strip()
+            except EOFError:
+                break
+            if text.lower() in ['quit', 'exit', 'bye']:
+                break
+            if not text:
+                continue
+            try:
+                print("🤖 Robot: ", end="", flush=True)
+                result, streamed = {}, False
+                for line in client.say(session_id, text, stream=True):
+                    if 'token' in line:
+                        streamed = True
+                        print(line['token'], end="", flush=True)
+                    else:
+                        result = line
+                # Commands the robot just did (no AI) come back without tokens
+                print("" if streamed else result.get('reply', ""))
+                timing = result.get('timing', {})
+                print(f"⏱️ queued {timing.get('queue_wait', 0):.2f}s, "
+                      f"first token {timing.get('first_token') or 0:.2f}s, reply {timing.get('total', 0):.2f}s "
+                      f"({result.get('priority')})")
+            except Exception as e:
+                print(f"\n🤖 Robot: Oops! {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            client.close_session(session_id)
+        except Exception:
+            pass
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "serve"
+    if command == "serve":
+        serve(llm_only='--llm-only' in sys.argv)
+    elif command == "console":
+        console()
+    elif command == "stop":
+        print(DaemonClient().stop())
+    elif command == "status":
+        print(json.dumps(DaemonClient().status(), indent=2))
+    else:
+        print("Usage: python3 daemon.py [serve [--llm-only] | console | stop | status]")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Object Detection - A small OpenCV-DNN model running in worker processes
+The camera's newest frame goes to a free worker; frames that arrive while the
+workers are busy (or that are already too old) are skipped, and fewer frames are
+kept in flight when results start missing the max_lag deadline
+
+"ssd"  - MobileNet-SSD (Caffe .caffemodel + .prototxt), 20 everyday classes
+"yolo" - YOLOv8/YOLO11 exported to ONNX, 80 COCO classes
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import cv2
+import numpy as np
+
+import metrics
+
+INFERENCE_SECONDS = metrics.histogram('detection_inference_seconds', "Model run inside a worker")
+LAG_SECONDS = metrics.histogram('detection_lag_seconds', "Frame captured to detections ready")
+FRAMES = metrics.counter('detection_frames', "Camera frames by what the detector did with them", labels=('result',))
+
+VOC_LABELS = ("background,aeroplane,bicycle,bird,boat,bottle,bus,car,cat,chair,cow,diningtable,dog,horse,"
+              "motorbike,person,pottedplant,sheep,sofa,train,tvmonitor").split(",")
+COCO_LABELS = ("person,bicycle,car,motorcycle,airplane,bus,train,truck,boat,traffic light,fire hydrant,"
+               "stop sign,parking meter,bench,bird,cat,dog,horse,sheep,cow,elephant,bear,zebra,giraffe,"
+               "backpack,umbrella,handbag,tie,suitcase,frisbee,skis,snowboard,sports ball,kite,"
+               "baseball bat,baseball glove,skateboard,surfboard,tennis racket,bottle,wine glass,cup,fork,"
+               "knife,spoon,bowl,banana,apple,sandwich,orange,broccoli,carrot,hot dog,pizza,donut,cake,"
+               "chair,couch,potted plant,bed,dining table,toilet,tv,laptop,mouse,remote,keyboard,"
+               "cell phone,microwave,oven,toaster,sink,refrigerator,book,clock,vase,scissors,teddy bear,"
+               "hair drier,toothbrush").split(",")
+
+# box is (x, y, width, height) as fractions of the frame, so it doesn't care about resolution
+Detection = namedtuple('Detection', ['label', 'confidence', 'box'])
+
+def describe_detections(detections, limit=5):
+    """Short text for the AI prompt, e.g. "person (91%, left), cup (66%, center)" """
+    parts = []
+    for detection in sorted(detections, key=lambda d: -d.confidence)[:limit]:
+        x, _, width, _ = detection.box
+        middle = x + width / 2
+        where = "left" if middle < 0.35 else ("right" if middle > 0.65 else "center")
+        parts.append(f"{detection.label} ({detection.confidence:.0%}, {where})")
+    return ", ".join(parts)
+
+# Worker process state - each worker loads the model once
+_net = None
+_options = None
+
+def _init_worker(model, config, kind, labels, threshold, threads):
+    global _net, _options
+    cv2.setNumThreads(threads)
+    _net = cv2.dnn.readNet(model, config) if config else cv2.dnn.readNet(model)
+    _options = {'kind': kind, 'labels': labels, 'threshold': threshold}
+
+def _detect(image):
+    """Run the model on an already-resized image - returns (detections, seconds)"""
+    started = time.perf_counter()
+    if _options['kind'] == 'yolo':
+        detections = _run_yolo(image)
+    else:
+        detections = _run_ssd(image)
+    return detections, time.perf_counter() - started
+
+def _label(index):
+    labels = _options['labels']
+    return labels[index] if 0 <= index < len(labels) else str(index)
+
+def _run_ssd(image):
+    blob = cv2.dnn.blobFromImage(image, 0.007843, image.shape[1::-1], 127.5)
+    _net.setInput(blob)
+    rows = _net.forward().reshape(-1, 7)
+    detections = []
+    for _, class_id, confidence, x1, y1, x2, y2 in rows[rows[:, 2] >= _options['threshold']]:
+        x1, y1, x2, y2 = (min(max(float(value), 0.0), 1.0) for value in (x1, y1, x2, y2))
+        detections.append(Detection(_label(int(class_id)), float(confidence), (x1, y1, x2 - x1, y2 - y1)))
+    return detections
+
+def _run_yolo(image):
+    height, width = image.shape[:2]
+    blob = cv2.dnn.blobFromImage(image, 1 / 255.0, (width, height), swapRB=True)
+    _net.setInput(blob)
+    # (1, 4 + classes, boxes) -> one row per box: cx, cy, w, h, class scores...
+    rows = _net.forward()[0].T
+    scores = rows[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(rows)), class_ids]
+    keep = confidences >= _options['threshold']
+    rows, class_ids, confidences = rows[keep], class_ids[keep], confidences[keep]
+
+    boxes = [[float(cx - w / 2), float(cy - h / 2), float(w), float(h)] for cx, cy, w, h in rows[:, :4]]
+    detections = []
+    for index in np.array(cv2.dnn.NMSBoxes(boxes, confidences.tolist(), _options['threshold'], 0.45)).flatten():
+        x, y, w, h = boxes[index]
+        detections.append(Detection(_label(int(class_ids[index])), float(confidences[index]),
+                                     (x / width, y / height, w / width, h / height)))
+    return detections
+
+class ObjectDetector:
+    """Feeds camera frames to a process pool and keeps the newest detections"""
+
+    def __init__(self, model, config=None, kind="ssd", labels=None, input_size=300, confidence=0.5,
+                 workers=1, threads_per_worker=1, max_lag=0.5):
+        if not os.path.exists(model) or (config and not os.path.exists(config)):
+            raise RuntimeError(f"model not found at {model}")
+        if isinstance(labels, str):
+            with open(labels) as f:
+                labels = [line.strip() for line in f if line.strip()]
+        labels = labels or (COCO_LABELS if kind == "yolo" else VOC_LABELS)
+
+        self.kind = kind
+        self.input_size = input_size
+        self.workers = workers
+        self.max_lag = max_lag
+
+        self._worker_args = (model, config, kind, labels, confidence, threads_per_worker)
+        self.pool = self._make_pool()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        # Frames allowed in flight - lowered while results come back later than max_lag
+        self.max_in_flight = workers
+        self._next_submit_at = 0.0
+        self.detections = []
+        self.detected_at = None       # when the frame behind self.detections was captured
+        self._feeder = None
+        self._running = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.skipped_busy = 0
+        self.skipped_old = 0
+        self.late_results = 0
+        self.failures = 0
+        self.restarts = 0
+        self.fps = 0.0
+        self._interval = None         # smoothed seconds between results
+        self._last_result_at = None
+        self.latency = 0.0            # smoothed capture-to-result seconds
+        # Recent (lag, inference) seconds for percentiles
+        self.recent = deque(maxlen=512)
+
+        # Load the model in every worker now, so the first real frame isn't slow
+        warmup = np.zeros((input_size, input_size, 3), dtype=np.uint8)
+        for future in [self.pool.submit(_detect, warmup) for _ in range(workers)]:
+            future.result()
+        print(f"🔍 Object detector ready ({kind}, {workers} worker{'s' if workers > 1 else ''}, "
+              f"results at most {max_lag}s behind)")
+
+    def _make_pool(self):
+        # spawn, not fork - the robot already has threads running that a fork would copy mid-flight
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=self._worker_args,
+        )
+
+    def _restart_pool(self, broken):
+        """A worker died (killed for memory, say) - the pool is unusable, so start a new one"""
+        with self._lock:
+            if self.pool is not broken:
+                return  # someone else already did
+            self.pool = self._make_pool()
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        print("⚠️ Object detection worker died - started new workers")
+
+    def submit(self, frame, captured_at=None):
+        """Hand a frame to a free worker - returns False if it was skipped"""
+        now = time.monotonic()
+        captured_at = captured_at or now
+        if now - captured_at > self.max_lag:
+            self.skipped_old += 1
+            FRAMES.labels('too_old').inc()
+            return False
+        with self._lock:
+            # Spread frames over the workers instead of handing them two frames in a row
+            if self.in_flight >= self.max_in_flight or now < self._next_submit_at:
+                self.skipped_busy += 1
+                FRAMES.labels('busy').inc()
+                return False
+            self.in_flight += 1
+            self._next_submit_at = now + self.latency / self.max_in_flight
+
+        pool = self.pool
+        try:
+            # Shrink here so only a small image crosses to the worker process
+            image = cv2.resize(frame, (self.input_size, self.input_size), interpolation=cv2.INTER_AREA)
+            future = pool.submit(_detect, image)
+        except Exception as e:
+            # Nothing is in flight after all - otherwise every later frame looks "busy"
+            with self._lock:
+                self.in_flight -= 1
+                self.failures += 1
+            if isinstance(e, BrokenProcessPool):
+                self._restart_pool(pool)
+            else:
+                print(f"❌ Object detection failed: {e}")
+            return False
+        future.add_done_callback(lambda done: self._finished(done, captured_at, pool))
+        self.submitted += 1
+        FRAMES.labels('submitted').inc()
+        return True
+
+    def _finished(self, future, captured_at, pool):
+        now = time.monotonic()
+        try:
+            detections, seconds = future.result()
+        except BrokenProcessPool:
+            with self._lock:
+                self.in_flight -= 1
+                self.failures += 1
+            self._restart_pool(pool)
+            return
+        except Exception as e:
+            with self._lock:
+                self.in_flight -= 1
+                self.failures += 1
+            print(f"❌ Object detection failed: {e}")
+            return
+
+        with self._lock:
+            self.in_flight -= 1
+
+            INFERENCE_SECONDS.observe(seconds)
+            lag = now - captured_at
+            LAG_SECONDS.observe(lag)
+            self.recent.append((lag, seconds))
+            self.latency += 0.2 * (lag - self.latency) if self.completed else lag
+            self.completed += 1
+            if lag > self.max_lag:
+                # Workers sharing too few cores slow each other down - keep fewer frames going
+                self.late_results += 1
+                self.max_in_flight = max(1, self.max_in_flight - 1)
+            elif lag < self.max_lag / 2 and self.max_in_flight < self.workers:
+                self.max_in_flight += 1
+            if self._last_result_at is not None:
+                interval = now - self._last_result_at
+                self._interval = interval if self._interval is None else self._interval + 0.1 * (interval - self._interval)
+                self.fps = 1.0 / self._interval if self._interval else 0.0
+            self._last_result_at = now
+
+            # Results can finish out of order with several workers - keep the newest frame's
+            if self.detected_at is None or captured_at > self.detected_at:
+                self.detections = detections
+                self.detected_at = captured_at
+
+    def latest(self, max_age=None):
+        """Newest detections, or None if there are none from the last max_age seconds"""
+        max_age = self.max_lag * 4 if max_age is None else max_age
+        with self._lock:
+            if self.detected_at is None or time.monotonic() - self.detected_at > max_age:
+                return None
+            return list(self.detections)
+
+    def describe(self, max_age=None):
+        """What the camera sees right now, for the AI prompt ("" if not known)"""
+        detections = self.latest(max_age)
+        if detections is None:
+            return ""
+        return describe_detections(detections) or "nothing recognisable"
+
+    def start(self, camera):
+        """Keep detecting on the camera's background grabber frames"""
+        if self._running:
+            return
+        camera.start_grabber()
+        if not camera.grabber_running:
+            print("⚠️ Object detection needs camera frames - not started")
+            return
+        self._running = True
+        self._feeder = threading.Thread(target=self._feed_loop, args=(camera,), daemon=True)
+        self._feeder.start()
+
+    def _feed_loop(self, camera):
+        """Feeder thread - offer each new camera frame, skipping whatever can't be kept up with"""
+        seq = 0
+        while self._running and camera.grabber_running:
+            seq = camera.wait_for_frame(seq)
+            frame, age = camera.latest_frame()
+            if frame is None:
+                continue
+            try:
+                self.submit(frame, time.monotonic() - age)
+            except Exception as e:
+                self.failures += 1
+                print(f"❌ Object detection error: {e}")
+                time.sleep(self.max_lag)
+
+    def stats(self):
+        """Throughput, lag and how many frames were skipped"""
+        with self._lock:
+            lags = sorted(lag for lag, _ in self.recent)
+            inference = sorted(seconds for _, seconds in self.recent)
+
+        def _percentile(values, point):
+            return values[min(len(values) - 1, int(point * len(values)))] if values else 0.0
+
+        return {
+            'fps': round(self.fps, 2),
+            'latency': self.latency,
+            'latency_p50': _percentile(lags, 0.5),
+            'latency_p99': _percentile(lags, 0.99),
+            'latency_max': lags[-1] if lags else 0.0,
+            'inference_p50': _percentile(inference, 0.5),
+            'inference_p90': _percentile(inference, 0.9),
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight,
+            'skipped_busy': self.skipped_busy,
+            'skipped_old': self.skipped_old,
+            'late_results': self.late_results,
+            'failures': self.failures,
+            'restarts': self.restarts,
+            'objects': len(self.detections),
+        }
+
+    def shutdown(self):
+        """Stop feeding and close the worker processes"""
+        self._running = False
+        if self._feeder and self._feeder is not threading.current_thread():
+            self._feeder.join(timeout=2)
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,60 +1,183 @@
 #!/usr/bin/env python3
 """
 Auto-detects what hardware is connected
+Probes each device once, remembers the answer between restarts,
+and hands the opened camera straight to Camera
 """
-import subprocess
+import glob
+import json
 import os
+import re
+from config import load_config, setting
 
 class Hardware:
-    def __init__(self):
+    def __init__(self, use_cache=True):
+        self.config = load_config()
+        self.cache_file = setting(self.config, 'hardware.inventory_cache', ".hardware_cache.json")
+        self.camera_index = setting(self.config, 'hardware.camera.index', 0)
+        
         self.components = {}
-        self.scan_hardware()
+        self._summary = None
+        
+        # Cameras opened while probing, kept open for Camera to take over
+        self._open_cameras = {}
+        
+        self.scan_hardware(use_cache)
     
-    def scan_hardware(self):
+    def scan_hardware(self, use_cache=True):
         """Scan for connected hardware"""
         print("🔍 Scanning your hardware...")
+        self._summary = None
         
         # Check if Raspberry Pi
         if os.path.exists('/proc/device-tree/model'):
             with open('/proc/device-tree/model', 'r') as f:
-                self.components['board'] = f.read().strip()
+                board = f.read().strip().rstrip('\x00')
         else:
-            self.components['board'] = "Computer"
+            board = "Computer"
+        
+        video_nodes = sorted(glob.glob('/dev/video*'))
+        cache_key = {'board': board, 'video_nodes': video_nodes, 'camera_index': self.camera_index}
         
-        # Check for camera
-        self.components['camera'] = self.check_camera()
+        # Nothing plugged in or out since last time? Then we already know the answer
+        cached = self._load_cache(cache_key) if use_cache else None
+        if cached is not None:
+            self.components = cached
+            # Pins come from config.json, which may have been edited since
+            self._add_gpio_components()
+            print("♻️ Hardware unchanged since last scan - skipped probing")
+            return
         
-        # Check for GPIO devices (assume common setup)
-        self.components['motors'] = "GPIO 17,18,22,23 (assumed)"
-        self.components['led'] = "GPIO 4 (assumed)"
+        self.components = {'board': board}
         
+        # Check for cameras
+        self.components['cameras'] = self.check_cameras(video_nodes)
+        self.components['camera'] = self.components['cameras'].get(
+            f"/dev/video{self.camera_index}", "Not found"
+        )
+        
+        self._add_gpio_components()
+        # A camera that was busy or slow to start shouldn't be "Not found" until something is replugged
+        probe_failed = (not self.components['camera'].startswith("Connected")
+                        or "Error checking" in self.components['cameras'].values())
+        if not probe_failed:
+            self._save_cache(cache_key)
         print("✅ Hardware scan complete!")
     
-    def check_camera(self):
-        """Check if camera is available"""
+    def _add_gpio_components(self):
+        """GPIO devices come from config.json - never from the probe cache"""
+        for name in ('motors', 'led', 'ultrasonic'):
+            self.components.pop(name, None)
+        self.components['motors'] = self._motor_pins_text()
+        led = setting(self.config, 'hardware.sensors.led_status')
+        if led is not None:
+            self.components['led'] = f"GPIO {led}"
+        trigger = setting(self.config, 'hardware.sensors.ultrasonic_trigger')
+        echo = setting(self.config, 'hardware.sensors.ultrasonic_echo')
+        if trigger is not None and echo is not None:
+            self.components['ultrasonic'] = f"GPIO {trigger} trigger, {echo} echo"
+    
+    def _motor_pins_text(self):
+        """Motor pins as configured (L298N style defaults)"""
+        pins = setting(self.config, 'hardware.motor_pins', {})
+        order = ['left_forward', 'left_backward', 'right_forward', 'right_backward']
+        defaults = [17, 18, 22, 23]
+        return "GPIO " + ",".join(str(pins.get(name, pin)) for name, pin in zip(order, defaults))
+    
+    def check_cameras(self, video_nodes):
+        """Try every /dev/video* node once - keep working ones open for Camera"""
+        cameras = {}
         try:
-            # Try to access camera
             import cv2
-            cap = cv2.VideoCapture(0)
-            if cap.isOpened():
-                ret, frame = cap.read()
+        except ImportError:
+            return {node: "Error checking" for node in video_nodes}
+        
+        for node in video_nodes:
+            match = re.search(r'(\d+)$', node)
+            if not match:
+                continue
+            index = int(match.group(1))
+            
+            try:
+                cap = cv2.VideoCapture(index)
+                ret, frame = cap.read() if cap.isOpened() else (False, None)
+            except Exception:
+                cameras[node] = "Error checking"
+                continue
+            
+            if ret:
+                height, width = frame.shape[:2]
+                cameras[node] = f"Connected ({node}, {width}x{height})"
+                self._open_cameras[index] = cap
+            else:
+                # Most USB cameras also have a metadata node that gives no frames
                 cap.release()
-                if ret:
-                    return "Connected (/dev/video0)"
-            return "Not found"
-        except:
-            return "Error checking"
+        
+        return cameras
+    
+    def check_camera(self):
+        """Check if camera is available"""
+        return self.components.get('camera', "Not found")
+    
+    def take_camera(self, index):
+        """Hand over the camera opened during the scan (None if there isn't one)"""
+        return self._open_cameras.pop(index, None)
+    
+    def release_unclaimed(self):
+        """Close any probed camera nobody took"""
+        for cap in self._open_cameras.values():
+            cap.release()
+        self._open_cameras.clear()
+    
+    def _load_cache(self, cache_key):
+        """Last scan's results, if the board and device nodes are the same"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if saved.get('key') != cache_key:
+            return None
+        return saved.get('components')
+    
+    def _save_cache(self, cache_key):
+        """Remember this scan for next startup"""
+        try:
+            tmp_path = f"{self.cache_file}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'key': cache_key, 'components': self.components}, f, indent=2)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"⚠️ Could not save hardware scan: {e}")
     
     def summary(self):
-        """Create simple hardware summary"""
+        """Create simple hardware summary (built once per scan)"""
+        if self._summary is not None:
+            return self._summary
+        
         parts = []
         if 'board' in self.components:
             parts.append(f"Board: {self.components['board']}")
         if 'camera' in self.components:
             parts.append(f"Camera: {self.components['camera']}")
+        
+        # Mention extra working cameras too
+        others = [status for node, status in self.components.get('cameras', {}).items()
+                  if node != f"/dev/video{self.camera_index}" and status.startswith("Connected")]
+        if others:
+            parts.append(f"Other cameras: {'; '.join(others)}")
+        
         if 'motors' in self.components:
             parts.append(f"Motors: {self.components['motors']}")
         if 'led' in self.components:
             parts.append(f"LED: {self.components['led']}")
+        if 'ultrasonic' in self.components:
+            parts.append(f"Ultrasonic: {self.components['ultrasonic']}")
         
-        return ", ".join(parts) 
+        self._summary = ", ".join(parts)
+        return self._summary
+    
+    def __del__(self):
+        """Don't leave probed cameras open"""
+        self.release_unclaimed()
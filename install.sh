@@ -12,7 +12,18 @@ ollama pull tinyllama
 
 # Install Python packages
 echo "🐍 Installing robot dependencies..."
-pip3 install gpiozero opencv-python pillow speechrecognition pyaudio
+# The live view is served to a browser (port 8080), so OpenCV needs no GUI libraries.
+# It is off and local-only by default - see streaming.py before opening it to your network
+pip3 install gpiozero opencv-python-headless pillow speechrecognition pyaudio
+
+# Optional: offline speech recognition (set "recognizer": "vosk" in config.json)
+# pip3 install vosk
+# Model: https://alphacephei.com/vosk/models (unzip into models/)
+
+# Optional: object detection (set hardware.camera.detection.enabled to true in config.json;
+# it keeps the camera grabbing frames all the time): MobileNet-SSD for OpenCV's DNN module
+# Put MobileNetSSD_deploy.prototxt and MobileNetSSD_deploy.caffemodel into models/
+# (or a YOLOv8n .onnx export with "kind": "yolo", "config": null, "input_size": 320)
 
 echo ""
 echo "✅ Installation complete!"
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Intent Matcher - Spots simple commands ("forward 3 seconds", "turn left slowly")
+Regexes are built once from a vocabulary, so matching takes microseconds
+"""
+import re
+
+DEFAULT_VOCABULARY = {
+    'actions': {
+        'stop': ["stop", "halt", "freeze"],
+        # "back" and "straight" alone are everyday words ("welcome back") - only with a verb
+        'forward': ["forward", "forwards", "ahead", "go straight", "drive straight"],
+        'backward': ["backward", "backwards", "back up", "go back", "move back", "drive back", "reverse"],
+        'left': ["left"],
+        'right': ["right"],
+        'look': ["what do you see", "look", "see", "camera"],
+    },
+    'command_words': ["move", "go", "drive", "roll", "turn", "spin", "rotate"],
+    'speeds': {"very slowly": 30, "slowly": 40, "slow": 40, "quickly": 100, "fast": 100},
+    'min_confidence': 0.8,
+    # Less sure than min_confidence, but enough to act on alongside the AI's answer
+    'act_confidence': 0.5,
+    'skip_llm': False,
+}
+
+MOTION_ACTIONS = ('forward', 'backward', 'left', 'right')
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "half a": 0.5,
+}
+
+def _words_pattern(words):
+    """Regex that matches any of the words/phrases as whole words"""
+    phrases = sorted(words, key=len, reverse=True)
+    alternatives = "|".join(r"\s+".join(re.escape(part) for part in phrase.split()) for phrase in phrases)
+    return re.compile(rf"\b(?:{alternatives})\b")
+
+class Intent:
+    """A recognised command and how sure we are about it"""
+
+    def __init__(self, action, confidence, seconds=None, speed=None):
+        self.action = action
+        self.confidence = confidence
+        self.seconds = seconds
+        self.speed = speed
+
+    def describe(self):
+        """Short human sentence for what the robot is about to do"""
+        if self.action == 'stop':
+            return "Stopping!"
+        if self.action == 'look':
+            return "Taking a look!"
+
+        names = {'forward': "Moving forward", 'backward': "Moving backward",
+                 'left': "Turning left", 'right': "Turning right"}
+        text = names[self.action]
+        if self.seconds:
+            text += f" for {self.seconds:g} seconds"
+        return text + "!"
+
+    def __repr__(self):
+        return f"Intent({self.action}, confidence={self.confidence:.2f}, seconds={self.seconds}, speed={self.speed})"
+
+class IntentMatcher:
+    def __init__(self, vocabulary=None):
+        vocabulary = dict(DEFAULT_VOCABULARY, **(vocabulary or {}))
+        self.min_confidence = vocabulary['min_confidence']
+        self.act_confidence = vocabulary['act_confidence']
+        self.skip_llm = vocabulary['skip_llm']
+
+        # Compile everything once
+        self.action_patterns = {action: _words_pattern(words)
+                                for action, words in vocabulary['actions'].items()}
+        self.command_pattern = _words_pattern(vocabulary['command_words'])
+        self.speeds = [(_words_pattern([word]), speed) for word, speed in
+                       sorted(vocabulary['speeds'].items(), key=lambda item: -len(item[0]))]
+
+        numbers = "|".join(re.escape(word) for word in NUMBER_WORDS)
+        self.duration_pattern = re.compile(
+            rf"\b(\d+(?:\.\d+)?|{numbers})\s*(?:seconds?|secs?|s)\b"
+        )
+        self.percent_pattern = re.compile(r"\b(\d{1,3})\s*(?:%|percent)")
+        self.question_pattern = re.compile(
+            r"^(?:what|why|where|who|how|which|is|are|does|did|was|were)\b"
+        )
+        self.negation_pattern = re.compile(r"\b(?:don't|dont|do not|never|not)\b")
+        self.commitment_pattern = re.compile(
+            r"\b(?:i'll|i will|i'm going to|i am going to|let me|moving|turning|heading|rolling)\b"
+        )
+
+    def match(self, text):
+        """Best intent in the text, or None"""
+        intents = self.match_all(text)
+        return intents[0] if intents else None
+
+    def match_all(self, text):
+        """Every intent in the text - a movement and a look can come together"""
+        text = text.lower().strip()
+        found = [action for action, pattern in self.action_patterns.items() if pattern.search(text)]
+        if not found:
+            return []
+
+        negated = bool(self.negation_pattern.search(text))
+
+        # Stop always wins - but "don't stop" isn't a stop
+        if 'stop' in found:
+            return [Intent('stop', 0.2 if negated else 1.0)]
+
+        intents = []
+        motions = [action for action in found if action in MOTION_ACTIONS]
+        if motions:
+            intents.append(self._motion_intent(text, motions, negated))
+
+        if 'look' in found:
+            # "what do you see" / "look around" are clear, "camera" alone less so
+            confidence = 0.9 if re.search(r"\b(?:look|see)\b", text) else 0.6
+            intents.append(Intent('look', 0.2 if negated else confidence))
+
+        return sorted(intents, key=lambda intent: -intent.confidence)
+
+    def match_reply(self, sentence):
+        """Intents the AI committed to in its own words ("I'll turn left now")"""
+        text = sentence.lower()
+        if not self.commitment_pattern.search(text) or self.negation_pattern.search(text):
+            return []
+        return [intent for intent in self.actionable(text) if intent.action != 'stop']
+
+    def _motion_intent(self, text, motions, negated):
+        """Work out direction, duration, speed and confidence for a movement"""
+        # "turn left" mentions only left; "left and right" is ambiguous
+        if len(motions) > 1:
+            confidence = 0.3
+        else:
+            confidence = 0.6
+            starts_with_direction = self.action_patterns[motions[0]].match(text)
+            if self.command_pattern.search(text) or starts_with_direction:
+                confidence = 0.95
+
+        if self.question_pattern.search(text):
+            confidence -= 0.4
+        if negated:
+            confidence = 0.1
+
+        seconds = None
+        duration = self.duration_pattern.search(text)
+        if duration:
+            value = duration.group(1)
+            seconds = NUMBER_WORDS.get(value) or float(value)
+
+        speed = None
+        percent = self.percent_pattern.search(text)
+        if percent:
+            speed = max(0, min(100, int(percent.group(1))))
+        else:
+            for pattern, word_speed in self.speeds:
+                if pattern.search(text):
+                    speed = word_speed
+                    break
+
+        return Intent(motions[0], max(0.0, confidence), seconds, speed)
+
+    def actionable(self, text):
+        """Intents sure enough to act on once the AI has had its say"""
+        return [intent for intent in self.match_all(text) if intent.confidence >= self.act_confidence]
+
+    def is_confident(self, intent):
+        """Sure enough to act without asking the AI first?"""
+        return intent is not None and intent.confidence >= self.min_confidence
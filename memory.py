@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Conversation Memory - What was said so far, kept to a fixed token budget
+Recent turns are kept word for word; once they add up to more than the budget,
+the oldest are folded into a short rolling summary by the AI on a background
+thread, so the prompt (and the time to read it) stays the same size however
+long the conversation goes on
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+Turn = namedtuple('Turn', ['human', 'robot', 'tokens'])
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English with Llama-style tokenizers)"""
+    return len(text) // 4 + 1 if text else 0
+
+class ConversationMemory:
+    """Recent turns plus a summary of everything before them"""
+
+    def __init__(self, summarize=None, budget_tokens=600, max_turns=32, summary_tokens=150):
+        # summarize(text, max_tokens) -> summary; without it, folded turns are just forgotten
+        self.summarize = summarize
+        self.budget_tokens = budget_tokens
+        self.summary_tokens = summary_tokens
+        self.turns = deque(maxlen=max_turns)
+        self.folding = []                 # turns taken out of self.turns, waiting to be summarised
+        self.summary = ""
+        # Running total of summary + folding + turns, kept up to date on every change
+        self.tokens = 0
+        self.lock = threading.Lock()
+        self._summarizer = None
+        self._reset = False
+
+        self.summaries = 0
+        self.folded_turns = 0
+        self.forgotten_turns = 0
+        self.failures = 0
+        self.summary_seconds = 0.0
+
+    def add(self, human, robot, robot_tokens=None):
+        """Remember one turn (robot_tokens: Ollama's eval_count when known)"""
+        tokens = estimate_tokens(human) + (robot_tokens or estimate_tokens(robot))
+        with self.lock:
+            if len(self.turns) == self.turns.maxlen:
+                # Full - the oldest goes to the summary instead of falling off the end
+                self.folding.append(self.turns.popleft())
+            self.turns.append(Turn(human, robot, tokens))
+            self.tokens += tokens
+            if self.tokens > self.budget_tokens or self.folding:
+                self._fold()
+
+    def _fold(self):
+        """Move the oldest turns out until the recent ones fit in half the budget (holding the lock)"""
+        recent = sum(turn.tokens for turn in self.turns)
+        # Half, so this happens every few turns instead of every turn
+        while len(self.turns) > 1 and recent > self.budget_tokens // 2:
+            turn = self.turns.popleft()
+            recent -= turn.tokens
+            self.folding.append(turn)
+
+        if self._summarizer is not None and self._summarizer.is_alive():
+            return
+        if self.summarize is None:
+            self._apply(len(self.folding), self.summary, forgotten=True)
+            return
+        batch, summary = list(self.folding), self.summary
+        self._summarizer = threading.Thread(target=self._summarize, args=(batch, summary), daemon=True)
+        self._summarizer.start()
+
+    def _summarize(self, batch, summary):
+        """Summary thread - fold a batch of old turns into the summary"""
+        started = time.monotonic()
+        lines = [f"So far: {summary}"] if summary else []
+        lines += [f"Human: {turn.human}\nRobot: {turn.robot}" for turn in batch]
+        try:
+            new_summary = self.summarize("\n".join(lines), self.summary_tokens).strip()
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ Couldn't summarise the conversation, forgetting the oldest part: {e}")
+            new_summary = None
+
+        with self.lock:
+            self.summary_seconds += time.monotonic() - started
+            if new_summary is None:
+                self._apply(len(batch), self.summary, forgotten=True)
+            else:
+                self.summaries += 1
+                self._apply(len(batch), new_summary)
+            # Turns that came in meanwhile may already need folding again
+            if self.tokens > self.budget_tokens:
+                self._fold()
+
+    def _apply(self, count, summary, forgotten=False):
+        """Swap the first count folding turns for a summary (holding the lock)"""
+        folded = self.folding[:count]
+        del self.folding[:count]
+        self.tokens += (estimate_tokens(summary) - estimate_tokens(self.summary)
+                        - sum(turn.tokens for turn in folded))
+        self.summary = summary
+        if forgotten:
+            self.forgotten_turns += count
+        else:
+            self.folded_turns += count
+        # The AI's cached context still holds the folded turns word for word
+        self._reset = True
+
+    def take_reset(self):
+        """True once after turns were folded - time to rebuild the prompt from render()"""
+        with self.lock:
+            reset, self._reset = self._reset, False
+            return reset
+
+    def render(self):
+        """The conversation so far, for the prompt ("" at the start)"""
+        with self.lock:
+            lines = [f"Earlier in this conversation: {self.summary}"] if self.summary else []
+            lines += [f"Human: {turn.human}\nYou: {turn.robot}"
+                      for turn in list(self.folding) + list(self.turns)]
+        return "\n".join(lines)
+
+    def is_empty(self):
+        """Nothing said yet (or everything cleared)"""
+        with self.lock:
+            return not (self.turns or self.folding or self.summary)
+
+    def clear(self):
+        with self.lock:
+            self.turns.clear()
+            self.folding = []
+            self.summary = ""
+            self.tokens = 0
+
+    def wait_idle(self, timeout=None):
+        """Wait for a summary that is being written (tests, benchmarks, shutdown)"""
+        summarizer = self._summarizer
+        if summarizer is not None:
+            summarizer.join(timeout)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'tokens': self.tokens,
+                'budget_tokens': self.budget_tokens,
+                'turns': len(self.turns),
+                'folding': len(self.folding),
+                'summary_tokens': estimate_tokens(self.summary),
+                'summaries': self.summaries,
+                'folded_turns': self.folded_turns,
+                'forgotten_turns': self.forgotten_turns,
+                'failures': self.failures,
+                'summary_seconds': self.summary_seconds,
+            }
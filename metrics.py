@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Metrics - How long each stage takes, kept as fixed-bucket histograms in memory
+Served as Prometheus text on localhost and written to a snapshot file now and then,
+once metrics.enabled is set to true in config.json (off by default)
+
+    LISTEN = metrics.histogram('voice_listen_seconds', "Time spent in Voice.listen")
+    with LISTEN.time():
+        ...
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import load_config, setting
+
+# 1 ms .. 30 s - covers a PWM write as well as a slow LLM reply
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+# 10 us .. 100 ms - for calls that should return almost at once
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+class _Timer:
+    """Context manager that adds its duration to a histogram"""
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+class Histogram:
+    """Counts of observations per bucket, plus their sum"""
+
+    def __init__(self, name, help="", buckets=DEFAULT_BUCKETS, labels=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.label_values = labels
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+            if value > self.max:
+                self.max = value
+
+    def time(self):
+        """with histogram.time(): ... - times the block"""
+        return _Timer(self)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q):
+        """Rough quantile from the buckets (upper edge of the bucket it falls in)"""
+        counts, _, count = self.snapshot()
+        if not count:
+            return None
+        target = q * count
+        seen = 0
+        for edge, bucket_count in zip(self.buckets, counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(edge, self.max)
+        return self.max
+
+class Counter:
+    """A number that only goes up"""
+
+    def __init__(self, name, help="", labels=()):
+        self.name = name
+        self.help = help
+        self.label_values = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+class _Family:
+    """A metric name with one child per set of label values"""
+
+    def __init__(self, kind, name, help, label_names, **options):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.options = options
+        self.children = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self.children[()] = self._make(())
+
+    def _make(self, values):
+        if self.kind == 'histogram':
+            return Histogram(self.name, self.help, labels=values, **self.options)
+        return Counter(self.name, self.help, labels=values)
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(values, self._make(values))
+        return child
+
+class Metrics:
+    """All metrics of one process"""
+
+    def __init__(self):
+        self.families = {}
+        self.collectors = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def _family(self, kind, name, help, labels, **options):
+        with self._lock:
+            family = self.families.get(name)
+            if family is None:
+                family = self.families[name] = _Family(kind, name, help, labels, **options)
+        # Without labels, hand back the metric itself so callers can use it directly
+        return family if family.label_names else family.children[()]
+
+    def histogram(self, name, help="", labels=(), buckets=DEFAULT_BUCKETS):
+        return self._family('histogram', name, help, labels, buckets=buckets)
+
+    def counter(self, name, help="", labels=()):
+        return self._family('counter', name, help, labels)
+
+    def register_collector(self, name, collect):
+        """collect() returns a dict of numbers, exported as gauges name_key"""
+        self.collectors[name] = collect
+
+    def collect_gauges(self):
+        gauges = {}
+        for name, collect in list(self.collectors.items()):
+            try:
+                values = collect() or {}
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    gauges[f"{name}_{key}"] = value
+        return gauges
+
+    def prometheus_text(self):
+        """Everything in Prometheus' text format"""
+        lines = []
+        for family in list(self.families.values()):
+            full_name = f"robot_{family.name}"
+            lines.append(f"# HELP {full_name} {family.help}")
+            lines.append(f"# TYPE {full_name} {family.kind}")
+            for values, child in list(family.children.items()):
+                labels = [f'{key}="{value}"' for key, value in zip(family.label_names, values)]
+                if family.kind == 'counter':
+                    lines.append(f"{full_name}_total{_labels(labels)} {child.value}")
+                    continue
+                counts, total, count = child.snapshot()
+                cumulative = 0
+                for edge, bucket_count in zip(child.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = 'le="+Inf"' if edge == float('inf') else f'le="{edge:g}"'
+                    lines.append(f"{full_name}_bucket{_labels(labels + [le])} {cumulative}")
+                lines.append(f"{full_name}_sum{_labels(labels)} {total:.6f}")
+                lines.append(f"{full_name}_count{_labels(labels)} {count}")
+
+        for name, value in sorted(self.collect_gauges().items()):
+            lines.append(f"# TYPE robot_{name} gauge")
+            lines.append(f"robot_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Everything as a dict (for the snapshot file)"""
+        result = {'time': time.time(), 'uptime': time.time() - self.started,
+                  'histograms': {}, 'counters': {}, 'gauges': self.collect_gauges()}
+        for family in list(self.families.values()):
+            for values, child in list(family.children.items()):
+                key = family.name + "".join(f"[{value}]" for value in values)
+                if family.kind == 'counter':
+                    result['counters'][key] = child.value
+                    continue
+                counts, total, count = child.snapshot()
+                result['histograms'][key] = {
+                    'count': count, 'sum': round(total, 6),
+                    'mean': total / count if count else None, 'max': child.max,
+                    'p50': child.quantile(0.5), 'p90': child.quantile(0.9), 'p99': child.quantile(0.99),
+                    'buckets': dict(zip([f"{edge:g}" for edge in child.buckets] + ["+Inf"], counts)),
+                }
+        return result
+
+    def write_snapshot(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+def _labels(labels):
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+# The one every module records into
+REGISTRY = Metrics()
+histogram = REGISTRY.histogram
+counter = REGISTRY.counter
+register_collector = REGISTRY.register_collector
+
+def timed(metric):
+    """Decorator - time every call of a function into a histogram"""
+    def _decorate(function):
+        def _timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - started)
+        _timed.__name__ = function.__name__
+        _timed.__doc__ = function.__doc__
+        return _timed
+    return _decorate
+
+class MetricsServer:
+    """Serves /metrics (Prometheus) and /metrics.json on localhost, and writes snapshots"""
+
+    def __init__(self, port=9108, snapshot_file=None, snapshot_seconds=30, registry=REGISTRY):
+        self.registry = registry
+        self.snapshot_file = snapshot_file
+        self.snapshot_seconds = snapshot_seconds
+        self.server = None
+        self._stopping = threading.Event()
+
+        if port is not None:
+            try:
+                self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+                self.server.daemon_threads = True
+                threading.Thread(target=self.server.serve_forever, daemon=True).start()
+                print(f"📈 Metrics on http://127.0.0.1:{self.server.server_address[1]}/metrics")
+            except OSError as e:
+                print(f"⚠️ Metrics endpoint not started: {e}")
+
+        if snapshot_file:
+            threading.Thread(target=self._snapshot_loop, daemon=True).start()
+
+    def _handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, kind = registry.prometheus_text().encode(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, kind = json.dumps(registry.snapshot()).encode(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', kind)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def _snapshot_loop(self):
+        while not self._stopping.wait(self.snapshot_seconds):
+            self.save_snapshot()
+
+    def save_snapshot(self):
+        try:
+            self.registry.write_snapshot(self.snapshot_file)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics snapshot: {e}")
+
+    def stop(self):
+        self._stopping.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.snapshot_file:
+            self.save_snapshot()
+
+_server = None
+
+def start_metrics(config=None):
+    """Start the endpoint and snapshot writer if config.json turns them on (once per process)"""
+    global _server
+    config = config or load_config()
+    if not setting(config, 'metrics.enabled', False):
+        return None
+    if _server is None:
+        _server = MetricsServer(
+            port=setting(config, 'metrics.port', 9108),
+            snapshot_file=setting(config, 'metrics.snapshot_file', "metrics.json"),
+            snapshot_seconds=setting(config, 'metrics.snapshot_seconds', 30),
+        )
+    return _server
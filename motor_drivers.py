@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Motor Drivers - How duty cycles reach the four L298N input pins
+"pigpio" times PWM with DMA in the pigpiod daemon (no Python threads, steady under load).
+         The daemon keeps the last duty after we exit, so it is only used when asked for by name
+"lgpio" uses lgpio's PWM (Pi 5 and newer kernels)
+"rpi_gpio" is RPi.GPIO software PWM (the original way)
+"fake" keeps everything in memory and timestamps writes (benchmarks, machines without GPIO)
+Every driver only writes channels whose duty actually changed
+"""
+import atexit
+import signal
+import threading
+import time
+
+try:
+    import RPi.GPIO as GPIO
+except ImportError:
+    GPIO = None
+
+try:
+    import pigpio
+except ImportError:
+    pigpio = None
+
+try:
+    import lgpio
+except ImportError:
+    lgpio = None
+
+CHANNELS = ('left_forward', 'left_backward', 'right_forward', 'right_backward')
+
+def _exit_on_signal(number, frame):
+    raise SystemExit(128 + number)
+
+def exit_cleanly_on_signals():
+    """Turn SIGTERM/SIGHUP into a normal exit, so atexit cleanup runs (only where nobody else handles them)"""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for number in (signal.SIGTERM, signal.SIGHUP):
+        if signal.getsignal(number) == signal.SIG_DFL:
+            signal.signal(number, _exit_on_signal)
+
+class MotorDriver:
+    """Keeps the duty last written to each channel and passes on only the changes"""
+    name = "base"
+    has_pwm = True
+
+    def __init__(self, pins, frequency=1000):
+        # pins: channel name -> BCM pin number
+        self.pins = {channel: pins[channel] for channel in CHANNELS}
+        self.frequency = frequency
+        self.duty = dict.fromkeys(CHANNELS, 0.0)
+        self.last_write_at = None
+        self.calls = 0
+        self.channel_writes = 0
+        self.skipped = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def apply(self, duties):
+        """Set channels to duty percentages (0-100) - returns how many actually changed"""
+        with self._lock:
+            changes = {channel: duty for channel, duty in duties.items() if self.duty[channel] != duty}
+            self.skipped += len(duties) - len(changes)
+            if changes:
+                self._write(changes)
+                self._wrote(changes)
+            return len(changes)
+
+    def stop(self):
+        """Every channel to 0 in as few writes as the library allows"""
+        with self._lock:
+            changes = {channel: 0.0 for channel, duty in self.duty.items() if duty}
+            self._write_stop(changes)
+            self._wrote(changes)
+
+    def _wrote(self, changes):
+        self.duty.update(changes)
+        self.calls += 1
+        self.channel_writes += len(changes)
+        self.last_write_at = time.monotonic()
+
+    def _write(self, changes):
+        raise NotImplementedError
+
+    def _write_stop(self, changes):
+        self._write(dict.fromkeys(CHANNELS, 0.0))
+
+    def stats(self):
+        return {'backend': self.name, 'calls': self.calls,
+                'channel_writes': self.channel_writes, 'skipped': self.skipped}
+
+    def close(self):
+        """Let go of the pins (safe to call twice)"""
+        with self._lock:
+            if not self.closed:
+                self.closed = True
+                self._close()
+
+    def _close(self):
+        pass
+
+class RPiGPIODriver(MotorDriver):
+    """RPi.GPIO software PWM - each running channel costs a busy C thread, so idle ones are switched off"""
+    name = "rpi_gpio"
+
+    def __init__(self, pins, frequency=1000):
+        if GPIO is None:
+            raise RuntimeError("RPi.GPIO not available - is this a Raspberry Pi?")
+        super().__init__(pins, frequency)
+
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(True)
+        GPIO.setup(list(self.pins.values()), GPIO.OUT)
+        GPIO.output(list(self.pins.values()), GPIO.LOW)  # Start with motors off
+
+        self.pwm = {}
+        try:
+            for channel, pin in self.pins.items():
+                self.pwm[channel] = GPIO.PWM(pin, frequency)
+        except Exception:
+            self.pwm = {}
+            self.has_pwm = False
+
+    def _write(self, changes):
+        if not self.has_pwm:
+            # Digital control (on/off), all changed pins in one call
+            GPIO.output([self.pins[channel] for channel in changes],
+                        [GPIO.HIGH if duty > 0 else GPIO.LOW for duty in changes.values()])
+            return
+        for channel, duty in changes.items():
+            pwm = self.pwm[channel]
+            if not duty:
+                # A stopped PWM thread doesn't burn CPU at 0% like a running one does
+                pwm.stop()
+            elif not self.duty[channel]:
+                pwm.start(duty)
+            else:
+                pwm.ChangeDutyCycle(duty)
+
+    def _write_stop(self, changes):
+        if self.has_pwm:
+            self._write(changes)
+        else:
+            GPIO.output(list(self.pins.values()), GPIO.LOW)
+
+    def _close(self):
+        for pwm in self.pwm.values():
+            pwm.stop()
+        GPIO.cleanup(list(self.pins.values()))
+
+class PigpioDriver(MotorDriver):
+    """DMA-timed PWM through the pigpiod daemon - needs `sudo pigpiod` running"""
+    name = "pigpio"
+    RANGE = 1000  # duty steps, so ramps get 0.1% resolution
+
+    def __init__(self, pins, frequency=1000, host=None):
+        if pigpio is None:
+            raise RuntimeError("pigpio is not installed (sudo apt install pigpio python3-pigpio)")
+        super().__init__(pins, frequency)
+
+        self.pi = pigpio.pi(host) if host else pigpio.pi()
+        if not self.pi.connected:
+            raise RuntimeError("pigpiod is not running (sudo pigpiod)")
+        for pin in self.pins.values():
+            self.pi.set_mode(pin, pigpio.OUTPUT)
+            self.pi.set_PWM_frequency(pin, frequency)
+            self.pi.set_PWM_range(pin, self.RANGE)
+            self.pi.set_PWM_dutycycle(pin, 0)
+
+        # Scripts run inside the daemon, so all four channels change in one round trip
+        order = list(CHANNELS)
+        self._set_all = self._store_script(
+            " ".join(f"pwm {self.pins[channel]} p{i}" for i, channel in enumerate(order)))
+        self._stop_all = self._store_script(
+            " ".join(f"pwm {self.pins[channel]} 0" for channel in order))
+
+        # pigpiod keeps driving the pins after this process is gone - always zero them on the way out
+        atexit.register(self.close)
+        exit_cleanly_on_signals()
+
+    def _store_script(self, text):
+        script = self.pi.store_script(text.encode())
+        if script < 0:
+            return None
+        while self.pi.script_status(script)[0] == pigpio.PI_SCRIPT_INITING:
+            time.sleep(0.001)
+        return script
+
+    def _scaled(self, duty):
+        return int(round(duty * self.RANGE / 100))
+
+    def _write(self, changes):
+        if self._set_all is not None and len(changes) > 1:
+            duty = dict(self.duty, **changes)
+            self.pi.run_script(self._set_all, [self._scaled(duty[channel]) for channel in CHANNELS])
+            return
+        for channel, value in changes.items():
+            self.pi.set_PWM_dutycycle(self.pins[channel], self._scaled(value))
+
+    def _write_stop(self, changes):
+        if self._stop_all is not None:
+            self.pi.run_script(self._stop_all)
+        else:
+            self._write(dict.fromkeys(CHANNELS, 0.0))
+
+    def _close(self):
+        atexit.unregister(self.close)
+        for script in (self._set_all, self._stop_all):
+            if script is not None:
+                self.pi.delete_script(script)
+        for pin in self.pins.values():
+            self.pi.set_PWM_dutycycle(pin, 0)
+        self.pi.stop()
+
+class LgpioDriver(MotorDriver):
+    """lgpio PWM - works on the Pi 5, where RPi.GPIO and pigpio don't"""
+    name = "lgpio"
+
+    def __init__(self, pins, frequency=1000, chip=0):
+        if lgpio is None:
+            raise RuntimeError("lgpio is not installed (sudo apt install python3-lgpio)")
+        super().__init__(pins, frequency)
+
+        self.handle = lgpio.gpiochip_open(chip)
+        for pin in self.pins.values():
+            lgpio.gpio_claim_output(self.handle, pin, 0)
+
+    def _write(self, changes):
+        for channel, duty in changes.items():
+            lgpio.tx_pwm(self.handle, self.pins[channel], self.frequency if duty else 0, duty)
+
+    def _write_stop(self, changes):
+        self._write(changes)
+
+    def _close(self):
+        for pin in self.pins.values():
+            lgpio.tx_pwm(self.handle, pin, 0, 0)
+            lgpio.gpio_free(self.handle, pin)
+        lgpio.gpiochip_close(self.handle)
+
+class FakeDriver(MotorDriver):
+    """No hardware - remembers every write with its time"""
+    name = "fake"
+
+    def __init__(self, pins, frequency=1000):
+        super().__init__(pins, frequency)
+        self.writes = []
+        self._written = threading.Condition()
+
+    def _write(self, changes):
+        with self._written:
+            now = time.monotonic()
+            self.writes.extend((now, self.pins[channel], duty) for channel, duty in changes.items())
+            self._written.notify_all()
+
+    def _write_stop(self, changes):
+        self._write(changes)
+
+    def wait_for_write(self, after, timeout=1.0):
+        """Time of the first write at or after a moment (None if nothing was written)"""
+        deadline = time.monotonic() + timeout
+        with self._written:
+            while True:
+                # Writes are appended in time order, so search from the newest back
+                first = None
+                for written_at, _, _ in reversed(self.writes):
+                    if written_at < after:
+                        break
+                    first = written_at
+                if first is not None:
+                    return first
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._written.wait(remaining)
+
+DRIVERS = {
+    'pigpio': PigpioDriver,
+    'lgpio': LgpioDriver,
+    'rpi_gpio': RPiGPIODriver,
+    'fake': FakeDriver,
+}
+
+def make_driver(name, pins, frequency=1000):
+    """Build the driver named in config.json - "auto" takes the first one that works here"""
+    if name != "auto":
+        return DRIVERS[name](pins, frequency)
+
+    # Not pigpio: if we die without cleaning up (kill -9, a crash), its daemon keeps the wheels turning
+    errors = []
+    for candidate in ('lgpio', 'rpi_gpio'):
+        try:
+            return DRIVERS[candidate](pins, frequency)
+        except Exception as e:
+            errors.append(f"{candidate}: {e}")
+    raise RuntimeError("No motor driver available - " + "; ".join(errors))
@@ -1,207 +1,416 @@
 #!/usr/bin/env python3
 """
 REAL MOTOR CONTROL - No simulations!
-Controls robot motors through GPIO pins
+Controls robot motors through GPIO pins (see motor_drivers.py for how the pins get written)
 """
+import atexit
+import os
 import time
-import RPi.GPIO as GPIO
+import threading
+from collections import deque
+import metrics
+from config import load_config, setting
+from motor_drivers import CHANNELS, make_driver
+
+MOVE_CALL_SECONDS = metrics.histogram('motor_move_call_seconds', "How long a move_* call blocks the caller",
+                                      labels=('command',), buckets=metrics.FAST_BUCKETS)
+START_LATENCY_SECONDS = metrics.histogram('motor_start_latency_seconds', "Command created to pins switched on",
+                                          labels=('command',), buckets=metrics.FAST_BUCKETS)
+RUN_SECONDS = metrics.histogram('motor_run_seconds', "How long the motors actually ran", labels=('command',))
+JITTER_SECONDS = metrics.histogram('motor_loop_jitter_seconds', "How late each control loop tick ran",
+                                   buckets=metrics.FAST_BUCKETS)
+TICK_WORK_SECONDS = metrics.histogram('motor_loop_work_seconds', "Time spent inside one control loop tick",
+                                      buckets=metrics.FAST_BUCKETS)
+COMMANDS = metrics.counter('motor_commands', "Motor commands by how they ended", labels=('command', 'status'))
+
+class MotorCommand:
+    """One movement handed to the motor scheduler - wait() on it to block until done"""
+    
+    def __init__(self, name, pins, seconds, speed):
+        self.name = name
+        self.pins = pins
+        self.seconds = seconds
+        self.speed = speed
+        
+        self.status = 'queued'
+        self.created_at = time.monotonic()
+        self.picked_at = None
+        self.started_at = None
+        self.deadline = None
+        self.finished_at = None
+        self._done = threading.Event()
+    
+    def _set_status(self, status):
+        self.status = status
+        if status not in ('queued', 'running'):
+            if self.finished_at is None:
+                self.finished_at = time.monotonic()
+            self._done.set()
+    
+    @property
+    def done(self):
+        return self._done.is_set()
+    
+    def wait(self, timeout=None):
+        """Block until the command has finished, been replaced or stopped"""
+        return self._done.wait(timeout)
 
 class Motors:
-    def __init__(self):
+    DONE_MESSAGES = {
+        'forward': "Forward movement complete",
+        'backward': "Backward movement complete",
+        'left': "Left turn complete",
+        'right': "Right turn complete",
+    }
+    
+    def __init__(self, driver=None):
         print("🔧 Initializing REAL motors...")
+        config = load_config()
         
-        # Motor GPIO pins (L298N style)
-        self.LEFT_FORWARD = 17
-        self.LEFT_BACKWARD = 18
-        self.RIGHT_FORWARD = 22
-        self.RIGHT_BACKWARD = 23
-        
-        # Setup GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(True)
-        
-        # Setup motor pins as outputs
+        # Motor GPIO pins (L298N style) from config.json
+        pins = setting(config, 'hardware.motor_pins', {})
+        self.LEFT_FORWARD = pins.get('left_forward', 17)
+        self.LEFT_BACKWARD = pins.get('left_backward', 18)
+        self.RIGHT_FORWARD = pins.get('right_forward', 22)
+        self.RIGHT_BACKWARD = pins.get('right_backward', 23)
         motor_pins = [self.LEFT_FORWARD, self.LEFT_BACKWARD, 
                      self.RIGHT_FORWARD, self.RIGHT_BACKWARD]
         
-        for pin in motor_pins:
-            GPIO.setup(pin, GPIO.OUT)
-            GPIO.output(pin, GPIO.LOW)  # Start with motors off
+        # pigpio / lgpio / RPi.GPIO / fake, whichever config.json asks for
+        self.driver = driver or make_driver(
+            setting(config, 'hardware.motor_backend', "auto"),
+            dict(zip(CHANNELS, motor_pins)),
+            frequency=setting(config, 'hardware.pwm_frequency', 1000),
+        )
+        self.has_pwm = self.driver.has_pwm
+        if self.has_pwm:
+            print(f"✅ PWM speed control enabled ({self.driver.name})")
+        else:
+            print(f"✅ Basic motor control (no PWM, {self.driver.name})")
         
-        self.motor_pwm = {}
+        # Control loop - runs at a fixed rate and ramps each side's duty towards its target,
+        # so callers never sleep and the wheels never jump straight to full speed
+        self.rate = setting(config, 'behavior.control_rate_hz', 100)
+        self.period = 1.0 / self.rate
+        self.max_speed = setting(config, 'behavior.max_speed', 100)
+        # Duty % per second - 400 takes a wheel from stopped to 80% in 0.2 s
+        self.acceleration = setting(config, 'behavior.acceleration', 400)
+        self.loop_priority = setting(config, 'behavior.control_priority', -10)
+        self.duty = {'left': 0.0, 'right': 0.0}    # signed: + forward, - backward
+        self._schedule = threading.Condition()
+        self._commands = deque()
+        self._current = None
+        self._running = True
         
-        # Create PWM for speed control (optional)
-        try:
-            self.motor_pwm['left_forward'] = GPIO.PWM(self.LEFT_FORWARD, 1000)  # 1kHz
-            self.motor_pwm['left_backward'] = GPIO.PWM(self.LEFT_BACKWARD, 1000)
-            self.motor_pwm['right_forward'] = GPIO.PWM(self.RIGHT_FORWARD, 1000)
-            self.motor_pwm['right_backward'] = GPIO.PWM(self.RIGHT_BACKWARD, 1000)
-            
-            # Start PWM with 0% duty cycle (stopped)
-            for pwm in self.motor_pwm.values():
-                pwm.start(0)
-                
-            self.has_pwm = True
-            print("✅ PWM speed control enabled")
-        except:
-            self.has_pwm = False
-            print("✅ Basic motor control (no PWM)")
-        
-        print("🚗 REAL motors ready on GPIO 17,18,22,23")
-    
-    def _set_motor_speed(self, pin, speed):
-        """Set motor speed with PWM or digital"""
-        if self.has_pwm and speed > 0:
-            self.motor_pwm[pin].ChangeDutyCycle(speed)
-        else:
-            # Digital control (on/off)
-            GPIO.output(getattr(self, pin.upper()), GPIO.HIGH if speed > 0 else GPIO.LOW)
+        self.commands_submitted = 0
+        self.commands_started = 0
+        self.commands_preempted = 0
+        self.max_queue_depth = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.overruns = 0
+        self.max_overrun = 0.0
+        self.commands_blocked = 0
+        
+        # Loop timing - how late each tick ran, and ticks lost to a busy CPU
+        self.ticks = 0
+        self._last_tick = None
+        self.max_jitter = 0.0
+        self.missed_ticks = 0
+        self.max_tick_work = 0.0
+        
+        # Set by the ultrasonic monitor in safe_mode - returns why forward isn't allowed, or None
+        self.forward_interlock = None
+        
+        self._scheduler = threading.Thread(target=self._control_loop, daemon=True)
+        self._scheduler.start()
+        # Moves return straight away, so the wheels may still be turning when Python exits -
+        # __del__ can't be relied on (the scheduler thread keeps this object alive)
+        atexit.register(self.shutdown)
+        
+        print(f"🚗 REAL motors ready on GPIO {','.join(str(pin) for pin in motor_pins)} "
+              f"({self.rate} Hz control loop, max {self.max_speed}%)")
     
     def _stop_all_motors(self):
         """Stop all motors immediately"""
-        pins = [self.LEFT_FORWARD, self.LEFT_BACKWARD, 
-               self.RIGHT_FORWARD, self.RIGHT_BACKWARD]
-        
-        for pin in pins:
-            GPIO.output(pin, GPIO.LOW)
-        
-        # Also stop PWM
-        if self.has_pwm:
-            for pwm in self.motor_pwm.values():
-                pwm.ChangeDutyCycle(0)
+        self.driver.stop()
+        self.duty = {'left': 0.0, 'right': 0.0}
     
-    def move_forward(self, seconds=2, speed=80):
-        """Move robot forward - REAL movement"""
+    @metrics.timed(MOVE_CALL_SECONDS.labels('forward'))
+    def move_forward(self, seconds=2, speed=80, queue=False):
+        """Move robot forward - REAL movement (returns right away)"""
         print(f"🚀 Moving FORWARD for {seconds} seconds at {speed}% power")
-        
-        try:
-            # Stop any previous movement
-            self._stop_all_motors()
-            time.sleep(0.1)
-            
-            # Activate forward pins
-            if self.has_pwm:
-                self.motor_pwm['left_forward'].ChangeDutyCycle(speed)
-                self.motor_pwm['right_forward'].ChangeDutyCycle(speed)
-            else:
-                GPIO.output(self.LEFT_FORWARD, GPIO.HIGH)
-                GPIO.output(self.RIGHT_FORWARD, GPIO.HIGH)
-            
-            # Move for specified time
-            time.sleep(seconds)
-            
-            # Stop
-            self._stop_all_motors()
-            print("✅ Forward movement complete")
-            
-        except Exception as e:
-            print(f"❌ Motor error: {e}")
-            self._stop_all_motors()
+        return self._submit(MotorCommand('forward', ('left_forward', 'right_forward'), seconds, speed), queue)
     
-    def move_backward(self, seconds=2, speed=80):
-        """Move robot backward - REAL movement"""
+    @metrics.timed(MOVE_CALL_SECONDS.labels('backward'))
+    def move_backward(self, seconds=2, speed=80, queue=False):
+        """Move robot backward - REAL movement (returns right away)"""
         print(f"🔄 Moving BACKWARD for {seconds} seconds at {speed}% power")
-        
-        try:
-            self._stop_all_motors()
-            time.sleep(0.1)
-            
-            # Activate backward pins
-            if self.has_pwm:
-                self.motor_pwm['left_backward'].ChangeDutyCycle(speed)
-                self.motor_pwm['right_backward'].ChangeDutyCycle(speed)
-            else:
-                GPIO.output(self.LEFT_BACKWARD, GPIO.HIGH)
-                GPIO.output(self.RIGHT_BACKWARD, GPIO.HIGH)
-            
-            time.sleep(seconds)
-            self._stop_all_motors()
-            print("✅ Backward movement complete")
-            
-        except Exception as e:
-            print(f"❌ Motor error: {e}")
-            self._stop_all_motors()
+        return self._submit(MotorCommand('backward', ('left_backward', 'right_backward'), seconds, speed), queue)
     
-    def turn_left(self, seconds=1, speed=70):
-        """Turn robot left - REAL turning"""
+    @metrics.timed(MOVE_CALL_SECONDS.labels('left'))
+    def turn_left(self, seconds=1, speed=70, queue=False):
+        """Turn robot left - REAL turning (returns right away)"""
         print(f"↩️ Turning LEFT for {seconds} seconds at {speed}% power")
-        
-        try:
-            self._stop_all_motors()
-            time.sleep(0.1)
-            
-            # Right motor forward, left motor stopped/backward
-            if self.has_pwm:
-                self.motor_pwm['right_forward'].ChangeDutyCycle(speed)
-                self.motor_pwm['left_backward'].ChangeDutyCycle(speed)
-            else:
-                GPIO.output(self.RIGHT_FORWARD, GPIO.HIGH)
-                GPIO.output(self.LEFT_BACKWARD, GPIO.HIGH)
-            
-            time.sleep(seconds)
-            self._stop_all_motors()
-            print("✅ Left turn complete")
-            
-        except Exception as e:
-            print(f"❌ Motor error: {e}")
-            self._stop_all_motors()
+        # Right motor forward, left motor backward
+        return self._submit(MotorCommand('left', ('right_forward', 'left_backward'), seconds, speed), queue)
     
-    def turn_right(self, seconds=1, speed=70):
-        """Turn robot right - REAL turning"""
+    @metrics.timed(MOVE_CALL_SECONDS.labels('right'))
+    def turn_right(self, seconds=1, speed=70, queue=False):
+        """Turn robot right - REAL turning (returns right away)"""
         print(f"↪️ Turning RIGHT for {seconds} seconds at {speed}% power")
+        # Left motor forward, right motor backward
+        return self._submit(MotorCommand('right', ('left_forward', 'right_backward'), seconds, speed), queue)
+    
+    def _submit(self, command, queue):
+        """Hand a command to the scheduler - it replaces the current one unless queue=True"""
+        if self._blocked(command):
+            return command
+        with self._schedule:
+            if not queue:
+                self._cancel_all('preempted')
+            self._commands.append(command)
+            self.commands_submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._commands))
+            self._schedule.notify()
+        return command
+    
+    def _blocked(self, command):
+        """Refuse a forward command while the interlock says the way is not clear"""
+        interlock = self.forward_interlock
+        if command.name != 'forward' or interlock is None:
+            return False
+        reason = interlock()
+        if not reason:
+            return False
+        print(f"🧱 Not moving forward: {reason}")
+        self.commands_blocked += 1
+        COMMANDS.labels(command.name, 'blocked').inc()
+        command.finished_at = time.monotonic()
+        command._set_status('blocked')
+        return True
+    
+    def is_moving(self, name=None):
+        """True while a command (optionally one named like 'forward') runs or the wheels still turn that way"""
+        command = self._current
+        if command is not None and (name is None or command.name == name):
+            return True
+        left, right = self.duty['left'], self.duty['right']
+        if not (left and right):
+            return name is None and bool(left or right)
+        direction = {(True, True): 'forward', (False, False): 'backward',
+                     (False, True): 'left', (True, False): 'right'}[(left > 0, right > 0)]
+        return name in (None, direction)
+    
+    def _cancel_all(self, reason):
+        """End the running command and drop queued ones (caller holds the lock)"""
+        if self._current:
+            self._finish(self._current, reason)
+        while self._commands:
+            command = self._commands.popleft()
+            command._set_status('cancelled')
+            COMMANDS.labels(command.name, 'cancelled').inc()
+    
+    def _finish(self, command, status):
+        """Record how the command ended (caller holds the lock) - the loop ramps the wheels down"""
+        now = time.monotonic()
+        
+        if status == 'done' and command.deadline is not None:
+            overrun = now - command.deadline
+            self.max_overrun = max(self.max_overrun, overrun)
+            if overrun > self.period:
+                self.overruns += 1
+        
+        if status == 'preempted':
+            self.commands_preempted += 1
         
+        if command.started_at is not None:
+            RUN_SECONDS.labels(command.name).observe(now - command.started_at)
+        COMMANDS.labels(command.name, status).inc()
+        
+        command.finished_at = now
+        command._set_status(status)
+        if command is self._current:
+            self._current = None
+        
+        if status == 'done':
+            print(f"✅ {self.DONE_MESSAGES.get(command.name, 'Movement complete')}")
+    
+    def _targets(self):
+        """Signed duty each side is heading for (0 when nothing is running)"""
+        targets = {'left': 0.0, 'right': 0.0}
+        command = self._current
+        if command is not None:
+            speed = min(command.speed, self.max_speed)
+            for pin in command.pins:
+                side, direction = pin.split('_')
+                targets[side] = speed if direction == 'forward' else -speed
+        return targets
+    
+    def _ramp(self, targets, elapsed):
+        """Move each side's duty towards its target by at most one acceleration step
+        (a change of direction passes through 0, so the old settle pause isn't needed)"""
+        step = self.acceleration * elapsed
+        for side, target in targets.items():
+            duty = self.duty[side]
+            duty = min(target, duty + step) if target > duty else max(target, duty - step)
+            self.duty[side] = duty
+        # The driver skips channels that didn't change
+        self.driver.apply({
+            'left_forward': max(self.duty['left'], 0.0), 'left_backward': max(-self.duty['left'], 0.0),
+            'right_forward': max(self.duty['right'], 0.0), 'right_backward': max(-self.duty['right'], 0.0),
+        })
+    
+    def _idle(self):
+        return self._current is None and not self._commands and not any(self.duty.values())
+    
+    def _control_loop(self):
+        """Control thread - one tick every period on monotonic deadlines, asleep when idle"""
         try:
-            self._stop_all_motors()
-            time.sleep(0.1)
-            
-            # Left motor forward, right motor stopped/backward
-            if self.has_pwm:
-                self.motor_pwm['left_forward'].ChangeDutyCycle(speed)
-                self.motor_pwm['right_backward'].ChangeDutyCycle(speed)
-            else:
-                GPIO.output(self.LEFT_FORWARD, GPIO.HIGH)
-                GPIO.output(self.RIGHT_BACKWARD, GPIO.HIGH)
-            
-            time.sleep(seconds)
-            self._stop_all_motors()
-            print("✅ Right turn complete")
+            # A lower nice value for just this thread (needs root or CAP_SYS_NICE)
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.loop_priority)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️ Motor loop keeps normal priority: {e}")
+        next_tick = time.monotonic()
+        while True:
+            with self._schedule:
+                if self._idle():
+                    while self._running and self._idle():
+                        self._schedule.wait()
+                    next_tick = time.monotonic()
+                    self._last_tick = None
+                if not self._running:
+                    break
+                
+                now = time.monotonic()
+                jitter = now - next_tick
+                JITTER_SECONDS.observe(max(jitter, 0.0))
+                self.max_jitter = max(self.max_jitter, jitter)
+                if jitter >= self.period:
+                    # Busy CPU made us miss ticks - ramp over the real gap, don't try to catch up
+                    self.missed_ticks += int(jitter / self.period)
+                    next_tick = now
+                elapsed = now - self._last_tick if self._last_tick is not None else self.period
+                self._last_tick = now
+                self.ticks += 1
+                
+                try:
+                    self._tick(now, elapsed)
+                except Exception as e:
+                    print(f"❌ Motor error: {e}")
+                    if self._current:
+                        self._finish(self._current, 'failed')
+                    self._stop_all_motors()
+                
+                work = time.monotonic() - now
+                TICK_WORK_SECONDS.observe(work)
+                self.max_tick_work = max(self.max_tick_work, work)
+                if self._idle():
+                    # Wheels stopped - wait for the next command rather than the next tick
+                    continue
             
-        except Exception as e:
-            print(f"❌ Motor error: {e}")
-            self._stop_all_motors()
+            next_tick += self.period
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+    
+    def _tick(self, now, elapsed):
+        """One control step: end or start commands, then ramp the duties"""
+        command = self._current
+        # End on the tick nearest the deadline rather than the first one after it
+        if command is not None and now + self.period / 2 >= command.deadline:
+            self._finish(command, 'done')
+        while self._current is None and self._commands:
+            self._begin(self._commands.popleft(), now)
+        self._ramp(self._targets(), elapsed)
+    
+    def _begin(self, command, now):
+        """Start a command's clock - the ramp takes the wheels from whatever they're doing"""
+        command.picked_at = now
+        if self._blocked(command):
+            # Queued behind something else, and the way ahead closed meanwhile
+            return
+        self._current = command
+        
+        command.started_at = now
+        command.deadline = now + command.seconds
+        command._set_status('running')
+        
+        latency = now - command.created_at
+        START_LATENCY_SECONDS.labels(command.name).observe(latency)
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.commands_started += 1
     
     def stop(self):
         """Emergency stop - REAL stop"""
         print("🛑 EMERGENCY STOP - All motors off")
-        self._stop_all_motors()
+        with self._schedule:
+            self._cancel_all('stopped')
+            self._stop_all_motors()
+            self._schedule.notify()
+    
+    def scheduler_stats(self):
+        """Queue depth, start latency and timing overruns"""
+        with self._schedule:
+            started = self.commands_started
+            return {
+                'queue_depth': len(self._commands),
+                'max_queue_depth': self.max_queue_depth,
+                'running': self._current.name if self._current else None,
+                'submitted': self.commands_submitted,
+                'started': started,
+                'preempted': self.commands_preempted,
+                'blocked': self.commands_blocked,
+                'avg_latency': self.total_latency / started if started else 0.0,
+                'max_latency': self.max_latency,
+                'overruns': self.overruns,
+                'max_overrun': self.max_overrun,
+                'duty_left': self.duty['left'],
+                'duty_right': self.duty['right'],
+                'loop_rate': self.rate,
+                'loop_ticks': self.ticks,
+                'loop_jitter_p99': JITTER_SECONDS.quantile(0.99) or 0.0,
+                'loop_max_jitter': self.max_jitter,
+                'loop_missed_ticks': self.missed_ticks,
+                'loop_max_work': self.max_tick_work,
+                'driver_calls': self.driver.calls,
+                'driver_channel_writes': self.driver.channel_writes,
+            }
+    
+    def shutdown(self):
+        """Stop the motors and the scheduler thread, then let go of the pins (safe to call twice)"""
+        atexit.unregister(self.shutdown)
+        if self.driver.closed:
+            return
+        print("🧹 Cleaning up GPIO...")
+        with self._schedule:
+            self._cancel_all('stopped')
+            self._stop_all_motors()
+            self._running = False
+            self._schedule.notify()
+        if self._scheduler is not threading.current_thread():
+            self._scheduler.join(timeout=1)
+        self.driver.close()
     
     def test_motors(self):
         """Test each motor individually"""
         print("🧪 Testing all motors...")
         
         tests = [
-            ("Left forward", self.LEFT_FORWARD),
-            ("Left backward", self.LEFT_BACKWARD),
-            ("Right forward", self.RIGHT_FORWARD),
-            ("Right backward", self.RIGHT_BACKWARD)
+            ("Left forward", 'left_forward'),
+            ("Left backward", 'left_backward'),
+            ("Right forward", 'right_forward'),
+            ("Right backward", 'right_backward')
         ]
         
-        for motor_name, pin in tests:
+        for motor_name, channel in tests:
             print(f"Testing {motor_name}...")
-            GPIO.output(pin, GPIO.HIGH)
+            self.driver.apply({channel: 100})
             time.sleep(1)
-            GPIO.output(pin, GPIO.LOW)
+            self.driver.stop()
             time.sleep(0.5)
         
         print("✅ Motor test complete")
     
-    def __del__(self):
-        """Clean up GPIO when done"""
-        print("🧹 Cleaning up GPIO...")
-        self._stop_all_motors()
-        time.sleep(0.1)
-        GPIO.cleanup()
-
 # Standalone test
 if __name__ == "__main__":
     print("🚗 MOTOR TEST MODE")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Speech Recognizers - Turn microphone audio into text
+"google" sends whole phrases to Google (needs internet)
+"vosk" decodes on the robot itself, chunk by chunk, while you are still talking
+"""
+import json
+import time
+import wave
+
+try:
+    import vosk
+except ImportError:
+    vosk = None
+
+class GoogleRecognizer:
+    """Online recognition of a whole recorded phrase (the original behaviour)"""
+    name = "google"
+    streaming = False
+
+    def transcribe(self, recognizer, audio):
+        return recognizer.recognize_google(audio)
+
+class VoskRecognizer:
+    """Offline streaming recognition - the model is loaded once and fed small chunks"""
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path, sample_rate=16000):
+        if vosk is None:
+            raise RuntimeError("vosk is not installed (pip3 install vosk)")
+
+        vosk.SetLogLevel(-1)
+        print(f"🧠 Loading offline speech model from {model_path}...")
+        self.model = vosk.Model(model_path)
+        self.sample_rate = sample_rate
+        self._recognizer = vosk.KaldiRecognizer(self.model, self.sample_rate)
+
+    def start(self):
+        """Get ready for a new utterance"""
+        self._recognizer.Reset()
+
+    def accept(self, chunk):
+        """Feed 16-bit mono audio - returns (partial text, final text or None)"""
+        if self._recognizer.AcceptWaveform(chunk):
+            return "", json.loads(self._recognizer.Result()).get('text', '')
+        return json.loads(self._recognizer.PartialResult()).get('partial', ''), None
+
+    def finish(self):
+        """No more audio - return whatever was said"""
+        return json.loads(self._recognizer.FinalResult()).get('text', '')
+
+def make_recognizer(name, model_path=None, sample_rate=16000):
+    """Build the recognizer named in config.json"""
+    if name == "vosk":
+        return VoskRecognizer(model_path, sample_rate)
+    return GoogleRecognizer()
+
+def stream_chunks(backend, chunks, on_partial=None, timeout=None):
+    """Run chunks of audio through a streaming recognizer
+
+    Stops at the first final result, or with "" if nothing was heard within
+    timeout seconds. Returns (text, seconds from the last change in the
+    partial text - roughly when speech ended - to the result).
+    """
+    backend.start()
+    started = time.monotonic()
+    last_partial = ""
+    speech_end = started
+
+    for chunk in chunks:
+        partial, final = backend.accept(chunk)
+
+        if final is not None and final.strip():
+            return final.strip(), time.monotonic() - speech_end
+
+        if partial != last_partial:
+            last_partial = partial
+            speech_end = time.monotonic()
+            if on_partial and partial:
+                on_partial(partial)
+
+        if timeout and not last_partial and time.monotonic() - started > timeout:
+            return "", 0.0
+
+    text = backend.finish().strip()
+    return text, time.monotonic() - speech_end
+
+def wav_chunks(path, sample_rate, chunk_frames=4000, realtime=False):
+    """Read a WAV file in microphone-sized chunks (optionally at real speed)"""
+    with wave.open(path, 'rb') as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path} must be 16-bit mono audio")
+        if wav.getframerate() != sample_rate:
+            raise ValueError(f"{path} is {wav.getframerate()} Hz, recognizer wants {sample_rate} Hz")
+
+        while True:
+            chunk = wav.readframes(chunk_frames)
+            if not chunk:
+                break
+            if realtime:
+                time.sleep(len(chunk) / 2 / sample_rate)
+            yield chunk
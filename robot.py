@@ -4,45 +4,524 @@ Main Robot Brain - Talks to AI and controls hardware
 """
 import ollama
 import json
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from cache import ResponseCache
+from config import load_config, setting
 from hardware import Hardware
+from intents import IntentMatcher
+from memory import ConversationMemory
 from motors import Motors
+from sensors import UltrasonicMonitor
 from camera import Camera
 from voice import Voice
 
-class Robot:
+THINK_SECONDS = metrics.histogram('ai_think_seconds', "Whole AI reply", labels=('mode',))
+FIRST_TOKEN_SECONDS = metrics.histogram('ai_first_token_seconds', "Question to first streamed token")
+PREFILL_SECONDS = metrics.histogram('ai_prefill_seconds', "Ollama prompt processing (its own timing)")
+DECODE_SECONDS = metrics.histogram('ai_decode_seconds', "Ollama token generation (its own timing)")
+
+# A sentence ends at . ! or ? followed by whitespace, or at a line break
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+def split_sentences(text):
+    """Split streamed text into finished sentences and the unfinished rest"""
+    parts = SENTENCE_END.split(text)
+    sentences = [part.strip() for part in parts[:-1] if part.strip()]
+    return sentences, parts[-1]
+
+class TurnTimeline:
+    """When each part of a turn happened, counted from when the input arrived"""
+    
     def __init__(self):
-        print("🧠 Booting up robot brain...")
+        self.start = time.monotonic()
+        self.events = []
+        self.running = []
+        self.lock = threading.Lock()
+    
+    def mark(self, name, at=None):
+        with self.lock:
+            self.events.append(((at or time.monotonic()) - self.start, name))
+    
+    def track(self, name, command):
+        """Note a motor command's start and end once it has them"""
+        with self.lock:
+            self.running.append((name, command))
+    
+    def report(self):
+        """Print the timeline so overlap between talking and moving is visible"""
+        with self.lock:
+            for name, command in self.running:
+                if command.started_at:
+                    self.events.append((command.started_at - self.start, f"{name} moving"))
+                if command.done:
+                    self.events.append(((command.finished_at or time.monotonic()) - self.start, f"{name} end"))
+                else:
+                    self.events.append((time.monotonic() - self.start, f"{name} still running"))
+            self.running = []
+            events = sorted(self.events)
         
-        # Initialize all hardware
-        self.hardware = Hardware()
-        self.motors = Motors()
-        self.camera = Camera()
-        self.voice = Voice()
-        self.ai = ollama.Client()
+        print("🕒 " + ", ".join(f"{name} {at:.2f}s" for at, name in events))
+
+class Subsystem:
+    """Robot part that may still be starting up - waits for it on first use"""
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, robot, owner=None):
+        if robot is None:
+            return self
+        return robot._subsystem(self.name)
+    
+    def __set__(self, robot, value):
+        robot._ready[self.name] = value
+
+class Robot:
+    hardware = Subsystem()
+    motors = Subsystem()
+    sensors = Subsystem()
+    camera = Subsystem()
+    voice = Subsystem()
+    ai = Subsystem()
+    
+    def __init__(self, lazy=None, parts=None):
+        print("🧠 Booting up robot brain...")
+        self.config = load_config()
+        if lazy is None:
+            lazy = setting(self.config, 'behavior.lazy_startup', False)
         
         # Robot personality
-        self.name = "LlamaBot"
-        self.model = "tinyllama"
+        self.name = setting(self.config, 'robot.name', "LlamaBot")
+        self.model = setting(self.config, 'ai.model', "tinyllama")
+        
+        # Keep the model loaded between turns and reuse what it already read
+        self.keep_alive = setting(self.config, 'ai.keep_alive', "30m")
+        self.max_context_tokens = setting(self.config, 'ai.max_context_tokens', 2048)
+        self.ai_options = {
+            'temperature': setting(self.config, 'ai.temperature', 0.7),
+            'num_predict': setting(self.config, 'ai.max_tokens', 150),
+        }
+        self.context = None
+        self._context_hardware = None
+        # Older turns live on as a summary when the conversation outgrows its budget
+        self.memory = self._make_memory()
+        
+        # Initialize all hardware at the same time instead of one after another
+        self._ready = {}
+        self._starting = {}
+        self.startup_times = {}
+        self._boot_started = time.monotonic()
+        
+        # parts can swap in stand-ins (e.g. for replaying a recorded session)
+        parts = parts or {}
+        startup = ThreadPoolExecutor(max_workers=6, thread_name_prefix="startup")
+        self._start(startup, 'hardware', parts.get('hardware', Hardware))
+        self._start(startup, 'motors', parts.get('motors', Motors))
+        # The distance sensor guards the motors, so it needs them first
+        self._start(startup, 'sensors', parts.get('sensors', self._start_sensors), after='motors')
+        # Camera takes over the device Hardware already opened while probing
+        self._start(startup, 'camera', parts.get('camera', self._start_camera), after='hardware')
+        self._start(startup, 'voice', parts.get('voice', Voice))
+        self._start(startup, 'ai', parts.get('ai', self._start_ai))
+        startup.shutdown(wait=False)
+        
+        # Where typed input comes from
+        self.input_source = input
+        
+        # Stream replies token by token and speak each sentence as soon as it's done -
+        # every reply with speak_replies, otherwise only when asked to ("speak", "talk", "say hello")
+        self.stream_replies = setting(self.config, 'ai.stream', True)
+        self.speak_replies = setting(self.config, 'voice.speak_replies', False)
+        self.last_timing = {}
+        
+        # Start actions as soon as the input arrives instead of after the reply
+        self.overlap_actions = setting(self.config, 'behavior.overlap_actions', True)
+        
+        # Clear commands skip straight to the motors/camera
+        self.intents = IntentMatcher(setting(self.config, 'intents'))
+        # Longest move a spoken command can ask for - the robot can't see where it's going
+        self.max_move_seconds = setting(self.config, 'behavior.max_move_seconds', 10)
+        self.intent_counts = {'fast_path': 0, 'llm_path': 0}
+        
+        # Remember replies to commands we hear over and over
+        self.response_cache = None
+        if setting(self.config, 'ai.cache.enabled', True):
+            self.response_cache = ResponseCache(
+                max_entries=setting(self.config, 'ai.cache.max_entries', 256),
+                ttl=setting(self.config, 'ai.cache.ttl_seconds', 3600),
+                disk_path=setting(self.config, 'ai.cache.disk_path'),
+            )
+        
+        # Stage timings on http://127.0.0.1:<port>/metrics and in a snapshot file
+        self.metrics = metrics.start_metrics(self.config)
+        
+        if lazy:
+            # Parts still starting get waited for the first time they're used
+            threading.Thread(target=self._report_when_ready, daemon=True).start()
+        else:
+            self.wait_ready()
+            self.startup_report()
+            self._register_collectors()
         
         print(f"✅ {self.name} is ready! Found: {self.hardware.summary()}")
     
-    def think(self, user_input):
-        """AI thinks about what to do"""
+    def _start(self, startup, name, build, after=None):
+        """Start one subsystem in the background and time it"""
+        def _timed_build():
+            if after:
+                self._starting[after].result()
+            started = time.monotonic()
+            part = build()
+            self.startup_times[name] = time.monotonic() - started
+            return part
+        
+        self._starting[name] = startup.submit(_timed_build)
+    
+    def _start_camera(self):
+        """Open the camera using Hardware's probe handle, then drop the spares"""
+        hardware = self._subsystem('hardware')
+        camera = Camera(hardware=hardware)
+        hardware.release_unclaimed()
+        return camera
+    
+    def _start_sensors(self):
+        """Start the ultrasonic monitor (None if it can't - the robot still runs, just without it)"""
+        try:
+            return UltrasonicMonitor(motors=self._subsystem('motors'))
+        except Exception as e:
+            print(f"⚠️ Ultrasonic sensor not available: {e}")
+            return None
+    
+    def _start_ai(self, client=None):
+        """Connect to Ollama and load the model now, so the first question isn't slow"""
+        client = client or ollama.Client()
+        try:
+            # An empty prompt just loads the model and keeps it in memory
+            client.generate(model=self.model, prompt="", keep_alive=self.keep_alive)
+            print(f"🔥 {self.model} loaded and kept warm for {self.keep_alive}")
+        except Exception as e:
+            print(f"⚠️ Couldn't preload {self.model}: {e}")
+        return client
+    
+    def _make_memory(self):
+        """A fresh conversation memory (None if turned off in config.json)"""
+        if not setting(self.config, 'ai.memory.enabled', True):
+            return None
+        max_tokens = self.ai_options['num_predict']
+        return ConversationMemory(
+            summarize=self._summarize,
+            # Room for this many full-length replies word for word
+            budget_tokens=setting(self.config, 'ai.memory.budget_replies', 4) * max_tokens,
+            max_turns=setting(self.config, 'ai.memory.max_turns', 32),
+            summary_tokens=setting(self.config, 'ai.memory.summary_tokens', max_tokens),
+        )
+    
+    def _summarize(self, conversation, max_tokens):
+        """Ask the AI to shorten the old part of the conversation (runs on the memory's thread)"""
         prompt = f"""
-        You are {self.name}, a physical robot with real hardware:
-        {self.hardware.summary()}
+        Summarise this conversation between a human and {self.name}, a robot, in a few short sentences.
+        Keep names, facts and anything the human asked the robot to remember or do.
         
+        {conversation}
+        
+        Summary:"""
+        response = self.ai.generate(model=self.model, prompt=prompt, keep_alive=self.keep_alive,
+                                    options=dict(self.ai_options, num_predict=max_tokens))
+        return response['response']
+    
+    def _remember(self, user_input, response, reply_tokens=None):
+        """Add a finished turn to the memory"""
+        if self.memory:
+            self.memory.add(user_input, response, reply_tokens)
+    
+    def _subsystem(self, name):
+        """Get a subsystem, waiting for it if it's still starting"""
+        if name not in self._ready:
+            self._ready[name] = self._starting[name].result()
+        return self._ready[name]
+    
+    def wait_ready(self):
+        """Wait for every subsystem (raises the first startup error)"""
+        for name in self._starting:
+            self._subsystem(name)
+    
+    def startup_report(self):
+        """Show how long each part took to start"""
+        total = time.monotonic() - self._boot_started
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in
+                          sorted(self.startup_times.items(), key=lambda item: -item[1]))
+        print(f"⏱️ Startup {total:.2f}s ({parts}; {sum(self.startup_times.values()):.2f}s if done in a row)")
+        return dict(self.startup_times, total=total)
+    
+    def _report_when_ready(self):
+        """Lazy startup - print the report once everything has come up"""
+        for name, future in self._starting.items():
+            if future.exception():
+                print(f"❌ {name} failed to start: {future.exception()}")
+        self.startup_report()
+        self._register_collectors()
+    
+    def _register_collectors(self):
+        """Export the stats the parts already keep alongside the timings"""
+        metrics.register_collector('startup', lambda: self.startup_times)
+        metrics.register_collector('intents', self.intent_stats)
+        if self.response_cache:
+            metrics.register_collector('cache', self.response_cache.stats)
+        if self.memory:
+            metrics.register_collector('memory', self.memory.stats)
+        for name, part, method in [('motors', 'motors', 'scheduler_stats'),
+                                   ('sensors', 'sensors', 'stats'),
+                                   ('camera', 'camera', 'grabber_stats')]:
+            stats = getattr(self._ready.get(part), method, None)
+            if stats:
+                metrics.register_collector(name, stats)
+        detector = getattr(self._ready.get('camera'), 'detector', None)
+        if detector:
+            metrics.register_collector('detection', detector.stats)
+        analyzer = getattr(self._ready.get('camera'), 'analyzer', None)
+        if analyzer:
+            metrics.register_collector('frame_analysis', analyzer.stats)
+        snapshots = getattr(self._ready.get('camera'), 'snapshots', None)
+        if snapshots:
+            metrics.register_collector('snapshots', snapshots.stats)
+        stream = getattr(self._ready.get('camera'), 'stream', None)
+        if stream:
+            metrics.register_collector('stream', stream.stats)
+    
+    def _scene(self):
+        """What the object detector sees right now ("" without one) - never waits for the camera"""
+        detector = getattr(self._ready.get('camera'), 'detector', None)
+        return detector.describe() if detector else ""
+    
+    def _scene_labels(self):
+        """Kinds of things in view, sorted ("" without a detector) - stable while the scene barely moves"""
+        detector = getattr(self._ready.get('camera'), 'detector', None)
+        detections = detector.latest() if detector else None
+        return ",".join(sorted({detection.label for detection in detections or ()}))
+    
+    def _build_prompt(self, user_input, hardware_summary, scene=""):
+        """Build the prompt the AI sees for the first turn of a conversation"""
+        seen = f"Your camera sees right now: {scene}" if scene else ""
+        earlier = self.memory.render() if self.memory else ""
+        return f"""
+        You are {self.name}, a physical robot with real hardware:
+        {hardware_summary}
+        {seen}
+        {earlier}
         Human: {user_input}
         
         Respond briefly and naturally. If movement is needed, just say you'll do it.
         """
+    
+    def _generate_args(self, user_input, hardware_summary, scene=""):
+        """Arguments for ollama generate - only the new words if the AI still remembers the rest"""
+        args = {'model': self.model, 'keep_alive': self.keep_alive, 'options': self.ai_options}
+        
+        # Start over if the hardware changed, the conversation is getting too long,
+        # or old turns were just summarised (the memory goes back in as text)
+        limit = self.max_context_tokens - self.ai_options['num_predict']
+        folded = self.memory.take_reset() if self.memory else False
+        if (folded or self.context is None or hardware_summary != self._context_hardware
+                or len(self.context) > limit):
+            self.context = None
+            self._context_hardware = hardware_summary
+            args['prompt'] = self._build_prompt(user_input, hardware_summary, scene)
+        else:
+            args['prompt'] = f"(Camera sees: {scene})\nHuman: {user_input}" if scene else f"Human: {user_input}"
+            args['context'] = self.context
+        
+        return args
+    
+    def _remember_turn(self, final):
+        """Keep Ollama's context for next turn and note where the time went"""
+        if final.get('context'):
+            self.context = final.get('context')
+        
+        def _seconds(key):
+            nanoseconds = final.get(key)
+            return nanoseconds / 1e9 if nanoseconds else None
+        
+        if _seconds('prompt_eval_duration'):
+            PREFILL_SECONDS.observe(_seconds('prompt_eval_duration'))
+        if _seconds('eval_duration'):
+            DECODE_SECONDS.observe(_seconds('eval_duration'))
+        
+        self.last_timing.update({
+            'load': _seconds('load_duration'),
+            'prefill': _seconds('prompt_eval_duration'),
+            'prefill_tokens': final.get('prompt_eval_count'),
+            'decode': _seconds('eval_duration'),
+            'decode_tokens': final.get('eval_count'),
+        })
+    
+    def _cache_key(self, user_input, hardware_summary):
+        """Cache key for this turn, or None when caching is off
+        
+        What's in view changes the answer too, but only the kinds of things - confidences
+        and positions change every frame and would make every key new. Once the conversation
+        has a history the reply depends on it, so only opening questions are cached
+        """
+        if not self.response_cache:
+            return None
+        if self.memory and not self.memory.is_empty():
+            return None
+        return self.response_cache.make_key(user_input, self.model, hardware_summary + self._scene_labels())
+    
+    @metrics.timed(THINK_SECONDS.labels('blocking'))
+    def think(self, user_input):
+        """AI thinks about what to do"""
+        hardware_summary = self.hardware.summary()
+        scene = self._scene()
+        cache_key = self._cache_key(user_input, hardware_summary)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._remember(user_input, cached)
+                return cached
         
         try:
-            response = self.ai.generate(model=self.model, prompt=prompt)
-            return response['response']
+            response = self.ai.generate(**self._generate_args(user_input, hardware_summary, scene))
         except Exception as e:
             return f"Sorry, my brain glitched: {e}"
+        
+        self.last_timing = {}
+        self._remember_turn(response)
+        self._remember(user_input, response['response'], self.last_timing.get('decode_tokens'))
+        
+        if cache_key:
+            self.response_cache.put(cache_key, response['response'])
+        return response['response']
+    
+    @metrics.timed(THINK_SECONDS.labels('stream'))
+    def think_stream(self, user_input, on_token=None, on_sentence=None):
+        """AI thinks out loud - hands back tokens and whole sentences as they arrive"""
+        start = time.monotonic()
+        self.last_timing = {'first_token': None, 'first_word': None, 'total': None}
+        
+        hardware_summary = self.hardware.summary()
+        scene = self._scene()
+        cache_key = self._cache_key(user_input, hardware_summary)
+        cached = self.response_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            self.last_timing['first_token'] = time.monotonic() - start
+            if on_token:
+                on_token(cached)
+            if on_sentence:
+                sentences, rest = split_sentences(cached)
+                for sentence in sentences + ([rest.strip()] if rest.strip() else []):
+                    on_sentence(sentence)
+            self.last_timing['total'] = time.monotonic() - start
+            self._remember(user_input, cached)
+            return cached
+        
+        args = self._generate_args(user_input, hardware_summary, scene)
+        reply = []
+        pending = ""
+        glitched = False
+        
+        try:
+            for chunk in self.ai.generate(stream=True, **args):
+                if chunk.get('done'):
+                    self._remember_turn(chunk)
+                
+                token = chunk['response']
+                if not token:
+                    continue
+                
+                if self.last_timing['first_token'] is None:
+                    self.last_timing['first_token'] = time.monotonic() - start
+                    FIRST_TOKEN_SECONDS.observe(self.last_timing['first_token'])
+                
+                reply.append(token)
+                if on_token:
+                    on_token(token)
+                
+                # Hand over every sentence that is finished
+                pending += token
+                sentences, pending = split_sentences(pending)
+                if on_sentence:
+                    for sentence in sentences:
+                        on_sentence(sentence)
+        except Exception as e:
+            glitched = True
+            glitch = f"Sorry, my brain glitched: {e}"
+            reply.append(glitch)
+            pending += glitch
+            if on_token:
+                on_token(glitch)
+        
+        # Whatever is left over is the last sentence
+        if on_sentence and pending.strip():
+            on_sentence(pending.strip())
+        
+        self.last_timing['total'] = time.monotonic() - start
+        response = "".join(reply)
+        
+        if not glitched:
+            self._remember(user_input, response, self.last_timing.get('decode_tokens'))
+        if cache_key and not glitched:
+            self.response_cache.put(cache_key, response)
+        return response
+    
+    def _reply_streaming(self, user_input, timeline=None, on_reply_sentence=None):
+        """Print the reply as it streams in and speak finished sentences right away"""
+        start = time.monotonic()
+        speaking = self.wants_speech(user_input) and self.voice.voice_available
+        first_utterance = []
+        got_token = []
+        
+        def _mark_first_word():
+            if self.last_timing.get('first_word') is None:
+                self.last_timing['first_word'] = time.monotonic() - start
+        
+        def _on_token(token):
+            if timeline and not got_token:
+                got_token.append(token)
+                timeline.mark("first token")
+            print(token, end="", flush=True)
+        
+        def _on_sentence(sentence):
+            if on_reply_sentence:
+                on_reply_sentence(sentence)
+            if speaking:
+                utterance = self.voice.speak(sentence, on_start=_mark_first_word)
+                if utterance and not first_utterance:
+                    first_utterance.append(utterance)
+        
+        response = self.think_stream(
+            user_input,
+            on_token=_on_token,
+            on_sentence=_on_sentence if speaking or on_reply_sentence else None,
+        )
+        print()
+        if timeline:
+            timeline.mark("last token")
+        
+        # Speech carries on in the background; just wait for it to begin
+        if first_utterance:
+            first_utterance[0].started.wait(timeout=5)
+        
+        self._print_timing()
+        return response, speaking
+    
+    def _print_timing(self):
+        """Show how long the human waited this turn"""
+        def _fmt(seconds):
+            return f"{seconds:.2f}s" if seconds is not None else "n/a"
+        
+        timing = self.last_timing
+        print(f"⏱️ First token {_fmt(timing.get('first_token'))}, "
+              f"first word {_fmt(timing.get('first_word'))}, "
+              f"reply {_fmt(timing.get('total'))}")
+        
+        if timing.get('prefill') is not None:
+            print(f"   prefill {_fmt(timing['prefill'])} for {timing.get('prefill_tokens') or 0} tokens, "
+                  f"decode {_fmt(timing.get('decode'))} for {timing.get('decode_tokens') or 0} tokens, "
+                  f"model load {_fmt(timing.get('load'))}")
     
     def start_conversation(self):
         """Main conversation loop"""
@@ -53,7 +532,7 @@ class Robot:
         while True:
             try:
                 # Get user input
-                user_input = input("👤 You: ").strip()
+                user_input = self.input_source("👤 You: ").strip()
                 
                 if user_input.lower() in ['quit', 'exit', 'bye']:
                     print("🤖 Robot: Thanks for chatting! Shutting down...")
@@ -62,40 +541,165 @@ class Robot:
                 if not user_input:
                     continue
                 
-                # Let AI think
-                print("🤖 Robot: ", end="")
-                response = self.think(user_input)
-                print(response)
+                # A new question makes whatever we were still saying stale
+                self.voice.interrupt()
                 
-                # Do physical actions if mentioned
-                self.do_actions(user_input, response)
+                self._respond(user_input)
                 
             except KeyboardInterrupt:
                 break
             except Exception as e:
                 print(f"🤖 Robot: Oops! {e}")
+        
+        self.shutdown()
     
-    def do_actions(self, user_input, response):
-        """Perform physical actions based on conversation"""
-        input_lower = user_input.lower()
-        response_lower = response.lower()
+    def _respond(self, user_input):
+        """One turn: clear commands right away, then the AI's answer
+        
+        With overlap_actions, less certain commands and the ones the AI promises in its reply
+        start in the background while it is still talking; otherwise they wait for the reply
+        """
+        overlap = self.overlap_actions
+        timeline = TurnTimeline()
+        
+        # Actions from the input are decided now (microseconds)
+        confident = self.confident_intents(user_input)
+        self.intent_counts['fast_path' if confident else 'llm_path'] += 1
+        planned = list(confident or (self.intents.actionable(user_input) if overlap else []))
+        if planned:
+            self._dispatch_intents(planned, timeline, background=overlap)
         
-        # Movement commands
-        if any(word in input_lower for word in ['move', 'forward', 'backward', 'turn', 'left', 'right']):
-            if 'forward' in input_lower:
-                self.motors.move_forward(2)
-            elif 'backward' in input_lower:
-                self.motors.move_backward(2)
-            elif 'left' in input_lower:
-                self.motors.turn_left(1)
-            elif 'right' in input_lower:
-                self.motors.turn_right(1)
-        
-        # Camera commands
-        if any(word in input_lower for word in ['see', 'look', 'camera', 'what do you see']):
+        if confident and self.intents.skip_llm:
+            print(f"🤖 Robot: {' '.join(intent.describe() for intent in confident)}")
+            if overlap:
+                timeline.report()
+            return
+        
+        # Actions the AI promises in its reply start as soon as the sentence is complete
+        def _on_reply_sentence(sentence):
+            if not planned:
+                intents = self.intents.match_reply(sentence)
+                if intents:
+                    planned.extend(intents)
+                    self._dispatch_intents(intents, timeline)
+        
+        print("🤖 Robot: ", end="")
+        if self.stream_replies:
+            response, spoken = self._reply_streaming(user_input, timeline,
+                                                     _on_reply_sentence if overlap else None)
+        else:
+            response, spoken = self.think(user_input), False
+            timeline.mark("reply")
+            print(response)
+            if overlap:
+                for sentence in split_sentences(response + "\n")[0]:
+                    _on_reply_sentence(sentence)
+        
+        # Whatever wasn't done yet (and the voice command) is left for do_actions
+        self.do_actions(user_input, response, spoken=spoken, handled=overlap or bool(planned))
+        if overlap:
+            timeline.report()
+    
+    def _dispatch_intents(self, intents, timeline, background=True):
+        """Run intents (on a background thread unless told not to), noting when each starts and ends"""
+        def _run():
+            for intent in intents:
+                timeline.mark(f"{intent.action} start")
+                try:
+                    result = self.execute_intent(intent)
+                except Exception as e:
+                    print(f"🤖 Robot: Oops! {e}")
+                    continue
+                if hasattr(result, 'wait'):
+                    timeline.track(intent.action, result)
+                else:
+                    timeline.mark(f"{intent.action} end")
+        
+        if background:
+            threading.Thread(target=_run, daemon=True).start()
+        else:
+            _run()
+    
+    def start_async_conversation(self):
+        """Conversation where listening, thinking, moving and talking overlap"""
+        import asyncio
+        from runtime import AsyncRuntime
+        
+        try:
+            asyncio.run(AsyncRuntime(self).run())
+        except KeyboardInterrupt:
+            pass
+        self.shutdown()
+    
+    def emergency_stop(self):
+        """Stop moving and stop talking right now"""
+        self.motors.stop()
+        self.voice.interrupt()
+    
+    def shutdown(self):
+        """Stop the wheels and let go of the motor and sensor pins (safe to call twice)"""
+        sensors = self._ready.get('sensors')
+        if sensors:
+            sensors.shutdown()
+        motors = self._ready.get('motors')
+        if motors:
+            motors.shutdown()
+    
+    def confident_intents(self, user_input):
+        """Commands clear enough to run without the AI ([] if anything is unsure)"""
+        intents = self.intents.match_all(user_input)
+        if intents and all(self.intents.is_confident(intent) for intent in intents):
+            return intents
+        return []
+    
+    def fast_path(self, user_input):
+        """Run clear commands immediately - returns what was done ([] = leave it to the AI)"""
+        intents = self.confident_intents(user_input)
+        self.intent_counts['fast_path' if intents else 'llm_path'] += 1
+        
+        for intent in intents:
+            self.execute_intent(intent)
+        return intents
+    
+    def intent_stats(self):
+        """How often commands skipped the AI"""
+        total = sum(self.intent_counts.values())
+        fast = self.intent_counts['fast_path']
+        return dict(self.intent_counts, fast_path_rate=fast / total if total else 0.0)
+    
+    def execute_intent(self, intent):
+        """Do what a recognised command asks (returns the motor command for movements)"""
+        if intent.action == 'stop':
+            self.emergency_stop()
+        elif intent.action == 'look':
             what_i_see = self.camera.capture()
             print(f"👀 {self.name}: I see {what_i_see}")
+        else:
+            move, seconds, speed = {
+                'forward': (self.motors.move_forward, 2, 80),
+                'backward': (self.motors.move_backward, 2, 80),
+                'left': (self.motors.turn_left, 1, 70),
+                'right': (self.motors.turn_right, 1, 70),
+            }[intent.action]
+            if intent.seconds is not None:
+                seconds = min(intent.seconds, self.max_move_seconds)
+            if intent.speed is not None:
+                speed = intent.speed
+            return move(seconds, speed)
+    
+    def wants_speech(self, user_input):
+        """Say this reply out loud? (always with speak_replies, otherwise when asked to)"""
+        return self.speak_replies or any(word in user_input.lower() for word in ['speak', 'talk', 'say hello'])
+    
+    def do_actions(self, user_input, response, spoken=False, handled=False):
+        """Perform physical actions based on conversation"""
+        response_lower = response.lower()
+        
+        # Movement and camera commands the fast path wasn't sure enough about
+        if not handled:
+            for intent in self.intents.actionable(user_input):
+                self.execute_intent(intent)
         
         # Voice commands
-        if any(word in input_lower for word in ['speak', 'talk', 'say hello']):
+        if self.wants_speech(user_input) and not spoken:
             self.voice.speak(response)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Async Robot Runtime - Listens, thinks, moves and talks at the same time
+Keyboard and microphone feed the input queues; the AI and the motors/camera
+run as their own tasks and Voice speaks on its own thread, so nothing waits
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from robot import split_sentences
+
+class Turn:
+    """One thing the human said, and when each part of the answer happened"""
+
+    def __init__(self, source, text):
+        self.source = source
+        self.text = text
+        self.received_at = time.monotonic()
+        self.first_token = None
+        self.first_word = None
+        self.reply = None
+        self.reply_done = None
+        self.actions_done = None
+
+    def since_received(self, moment):
+        return moment - self.received_at if moment is not None else None
+
+class AsyncRuntime:
+    def __init__(self, robot, use_voice=True):
+        self.robot = robot
+        self.use_voice = use_voice
+
+        self.loop = None
+        self.stopping = None
+        self.turns = None
+        self.actions = None
+
+        # Blocking drivers (Ollama, OpenCV, GPIO, TTS) run in here
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="robot")
+        self.finished_turns = []
+
+    async def run(self):
+        """Run until the human says quit"""
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        self.turns = asyncio.Queue()
+        self.actions = asyncio.Queue()
+
+        robot = self.robot
+        print(f"\n🤖 {robot.name}: Hi! I'm ready to help! (async mode)")
+        print("💬 Type, or talk if a microphone is connected")
+        print("❌ Type 'quit' to exit\n")
+
+        # Input sources block on input()/the microphone, so they get their own daemon threads
+        threading.Thread(target=self._keyboard_source, daemon=True).start()
+        if self.use_voice and robot.voice.voice_available:
+            threading.Thread(target=self._voice_source, daemon=True).start()
+
+        workers = [
+            asyncio.create_task(self._think_worker()),
+            asyncio.create_task(self._action_worker()),
+        ]
+
+        try:
+            await self.stopping.wait()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self._print_summary()
+
+    def _submit_input(self, source, text):
+        """Called from an input thread - hand the text to the event loop"""
+        self.loop.call_soon_threadsafe(self._route_input, source, text)
+
+    def _route_input(self, source, text):
+        """Start thinking and acting on new input at the same moment"""
+        if text.lower() in ['quit', 'exit', 'bye']:
+            print("🤖 Robot: Thanks for chatting! Shutting down...")
+            self.stopping.set()
+            return
+
+        # Barge-in: stop saying the old answer as soon as there's a new question
+        self.robot.voice.interrupt()
+
+        turn = Turn(source, text)
+        self.actions.put_nowait(turn)
+
+        # Clear commands don't need the AI at all if configured that way
+        if self.robot.intents.skip_llm and self.robot.confident_intents(text):
+            turn.reply_done = turn.received_at
+            return
+        self.turns.put_nowait(turn)
+
+    def _keyboard_source(self):
+        """Keyboard thread"""
+        while not self.stopping.is_set():
+            try:
+                text = self.robot.input_source("👤 You: ").strip()
+            except (EOFError, KeyboardInterrupt):
+                text = "quit"
+            if text:
+                self._submit_input('keyboard', text)
+            if text == "quit":
+                break
+
+    def _voice_source(self):
+        """Microphone thread"""
+        while not self.stopping.is_set():
+            text = self.robot.voice.listen(timeout=5)
+            if text:
+                print(f"👤 You (voice): {text}")
+                self._submit_input('voice', text)
+
+    async def _think_worker(self):
+        """Ask the AI about each turn, streaming the reply"""
+        robot = self.robot
+
+        while True:
+            turn = await self.turns.get()
+            speaking = robot.wants_speech(turn.text) and robot.voice.voice_available
+
+            def _on_token(token, turn=turn):
+                if turn.first_token is None:
+                    turn.first_token = time.monotonic()
+                print(token, end="", flush=True)
+
+            def _on_word(turn=turn):
+                if turn.first_word is None:
+                    turn.first_word = time.monotonic()
+
+            def _on_sentence(sentence):
+                # Voice has its own speech thread, so this never waits on the speaker
+                robot.voice.speak(sentence, on_start=_on_word)
+
+            print("🤖 Robot: ", end="", flush=True)
+            turn.reply = await self.loop.run_in_executor(
+                self.executor,
+                lambda: robot.think_stream(turn.text, on_token=_on_token,
+                                           on_sentence=_on_sentence if speaking else None),
+            )
+            print()
+            turn.reply_done = time.monotonic()
+            # Moving and looking already started in _action_worker - what's left needs the reply
+            try:
+                await self.loop.run_in_executor(self.executor, self._act_on_reply, turn, speaking)
+            except Exception as e:
+                print(f"🤖 Robot: Oops! {e}")
+            self._turn_finished(turn)
+
+    def _act_on_reply(self, turn, spoken):
+        """Actions the AI promised (when nothing was asked for), and the voice command"""
+        robot = self.robot
+        if not robot.intents.actionable(turn.text):
+            for sentence in split_sentences(turn.reply + "\n")[0]:
+                promised = robot.intents.match_reply(sentence)
+                if promised:
+                    for intent in promised:
+                        robot.execute_intent(intent)
+                    break
+        robot.do_actions(turn.text, turn.reply, spoken=spoken, handled=True)
+
+    async def _action_worker(self):
+        """Move and look based on what the human asked"""
+        while True:
+            turn = await self.actions.get()
+            try:
+                # Motion and camera start now, without waiting for the reply: clear commands first,
+                # then ones the AI would only have been asked to confirm
+                handled = await self.loop.run_in_executor(self.executor, self.robot.fast_path, turn.text)
+                if not handled:
+                    for intent in self.robot.intents.actionable(turn.text):
+                        await self.loop.run_in_executor(self.executor, self.robot.execute_intent, intent)
+            except Exception as e:
+                print(f"🤖 Robot: Oops! {e}")
+            turn.actions_done = time.monotonic()
+            self._turn_finished(turn)
+
+    def _turn_finished(self, turn):
+        """Report a turn once both the reply and the actions are done"""
+        if turn.reply_done is None or turn.actions_done is None:
+            return
+
+        def _fmt(seconds):
+            return f"{seconds:.2f}s" if seconds is not None else "n/a"
+
+        self.finished_turns.append(turn)
+        print(f"⏱️ First token {_fmt(turn.since_received(turn.first_token))}, "
+              f"first word {_fmt(turn.since_received(turn.first_word))}, "
+              f"reply {_fmt(turn.since_received(turn.reply_done))}, "
+              f"actions {_fmt(turn.since_received(turn.actions_done))}")
+
+    def _print_summary(self):
+        """Average end-to-end turn time for the whole session"""
+        if not self.finished_turns:
+            return
+
+        totals = sorted(
+            max(turn.reply_done, turn.actions_done) - turn.received_at
+            for turn in self.finished_turns
+        )
+        middle = totals[len(totals) // 2]
+        print(f"📊 {len(totals)} turns, median turn {middle:.2f}s, worst {totals[-1]:.2f}s")
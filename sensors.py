@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+REAL OBSTACLE SENSING - No simulations!
+Reads the HC-SR04 ultrasonic sensor on its own thread and cuts the motors
+when something gets too close in front (safe_mode)
+"""
+import statistics
+import threading
+import time
+from collections import deque
+try:
+    import RPi.GPIO as GPIO
+except ImportError:
+    GPIO = None
+import metrics
+from config import load_config, setting
+
+DISTANCE_CM = metrics.histogram('sensor_distance_cm', "Filtered ultrasonic distance",
+                                buckets=(5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 400))
+STOP_LATENCY_SECONDS = metrics.histogram('sensor_stop_latency_seconds', "Echo received to motors stopped",
+                                         buckets=metrics.FAST_BUCKETS)
+READINGS = metrics.counter('sensor_readings', "Ultrasonic pings by outcome", labels=('result',))
+
+# Sound travels 34300 cm/s, and the echo covers the distance twice
+CM_PER_SECOND = 34300 / 2
+# With nothing in range the HC-SR04 still answers, with a ~38 ms echo pulse
+OUT_OF_RANGE_PULSE = 0.038
+
+class UltrasonicMonitor:
+    """Pings at a fixed rate, times echoes with edge callbacks, keeps a median-filtered distance"""
+
+    def __init__(self, motors=None, trigger_pin=None, echo_pin=None):
+        print("📡 Initializing REAL ultrasonic sensor...")
+        if GPIO is None:
+            raise RuntimeError("RPi.GPIO not available - is this a Raspberry Pi?")
+
+        config = load_config()
+        self.motors = motors
+        self.trigger_pin = trigger_pin or setting(config, 'hardware.sensors.ultrasonic_trigger', 24)
+        self.echo_pin = echo_pin or setting(config, 'hardware.sensors.ultrasonic_echo', 25)
+        self.rate = max(20, setting(config, 'hardware.sensors.ultrasonic_rate_hz', 20))
+        self.max_distance = setting(config, 'hardware.sensors.max_distance_cm', 400)
+        self.stop_distance = setting(config, 'behavior.stop_distance_cm', 25)
+        self.safe_mode = setting(config, 'behavior.safe_mode', True)
+        # This many pings in a row with no echo and the distance is unknown (blocked in safe_mode)
+        self.max_timeouts = setting(config, 'hardware.sensors.ultrasonic_max_timeouts', 3)
+
+        # Last few readings - the median throws away odd echoes
+        self.readings = deque(maxlen=setting(config, 'hardware.sensors.ultrasonic_window', 5))
+        self.distance = None
+        self.reading_at = None
+        self._lock = threading.Lock()
+
+        # Filled in by the echo pin's edge callback - first edge after a ping is the rise, second the fall
+        self._rise_at = None
+        self._fall_at = None
+        self._echo = threading.Event()
+
+        self.pings = 0
+        self.timeouts = 0
+        self.timeouts_in_row = 0
+        # Until the first echo we can't tell a blind sensor from one that isn't wired up
+        self.answered = False
+        self.late_ticks = 0
+        self.max_jitter = 0.0
+        self.stops = 0
+        self.blocked = 0
+        self.last_stop_latency = None
+        self.max_stop_latency = 0.0
+
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(self.trigger_pin, GPIO.OUT)
+        GPIO.output(self.trigger_pin, GPIO.LOW)
+        GPIO.setup(self.echo_pin, GPIO.IN)
+        GPIO.add_event_detect(self.echo_pin, GPIO.BOTH, callback=self._on_echo_edge)
+
+        if motors is not None and self.safe_mode:
+            motors.forward_interlock = self.forward_blocked
+
+        self._running = True
+        self._thread = threading.Thread(target=self._ping_loop, daemon=True)
+        self._thread.start()
+
+        print(f"✅ Ultrasonic sensor on GPIO {self.trigger_pin}/{self.echo_pin} at {self.rate} Hz"
+              f"{f', stopping under {self.stop_distance} cm' if self.safe_mode else ''}")
+
+    def _on_echo_edge(self, channel):
+        """GPIO callback - note when the echo pulse starts and ends
+        
+        Edges alternate, so the level isn't read back: by the time the callback runs,
+        a short (close) echo may already be over
+        """
+        now = time.monotonic()
+        if self._rise_at is None:
+            self._rise_at = now
+        elif self._fall_at is None:
+            self._fall_at = now
+            self._echo.set()
+
+    def _ping(self):
+        """Send one 10 us trigger pulse and wait for the echo (None if it never came)"""
+        self._rise_at = None
+        self._fall_at = None
+        self._echo.clear()
+
+        GPIO.output(self.trigger_pin, GPIO.HIGH)
+        time.sleep(0.00001)
+        GPIO.output(self.trigger_pin, GPIO.LOW)
+
+        # Longest echo the sensor sends (the out-of-range one), plus a little for it to start
+        timeout = max(self.max_distance / CM_PER_SECOND, OUT_OF_RANGE_PULSE) + 0.005
+        if not self._echo.wait(timeout):
+            return None, None
+        return min((self._fall_at - self._rise_at) * CM_PER_SECOND, self.max_distance), self._fall_at
+
+    def _ping_loop(self):
+        """Sensor thread - pings on fixed monotonic deadlines"""
+        period = 1.0 / self.rate
+        next_ping = time.monotonic()
+        while self._running:
+            now = time.monotonic()
+            jitter = now - next_ping
+            self.max_jitter = max(self.max_jitter, jitter)
+            if jitter > period:
+                # Fell behind (busy CPU) - skip the missed slots instead of bunching up
+                self.late_ticks += 1
+                next_ping = now
+
+            try:
+                self._take_reading()
+            except Exception as e:
+                print(f"❌ Ultrasonic error: {e}")
+
+            next_ping += period
+            time.sleep(max(0.0, next_ping - time.monotonic()))
+
+    def _take_reading(self):
+        distance, echo_at = self._ping()
+        self.pings += 1
+        if distance is None:
+            # No echo says nothing about the path - it may be clear, or the sensor may be blind
+            self.timeouts += 1
+            READINGS.labels('timeout').inc()
+            with self._lock:
+                self.timeouts_in_row += 1
+                if self.timeouts_in_row != self.max_timeouts:
+                    return
+                self.readings.clear()
+                self.distance = None
+                self.reading_at = time.monotonic()
+            if not self.answered:
+                print(f"⚠️ No echo from the ultrasonic sensor on GPIO {self.trigger_pin}/{self.echo_pin} - "
+                      f"not guarding the motors until it answers")
+            elif self.safe_mode:
+                self._cut_motors(self.reading_at, "No echo from the distance sensor")
+            return
+
+        READINGS.labels('echo').inc()
+        with self._lock:
+            self.answered = True
+            self.timeouts_in_row = 0
+            self.readings.append(distance)
+            self.distance = statistics.median(self.readings)
+            self.reading_at = echo_at
+        DISTANCE_CM.observe(self.distance)
+
+        if self.safe_mode and self.distance < self.stop_distance:
+            self._cut_motors(echo_at, f"Obstacle at {self.distance:.0f} cm")
+
+    def _cut_motors(self, echo_at, reason):
+        """Stop forward motion right away and time how long that took"""
+        motors = self.motors
+        if motors is None or not motors.is_moving('forward'):
+            return
+
+        motors.stop()
+        latency = time.monotonic() - echo_at
+        self.stops += 1
+        self.last_stop_latency = latency
+        self.max_stop_latency = max(self.max_stop_latency, latency)
+        STOP_LATENCY_SECONDS.observe(latency)
+        print(f"🧱 {reason} - motors cut in {latency * 1000:.1f} ms")
+
+    def forward_blocked(self):
+        """Interlock for Motors - a reason not to drive forward, or None"""
+        with self._lock:
+            distance = self.distance
+            blind = self.answered and self.timeouts_in_row >= self.max_timeouts
+        if blind:
+            self.blocked += 1
+            return "no echo from the distance sensor"
+        if distance is not None and distance < self.stop_distance:
+            self.blocked += 1
+            return f"obstacle {distance:.0f} cm ahead"
+        return None
+
+    def get_distance(self):
+        """Filtered distance in cm (None before the first reading, or while no echoes come back)"""
+        with self._lock:
+            return self.distance
+
+    def stats(self):
+        """Readings, timing and how often safe_mode stepped in"""
+        with self._lock:
+            distance = self.distance
+        return {
+            'distance_cm': distance,
+            'pings': self.pings,
+            'timeouts': self.timeouts,
+            'timeouts_in_row': self.timeouts_in_row,
+            'answered': self.answered,
+            'late_ticks': self.late_ticks,
+            'max_jitter': self.max_jitter,
+            'stops': self.stops,
+            'blocked': self.blocked,
+            'last_stop_latency': self.last_stop_latency,
+            'max_stop_latency': self.max_stop_latency,
+            # Worst case: enough close readings to move the median, plus one ping
+            'stop_bound': (self.readings.maxlen // 2 + 2) / self.rate,
+        }
+
+    def shutdown(self):
+        """Stop pinging and let go of the pins"""
+        self._running = False
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        if self.motors is not None and getattr(self.motors, 'forward_interlock', None) == self.forward_blocked:
+            self.motors.forward_interlock = None
+        try:
+            GPIO.remove_event_detect(self.echo_pin)
+        except Exception:
+            pass
+
+# Standalone test
+if __name__ == "__main__":
+    print("📡 ULTRASONIC TEST MODE")
+    sensor = UltrasonicMonitor()
+    try:
+        for _ in range(20):
+            time.sleep(0.5)
+            distance = sensor.get_distance()
+            print(f"📏 {distance:.1f} cm" if distance is not None else "📏 no reading yet")
+    finally:
+        sensor.shutdown()
+    print(sensor.stats())
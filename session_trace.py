@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+Session Traces - Record everything the robot saw, heard and did, then play it back
+A replay needs no camera, microphone, GPIO or Ollama, so a field session
+can be rerun and profiled on any Linux box
+
+    python3 start-robot.py --record traces/today
+    python3 session_trace.py replay traces/today [--realtime]
+    python3 session_trace.py info traces/today
+"""
+import gzip
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import cv2
+import numpy as np
+import ollama
+from camera import Camera
+from config import load_config, setting
+from motors import MotorCommand
+from robot import Robot
+from voice import Utterance
+
+EVENTS_FILE = "events.jsonl.gz"
+MOTOR_METHODS = ('move_forward', 'move_backward', 'turn_left', 'turn_right', 'stop')
+
+def _plain(response):
+    """Ollama response (pydantic model or dict) as plain JSON-able dict"""
+    if hasattr(response, 'model_dump'):
+        return response.model_dump(mode='json', exclude_none=True)
+    return dict(response)
+
+class TraceRecorder:
+    """Writes one session to a directory: an event log plus compressed frame/audio chunks"""
+
+    def __init__(self, path, chunk_frames=32, chunk_audio=64, max_chunks=2):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.chunk_audio = chunk_audio
+        self.started = time.monotonic()
+        self.closed = False
+
+        self._lock = threading.Lock()
+        self._events = gzip.open(os.path.join(path, EVENTS_FILE), 'wt', encoding='utf-8')
+        self._pending = {'frames': [], 'audio': []}
+        self._chunk_numbers = {'frames': 0, 'audio': 0}
+        self.counts = {}
+        self.dropped_frames = 0
+
+        # Compressing frames is slow - do it off the camera thread. Only a couple of
+        # chunks may wait, so a writer that can't keep up costs frames, not memory
+        self._chunks = queue.Queue(maxsize=max_chunks)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def now(self):
+        """Seconds since recording started"""
+        return time.monotonic() - self.started
+
+    def event(self, kind, **data):
+        """Add one event to the log"""
+        with self._lock:
+            self._write_event(kind, data)
+
+    def _write_event(self, kind, data):
+        if self.closed:
+            return
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        # Callbacks and return values like voice.speak's on_start and Utterance aren't JSON - log their repr
+        self._events.write(json.dumps(dict(t=round(self.now(), 6), kind=kind, **data), default=repr) + "\n")
+
+    def frame(self, ok, frame):
+        """A camera read - the pixels go to the next frames chunk"""
+        with self._lock:
+            if not ok or frame is None:
+                self._write_event('frame', {'ok': False})
+                return
+            if self._chunks.full():
+                # Writer is behind - log that a frame was read, but keep no pixels
+                self.dropped_frames += 1
+                self._write_event('frame', {'ok': True, 'dropped': True})
+                return
+            chunk, index = self._add('frames', frame.copy(), self.chunk_frames)
+            self._write_event('frame', {'ok': True, 'chunk': chunk, 'index': index})
+
+    def audio(self, data, sample_rate):
+        """Raw 16-bit microphone audio"""
+        with self._lock:
+            chunk, index = self._add('audio', np.frombuffer(data, dtype=np.uint8).copy(), self.chunk_audio)
+            self._write_event('audio', {'chunk': chunk, 'index': index, 'sample_rate': sample_rate})
+
+    def _add(self, kind, array, per_chunk):
+        """Queue an array for its chunk file, handing full chunks to the writer"""
+        chunk = self._chunk_numbers[kind]
+        index = len(self._pending[kind])
+        self._pending[kind].append(array)
+        if len(self._pending[kind]) >= per_chunk:
+            self._flush(kind)
+        return chunk, index
+
+    def _flush(self, kind):
+        if not self._pending[kind]:
+            return
+        name = f"{kind}_{self._chunk_numbers[kind]:05d}.npz"
+        self._chunks.put((name, self._pending[kind]))
+        self._pending[kind] = []
+        self._chunk_numbers[kind] += 1
+
+    def _write_loop(self):
+        while True:
+            item = self._chunks.get()
+            if item is None:
+                break
+            name, arrays = item
+            try:
+                # One entry per array, so frames of different sizes can share a chunk
+                np.savez_compressed(os.path.join(self.path, name),
+                                    **{str(i): array for i, array in enumerate(arrays)})
+            except OSError as e:
+                print(f"⚠️ Could not save {name}: {e}")
+
+    def close(self):
+        """Write out the last chunks and close the log"""
+        with self._lock:
+            if self.closed:
+                return
+            self._write_event('end', {'counts': dict(self.counts), 'dropped_frames': self.dropped_frames})
+            self.closed = True
+            self._flush('frames')
+            self._flush('audio')
+            self._events.close()
+        self._chunks.put(None)
+        self._writer.join()
+        print(f"💾 Session trace saved to {self.path}: {self.counts}")
+        if self.dropped_frames:
+            print(f"⚠️ {self.dropped_frames} frames weren't saved - the disk couldn't keep up")
+
+class RecordingCapture:
+    """cv2.VideoCapture that also records every frame read"""
+
+    def __init__(self, cap, recorder):
+        self.cap = cap
+        self.recorder = recorder
+
+    def read(self, image=None):
+        ret, frame = self.cap.read() if image is None else self.cap.read(image)
+        self.recorder.frame(ret, frame)
+        return ret, frame
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+class RecordingClient:
+    """Ollama client that records each request and the reply with its timing"""
+
+    def __init__(self, client, recorder):
+        self.client = client
+        self.recorder = recorder
+        self._ids = iter(range(1 << 62))
+
+    def generate(self, stream=False, **kwargs):
+        request_id = next(self._ids)
+        self.recorder.event('llm_request', id=request_id, prompt=kwargs.get('prompt', ""),
+                            stream=stream, context=bool(kwargs.get('context')))
+        started = time.monotonic()
+        if not stream:
+            response = self.client.generate(**kwargs)
+            self.recorder.event('llm_response', id=request_id, final=_plain(response),
+                                chunks=[[round(time.monotonic() - started, 6), response['response']]])
+            return response
+        return self._record_stream(request_id, started, self.client.generate(stream=True, **kwargs))
+
+    def _record_stream(self, request_id, started, chunks):
+        tokens = []
+        final = {}
+        try:
+            for chunk in chunks:
+                tokens.append([round(time.monotonic() - started, 6), chunk['response']])
+                if chunk.get('done'):
+                    final = _plain(chunk)
+                yield chunk
+        finally:
+            self.recorder.event('llm_response', id=request_id, final=final, chunks=tokens)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+class RecordingProxy:
+    """Wraps a subsystem and logs calls to some of its methods"""
+
+    def __init__(self, target, recorder, kind, methods, keep_result=False):
+        self._target = target
+        self._recorder = recorder
+        self._kind = kind
+        self._methods = methods
+        self._keep_result = keep_result
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if name not in self._methods:
+            return attribute
+
+        def _recorded(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            data = {'method': name, 'args': list(args), 'kwargs': kwargs}
+            if self._keep_result:
+                data['result'] = result
+            self._recorder.event(self._kind, **data)
+            return result
+        return _recorded
+
+class RecordingRobot(Robot):
+    """Robot that writes a session trace while it runs"""
+
+    def __init__(self, path, mode='sync'):
+        self.recorder = TraceRecorder(path)
+        super().__init__(lazy=False)
+        recorder = self.recorder
+
+        self.motors = RecordingProxy(self.motors, recorder, 'motor', MOTOR_METHODS)
+        voice = self.voice
+        voice.audio_tap = recorder.audio
+        self.voice = RecordingProxy(voice, recorder, 'voice', ('speak',))
+        # Cache hits and misses, so a replay takes the same path through think()
+        if self.response_cache:
+            self.response_cache = RecordingProxy(self.response_cache, recorder, 'cache', ('get',),
+                                                 keep_result=True)
+
+        typed = self.input_source
+        def _typed(prompt):
+            text = typed(prompt)
+            recorder.event('input', source='keyboard', text=text)
+            return text
+        self.input_source = _typed
+
+        # Heard text goes in as an input event too, so replay can feed it back
+        listen = voice.listen
+        def _listen(*args, **kwargs):
+            text = listen(*args, **kwargs)
+            recorder.event('input', source='voice', text=text)
+            return text
+        voice.listen = _listen
+
+        recorder.event('session', name=self.name, model=self.model, mode=mode,
+                       hardware=self.hardware.summary(), components=self.hardware.components)
+
+    def _start_camera(self):
+        """Same camera, but every frame read is recorded - including the first"""
+        hardware = self._subsystem('hardware')
+        cap = hardware.take_camera(hardware.camera_index)
+        if cap is None:
+            import cv2
+            cap = cv2.VideoCapture(hardware.camera_index)
+        camera = Camera(capture=RecordingCapture(cap, self.recorder))
+        hardware.release_unclaimed()
+        return camera
+
+    def _start_ai(self, client=None):
+        return super()._start_ai(RecordingClient(client or ollama.Client(), self.recorder))
+
+class TraceReader:
+    """Loads a recorded session"""
+
+    def __init__(self, path):
+        self.path = path
+        with gzip.open(os.path.join(path, EVENTS_FILE), 'rt', encoding='utf-8') as f:
+            # A crashed recording can end with half a line
+            self.events = []
+            for line in f:
+                try:
+                    self.events.append(json.loads(line))
+                except ValueError:
+                    break
+        self._loaded = {}
+
+        session = self.of_kind('session')
+        self.session = session[0] if session else {}
+        self.duration = self.events[-1]['t'] if self.events else 0.0
+
+    def of_kind(self, kind):
+        return [event for event in self.events if event['kind'] == kind]
+
+    def array(self, kind, event):
+        """The frame or audio buffer an event points at"""
+        name = f"{kind}_{event['chunk']:05d}.npz"
+        if name not in self._loaded:
+            # Only the chunk in use stays in memory
+            with np.load(os.path.join(self.path, name)) as chunk:
+                self._loaded = {name: [chunk[str(i)] for i in range(len(chunk.files))]}
+        return self._loaded[name][event['index']]
+
+    def llm_exchanges(self):
+        """(request, response) pairs in the order they were asked"""
+        responses = {event['id']: event for event in self.of_kind('llm_response')}
+        return [(request, responses[request['id']]) for request in self.of_kind('llm_request')
+                if request['id'] in responses]
+
+class ReplayClock:
+    """Trace time during a replay - real time, or as fast as the code can go"""
+
+    def __init__(self, realtime=False):
+        self.realtime = realtime
+        self.started = time.monotonic()
+
+    def wait_until(self, t):
+        if self.realtime:
+            time.sleep(max(0.0, self.started + t - time.monotonic()))
+
+    def sleep(self, seconds):
+        if self.realtime and seconds > 0:
+            time.sleep(seconds)
+
+class ReplayCapture:
+    """Stands in for cv2.VideoCapture, serving the recorded frames in order"""
+
+    def __init__(self, reader, clock):
+        self.reader = reader
+        self.clock = clock
+        self.frames = reader.of_kind('frame')
+        self.position = 0
+        self.opened = True
+        self.last_frame = None
+        self.shape = next((reader.array('frames', event).shape
+                           for event in self.frames if event['ok'] and not event.get('dropped')), (480, 640, 3))
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        if not self.opened or self.position >= len(self.frames):
+            return False, None
+        event = self.frames[self.position]
+        self.position += 1
+        self.clock.wait_until(event['t'])
+        if not event['ok']:
+            return False, None
+
+        if event.get('dropped'):
+            # Not saved while recording - the robot did get a frame, so repeat the last one
+            if self.last_frame is None:
+                return False, None
+            frame = self.last_frame
+        else:
+            frame = self.last_frame = self.reader.array('frames', event)
+        if image is not None and image.shape == frame.shape:
+            image[...] = frame
+            return True, image
+        return True, frame.copy()
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.shape[1],
+                cv2.CAP_PROP_FRAME_HEIGHT: self.shape[0]}.get(prop, 0)
+
+    def set(self, prop, value):
+        return True
+
+    def release(self):
+        self.opened = False
+
+class ReplayClient:
+    """Stands in for the Ollama client, giving back the recorded replies"""
+
+    def __init__(self, reader, clock):
+        self.clock = clock
+        # The warm-up (empty prompt) isn't a real question
+        self.exchanges = [(request, response) for request, response in reader.llm_exchanges()
+                          if request['prompt'].strip()]
+        self.used = set()
+        self.misses = 0
+
+    def _find(self, prompt):
+        """Same prompt first, otherwise the next unused reply"""
+        for i, (request, _) in enumerate(self.exchanges):
+            if i not in self.used and request['prompt'] == prompt:
+                break
+        else:
+            i = next((i for i in range(len(self.exchanges)) if i not in self.used), None)
+            if i is None:
+                return None
+            self.misses += 1
+        self.used.add(i)
+        return self.exchanges[i][1]
+
+    def generate(self, model=None, prompt="", stream=False, **kwargs):
+        response = self._find(prompt)
+        if response is None:
+            chunks, final = [[0.0, "" if not prompt.strip() else "(nothing recorded for this)"]], {}
+        else:
+            chunks, final = response['chunks'], response['final']
+
+        if not stream:
+            self.clock.sleep(chunks[-1][0] if chunks else 0.0)
+            return dict(final, response="".join(token for _, token in chunks), done=True)
+        return self._stream(chunks, final)
+
+    def _stream(self, chunks, final):
+        started = time.monotonic()
+        for i, (offset, token) in enumerate(chunks):
+            self.clock.sleep(started + offset - time.monotonic())
+            if i == len(chunks) - 1:
+                yield dict(final, response=token, done=True)
+            else:
+                yield {'response': token, 'done': False}
+
+class ReplayMotors:
+    """Stands in for Motors - commands finish straight away (or after their time in real time)"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+        self.motors_on = False
+
+    def _move(self, name, seconds, speed):
+        command = MotorCommand(name, (), seconds, speed)
+        command.started_at = time.monotonic()
+        if self.clock.realtime:
+            command._set_status('running')
+            timer = threading.Timer(seconds, command._set_status, args=('done',))
+            timer.daemon = True
+            timer.start()
+        else:
+            command._set_status('done')
+        return command
+
+    def _recorded(method, name):
+        def _call(self, seconds=None, speed=None, queue=False):
+            self.calls.append(method)
+            defaults = (2, 80) if name in ('forward', 'backward') else (1, 70)
+            return self._move(name, seconds or defaults[0], speed or defaults[1])
+        return _call
+
+    move_forward = _recorded('move_forward', 'forward')
+    move_backward = _recorded('move_backward', 'backward')
+    turn_left = _recorded('turn_left', 'left')
+    turn_right = _recorded('turn_right', 'right')
+    del _recorded
+
+    def stop(self):
+        self.calls.append('stop')
+        return "Motors stopped"
+
+    def scheduler_stats(self):
+        return {'commands_submitted': len(self.calls)}
+
+    def shutdown(self):
+        pass
+
+class ReplayInputs:
+    """Feeds the recorded typed and heard text back in, in the order it came"""
+
+    def __init__(self, reader, clock, merge_voice=False):
+        self.clock = clock
+        self.merge_voice = merge_voice
+        self.inputs = [event for event in reader.of_kind('input') if event.get('text')]
+        self.position = 0
+        self._turn = threading.Condition()
+
+    def _next(self, source):
+        with self._turn:
+            # Wait until the next recorded input is ours
+            while self.position < len(self.inputs):
+                event = self.inputs[self.position]
+                if self.merge_voice or event['source'] == source:
+                    self.position += 1
+                    self._turn.notify_all()
+                    break
+                self._turn.wait(0.5)
+            else:
+                return None
+        self.clock.wait_until(event['t'])
+        return event['text']
+
+    def typed(self, prompt=""):
+        """Drop-in for input()"""
+        text = self._next('keyboard')
+        if text is None:
+            text = "quit"
+        print(f"{prompt}{text}")
+        return text
+
+    def heard(self):
+        return self._next('voice')
+
+class ReplayVoice:
+    """Stands in for Voice - hears the recorded text, 'speaks' instantly"""
+
+    def __init__(self, inputs, reader=None, recognizer=None):
+        self.inputs = inputs
+        self.reader = reader
+        self.recognizer = recognizer
+        self.voice_available = True
+        self.last_latency = None
+        self.spoken = []
+        self._audio = reader.of_kind('audio') if reader else []
+
+    def listen(self, timeout=5, on_partial=None):
+        text = self.inputs.heard()
+        if text is None:
+            time.sleep(timeout)
+            return None
+        if self.recognizer is not None:
+            text = self._recognize(text, on_partial) or text
+        return text
+
+    def _recognize(self, text, on_partial):
+        """Run the recognizer over the recorded audio of this utterance (for profiling it)"""
+        from recognizers import stream_chunks
+        heard = next((event for event in self.reader.of_kind('input')
+                      if event['source'] == 'voice' and event.get('text') == text), None)
+        if heard is None:
+            return None
+        chunks = [self.reader.array('audio', event).tobytes() for event in self._audio
+                  if event['t'] <= heard['t']]
+        self._audio = [event for event in self._audio if event['t'] > heard['t']]
+        result, self.last_latency = stream_chunks(self.recognizer, chunks, on_partial)
+        return result
+
+    def speak(self, text, wait=False, on_start=None):
+        self.spoken.append(text)
+        utterance = Utterance(text, on_start)
+        if on_start:
+            on_start()
+        utterance.started.set()
+        utterance.done.set()
+        return utterance
+
+    def interrupt(self):
+        pass
+
+    def is_speaking(self):
+        return False
+
+    def wait_until_done(self, timeout=None):
+        return True
+
+class ReplayCache:
+    """Stands in for the response cache - every lookup hits or misses like it did back then"""
+
+    def __init__(self, reader, cache):
+        self.cache = cache
+        self.lookups = {}
+        for event in reader.of_kind('cache'):
+            self.lookups.setdefault(event['args'][0], []).append(event.get('result'))
+
+    def make_key(self, *args):
+        return self.cache.make_key(*args)
+
+    def get(self, key):
+        results = self.lookups.get(key)
+        return results.pop(0) if results else None
+
+    def put(self, key, response):
+        pass
+
+    def stats(self):
+        return self.cache.stats()
+
+class ReplayHardware:
+    """Stands in for Hardware - reports what the recorded robot had"""
+
+    def __init__(self, reader):
+        self.components = reader.session.get('components', {})
+        self._summary = reader.session.get('hardware', "")
+        self.camera_index = 0
+
+    def summary(self):
+        return self._summary
+
+    def take_camera(self, index):
+        return None
+
+    def release_unclaimed(self):
+        pass
+
+def record_session(path, mode='sync'):
+    """Start the robot with recording on; call recorder.close() when done"""
+    print(f"⏺️ Recording this session to {path}")
+    return RecordingRobot(path, mode=mode)
+
+def replay_session(path, realtime=False, recognizer=None):
+    """Run a recorded session again with stand-ins for all the hardware"""
+    reader = TraceReader(path)
+    clock = ReplayClock(realtime)
+    mode = reader.session.get('mode', 'sync')
+    inputs = ReplayInputs(reader, clock, merge_voice=(mode != 'async'))
+    motors = ReplayMotors(clock)
+    voice = ReplayVoice(inputs, reader, recognizer)
+    client = ReplayClient(reader, clock)
+
+    print(f"⏯️ Replaying {path} ({reader.duration:.1f}s recorded, "
+          f"{'real time' if realtime else 'as fast as possible'})")
+    bot = Robot(lazy=False, parts={
+        'hardware': lambda: ReplayHardware(reader),
+        'motors': lambda: motors,
+        'camera': lambda: Camera(capture=ReplayCapture(reader, clock), save=False, stream=False),
+        'voice': lambda: voice,
+        'ai': lambda: client,
+    })
+    bot.input_source = inputs.typed
+    if bot.response_cache:
+        # A replay must leave the robot's real cache file alone
+        bot.response_cache.disk_path = None
+        bot.response_cache = ReplayCache(reader, bot.response_cache)
+
+    clock.started = time.monotonic()
+    if mode == 'async':
+        bot.start_async_conversation()
+    else:
+        bot.start_conversation()
+    elapsed = time.monotonic() - clock.started
+
+    # Did the robot do the same things it did back then?
+    recorded = [event['method'] for event in reader.of_kind('motor')]
+    print(f"⏱️ Replay took {elapsed:.2f}s for {reader.duration:.1f}s of session")
+    if motors.calls == recorded:
+        print(f"✅ Same {len(recorded)} motor commands as the recording")
+    else:
+        print(f"⚠️ Motor commands differ - recorded {recorded}, replayed {motors.calls}")
+    if client.misses:
+        print(f"⚠️ {client.misses} AI prompts didn't match the recording (replies used in order)")
+    return {'elapsed': elapsed, 'recorded': reader.duration, 'motor_calls': motors.calls,
+            'spoken': voice.spoken, 'prompt_misses': client.misses}
+
+def show_info(path):
+    """Print what's in a trace"""
+    reader = TraceReader(path)
+    counts = {}
+    for event in reader.events:
+        counts[event['kind']] = counts.get(event['kind'], 0) + 1
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    print(f"📼 {path}: {reader.duration:.1f}s, {size / 1e6:.1f} MB")
+    print(f"   Robot: {reader.session.get('name')} ({reader.session.get('model')}, {reader.session.get('mode')} mode)")
+    print(f"   Hardware: {reader.session.get('hardware')}")
+    for kind, count in sorted(counts.items()):
+        print(f"   {kind}: {count}")
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(args) != 2 or args[0] not in ('replay', 'info'):
+        print("Usage: python3 session_trace.py replay|info TRACE_DIR [--realtime] [--recognize]")
+        sys.exit(1)
+
+    if args[0] == 'info':
+        show_info(args[1])
+    else:
+        recognizer = None
+        if '--recognize' in sys.argv:
+            from recognizers import make_recognizer
+            config = load_config()
+            recognizer = make_recognizer(setting(config, 'voice.recognizer', "google"),
+                                         setting(config, 'voice.vosk_model'),
+                                         setting(config, 'voice.sample_rate', 16000))
+            if not recognizer.streaming:
+                print("⚠️ --recognize needs a streaming recognizer (voice.recognizer: vosk)")
+                recognizer = None
+        replay_session(args[1], realtime='--realtime' in sys.argv, recognizer=recognizer)
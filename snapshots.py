@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Snapshot Saver - Writes camera pictures to disk in the background
+Keeps the capture folder from growing forever (count, size and age limits)
+"""
+import glob
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+
+class SnapshotWriter:
+    def __init__(self, directory="captures", image_format="jpg", quality=85, queue_size=4,
+                 max_files=200, max_megabytes=100, max_age_hours=24):
+        self.directory = directory
+        self.image_format = image_format.lower().lstrip('.')
+        self.quality = quality
+        self.max_files = max_files
+        self.max_bytes = int(max_megabytes * 1024 * 1024) if max_megabytes else None
+        self.max_age = max_age_hours * 3600 if max_age_hours else None
+
+        self.encode_params = self._encode_params()
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        # Files we know about, oldest first: (time written, path, bytes)
+        self.files = deque()
+        self.total_bytes = 0
+        self._counter = itertools.count(1)
+
+        self.saved = 0
+        self.dropped = 0
+        self.errors = 0
+        self.deleted = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._scan_existing()
+
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+        print(f"💾 Saving snapshots to {self.directory}/ as {self.image_format}")
+
+    def _encode_params(self):
+        """OpenCV settings for the chosen picture format"""
+        if self.image_format in ('jpg', 'jpeg'):
+            return [cv2.IMWRITE_JPEG_QUALITY, int(self.quality)]
+        if self.image_format == 'webp':
+            return [cv2.IMWRITE_WEBP_QUALITY, int(self.quality)]
+        if self.image_format == 'png':
+            # PNG is lossless - map quality 0-100 onto compression 9-0
+            return [cv2.IMWRITE_PNG_COMPRESSION, max(0, min(9, 9 - int(self.quality) // 11))]
+        return []
+
+    def _scan_existing(self):
+        """Pick up pictures left over from earlier runs so retention covers them"""
+        existing = []
+        for path in glob.glob(os.path.join(self.directory, "camera_capture_*")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            existing.append((stat.st_mtime, path, stat.st_size))
+
+        for entry in sorted(existing):
+            self.files.append(entry)
+            self.total_bytes += entry[2]
+
+        self._apply_retention()
+
+    def _next_path(self):
+        """Unique file name, even for several captures in the same second"""
+        now = time.time()
+        number = next(self._counter)
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(now))
+        millis = int((now % 1) * 1000)
+        name = f"camera_capture_{stamp}_{millis:03d}_{number:04d}.{self.image_format}"
+        return os.path.join(self.directory, name)
+
+    def save(self, frame):
+        """Queue a frame to be written - returns the file name, or None if dropped"""
+        path = self._next_path()
+
+        try:
+            # Copy now: the frame may be a grabber buffer that gets reused
+            self.queue.put_nowait((frame.copy(), path))
+        except queue.Full:
+            self.dropped += 1
+            return None
+
+        return path
+
+    def _writer_loop(self):
+        """Writer thread - encode and write queued frames"""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    break
+
+                frame, path = item
+                ok, encoded = cv2.imencode(f".{self.image_format}", frame, self.encode_params)
+                if not ok:
+                    raise ValueError(f"could not encode {self.image_format}")
+
+                with open(path, 'wb') as f:
+                    f.write(encoded.tobytes())
+
+                self.files.append((time.time(), path, encoded.nbytes))
+                self.total_bytes += encoded.nbytes
+                self.saved += 1
+                self._apply_retention()
+
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Snapshot save failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _apply_retention(self):
+        """Delete the oldest pictures until we're back under every limit"""
+        now = time.time()
+
+        while self.files:
+            written_at, path, size = self.files[0]
+            too_many = self.max_files and len(self.files) > self.max_files
+            too_big = self.max_bytes and self.total_bytes > self.max_bytes
+            too_old = self.max_age and now - written_at > self.max_age
+            if not (too_many or too_big or too_old):
+                break
+
+            self.files.popleft()
+            self.total_bytes -= size
+            try:
+                os.remove(path)
+                self.deleted += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️ Could not delete old snapshot {path}: {e}")
+
+    def flush(self):
+        """Wait until everything queued so far is on disk"""
+        self.queue.join()
+
+    def close(self):
+        """Finish writing and stop the writer thread"""
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join(timeout=5)
+
+    def stats(self):
+        """How the writer is doing"""
+        return {
+            'saved': self.saved,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'deleted': self.deleted,
+            'queued': self.queue.qsize(),
+            'files': len(self.files),
+            'megabytes': round(self.total_bytes / (1024 * 1024), 2),
+        }
@@ -4,19 +4,56 @@ Llama Robot - Main Starter
 Just run this to start your robot!
 """
 from robot import Robot
+from config import load_config, setting
+from motor_drivers import exit_cleanly_on_signals
+import sys
 import time
 
-print("🚀 Starting Llama Robot...")
-print("=" * 40)
+def main():
+    print("🚀 Starting Llama Robot...")
+    print("=" * 40)
+    # A plain `kill` or a closed SSH session still stops the motors on the way out
+    exit_cleanly_on_signals()
 
-# Create robot instance
-bot = Robot()
+    # Python threads hand over the GIL every 5 ms, coarse for the motors' 10 ms tick when vision
+    # and the LLM client are busy. This is process-wide, so it's opt-in and set only here
+    switch_ms = setting(load_config(), 'behavior.switch_interval_ms')
+    if switch_ms:
+        sys.setswitchinterval(switch_ms / 1000)
+        print(f"⚙️ Threads switch every {switch_ms} ms")
 
-try:
-    # Start the robot
-    bot.start_conversation()
-except KeyboardInterrupt:
-    print("\n🤖 Robot: Goodbye! Shutting down...")
-except Exception as e:
-    print(f"🤖 Robot: Oops! {e}")
-    print("💡 Check your hardware connections and try again!") 
+    # --daemon serves the robot to several consoles/scripts over a Unix socket instead
+    if '--daemon' in sys.argv:
+        from daemon import serve
+        serve(llm_only='--llm-only' in sys.argv)
+        return
+
+    mode = 'async' if '--async' in sys.argv else 'sync'
+
+    # Create robot instance (--record DIR saves the session so it can be replayed later)
+    if '--record' in sys.argv:
+        from session_trace import record_session
+        bot = record_session(sys.argv[sys.argv.index('--record') + 1], mode=mode)
+    else:
+        bot = Robot()
+
+    try:
+        # Start the robot (--async lets it listen, think, move and talk at once)
+        if mode == 'async':
+            bot.start_async_conversation()
+        else:
+            bot.start_conversation()
+    except KeyboardInterrupt:
+        print("\n🤖 Robot: Goodbye! Shutting down...")
+    except Exception as e:
+        print(f"🤖 Robot: Oops! {e}")
+        print("💡 Check your hardware connections and try again!") 
+    finally:
+        # Moves run in the background - make sure nothing is still driving when we exit
+        bot.shutdown()
+        if hasattr(bot, 'recorder'):
+            bot.recorder.close()
+
+# Guarded so worker processes (object detection) can import this file without starting a robot
+if __name__ == "__main__":
+    main()
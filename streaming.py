@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Camera Streaming - Live view in any browser, for robots without a screen
+Serves an MJPEG stream, single snapshots and stats over HTTP:
+
+    http://<robot>:8080/              page with the live view
+    http://<robot>:8080/stream.mjpg   MJPEG stream
+    http://<robot>:8080/snapshot.jpg  one picture
+    http://<robot>:8080/stats         viewers, fps and encoding cost (JSON)
+
+Off unless hardware.camera.stream.enabled is true, and then only on this machine
+(host "127.0.0.1" - use an SSH tunnel: ssh -L 8080:localhost:8080 pi@<robot>).
+There is no password, so only set host to "0.0.0.0" to watch from other computers
+on a network you trust - anyone on it can see through the robot's camera
+
+Each camera frame is JPEG-encoded once and the same bytes go to every viewer.
+Nothing is encoded while nobody is watching, and a viewer that can't keep up
+just gets fewer frames - there is no queue to fill up
+"""
+import json
+import socket
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+import metrics
+
+ENCODE_SECONDS = metrics.histogram('stream_encode_seconds', "CPU time to JPEG-encode one stream frame",
+                                   buckets=metrics.FAST_BUCKETS)
+FRAMES = metrics.counter('stream_frames', "Stream frames by what happened to them", labels=('result',))
+
+BOUNDARY = "frame"
+# Per-viewer socket buffer - small, so a slow viewer is a frame or two behind, not seconds
+SEND_BUFFER = 128 * 1024
+PAGE = """<!doctype html>
+<html><head><title>{name}</title></head>
+<body style="margin:0;background:#111;color:#ccc;font-family:sans-serif">
+<img src="/stream.mjpg" style="display:block;max-width:100%;margin:auto">
+<p style="text-align:center">{name} - <a href="/snapshot.jpg" style="color:#ccc">snapshot</a></p>
+</body></html>
+"""
+
+class _Viewer:
+    """One connected stream client"""
+
+    def __init__(self, number, address):
+        self.number = number
+        self.address = address
+        self.connected_at = time.monotonic()
+        self.sent = 0
+        self.dropped = 0
+        self.bytes = 0
+        # When the last few frames went out, for the frame rate this viewer really gets
+        self.sent_times = deque(maxlen=30)
+
+    @property
+    def fps(self):
+        times = list(self.sent_times)
+        if len(times) < 2 or time.monotonic() - times[-1] > 2.0:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def sent_frame(self, size, skipped):
+        self.sent_times.append(time.monotonic())
+        self.sent += 1
+        self.dropped += skipped
+        self.bytes += size
+
+class FrameStream:
+    """Encodes the camera's newest frame once and hands the bytes to every viewer"""
+
+    def __init__(self, camera, host="127.0.0.1", port=8080, quality=70, max_fps=15, width=None,
+                 name="Robot Camera", client_timeout=10):
+        self.camera = camera
+        self.host = host
+        self.port = port
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.width = width
+        self.name = name
+        self.client_timeout = client_timeout
+
+        # Newest encoded frame - a new bytes object each time, so viewers can hold on to it
+        self.jpeg = None
+        self.jpeg_seq = 0
+        self.jpeg_at = None
+        self._changed = threading.Condition()
+
+        self.viewers = {}
+        self._numbers = 0
+        self._running = False
+        self._encoder = None
+        self._started_grabber = False
+        self.server = None
+
+        self.encoded = 0
+        self.encode_cpu = 0.0            # CPU seconds spent encoding, in total
+        self.encode_wall = 0.0
+        self.errors = 0
+
+    @property
+    def url(self):
+        host = _lan_address() if self.host in ("0.0.0.0", "") else self.host
+        return f"http://{host}:{self.port}/"
+
+    def start(self):
+        """Start serving (needs the camera's background grabber - starts it if off, and stops it again in stop())"""
+        if self._running:
+            return True
+        self._started_grabber = not self.camera.grabber_running
+        self.camera.start_grabber()
+        if not self.camera.grabber_running:
+            print("⚠️ Live stream needs camera frames - not started")
+            return False
+
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._running = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self._encoder = threading.Thread(target=self._encode_loop, daemon=True)
+        self._encoder.start()
+        print(f"📺 Live view on {self.url}")
+        return True
+
+    def stop(self):
+        self._running = False
+        with self._changed:
+            self._changed.notify_all()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self._encoder and self._encoder is not threading.current_thread():
+            self._encoder.join(timeout=2)
+        if self._started_grabber:
+            self._started_grabber = False
+            self.camera.stop_grabber()
+
+    def _encode_loop(self):
+        """Encoder thread - one JPEG per new camera frame, only while someone is watching"""
+        seq = self.camera.frame_seq
+        while self._running:
+            with self._changed:
+                if not self.viewers:
+                    # Nobody watching - sleep until the first viewer connects
+                    self._changed.wait(1.0)
+                    continue
+
+            if not self.camera.grabber_running:
+                time.sleep(0.5)
+                continue
+            previous = seq
+            seq = self.camera.wait_for_frame(seq)
+            if seq == previous:
+                continue
+            frame, age = self.camera.latest_frame()
+            if frame is None:
+                continue
+            try:
+                self._publish(self._encode(frame), time.monotonic() - age)
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Live stream error: {e}")
+                time.sleep(1.0)
+                continue
+
+            # Viewers don't need every frame of a 30 fps camera
+            if self.min_interval:
+                time.sleep(max(0.0, self.min_interval - (time.monotonic() - self.jpeg_at)))
+
+    def _encode(self, frame):
+        cpu, wall = time.thread_time(), time.perf_counter()
+        if self.width and frame.shape[1] > self.width:
+            height = int(frame.shape[0] * self.width / frame.shape[1])
+            frame = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", frame, self.encode_params)
+        cpu, wall = time.thread_time() - cpu, time.perf_counter() - wall
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+
+        self.encoded += 1
+        self.encode_cpu += cpu
+        self.encode_wall += wall
+        ENCODE_SECONDS.observe(cpu)
+        FRAMES.labels('encoded').inc()
+        return encoded.tobytes()
+
+    def _publish(self, jpeg, captured_at):
+        with self._changed:
+            self.jpeg = jpeg
+            self.jpeg_at = captured_at
+            self.jpeg_seq += 1
+            self._changed.notify_all()
+
+    def next_jpeg(self, after_seq, timeout=None):
+        """Newest JPEG once there is one newer than after_seq - (seq, bytes), bytes None on timeout"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.jpeg_seq > after_seq or not self._running, timeout)
+            if self.jpeg_seq <= after_seq:
+                return after_seq, None
+            return self.jpeg_seq, self.jpeg
+
+    def snapshot(self):
+        """One JPEG of what the camera sees now (reuses the stream's if it is fresh)"""
+        with self._changed:
+            if self.jpeg is not None and self.jpeg_at and time.monotonic() - self.jpeg_at < self.min_interval:
+                return self.jpeg
+        frame, _ = self.camera.latest_frame()
+        if frame is None:
+            return None
+        return self._encode(frame)
+
+    def _add_viewer(self, address):
+        with self._changed:
+            self._numbers += 1
+            viewer = self.viewers[self._numbers] = _Viewer(self._numbers, address)
+            self._changed.notify_all()
+        print(f"📺 Viewer {viewer.number} connected ({address})")
+        return viewer
+
+    def _remove_viewer(self, viewer):
+        with self._changed:
+            self.viewers.pop(viewer.number, None)
+        print(f"📺 Viewer {viewer.number} left after {viewer.sent} frames")
+
+    def _serve_stream(self, handler):
+        """Stream thread for one viewer - always sends the newest frame, skipping any it missed"""
+        handler.connection.settimeout(self.client_timeout)
+        handler.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        handler.send_response(200)
+        handler.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+        handler.send_header('Cache-Control', 'no-cache, private')
+        handler.send_header('Pragma', 'no-cache')
+        handler.end_headers()
+
+        viewer = self._add_viewer(handler.client_address[0])
+        seq = self.jpeg_seq
+        try:
+            while self._running:
+                latest, jpeg = self.next_jpeg(seq, timeout=1.0)
+                if jpeg is None:
+                    continue
+                skipped = latest - seq - 1 if viewer.sent else 0
+                seq = latest
+                handler.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                    f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                handler.wfile.write(jpeg)
+                handler.wfile.write(b"\r\n")
+                viewer.sent_frame(len(jpeg), skipped)
+                FRAMES.labels('sent').inc()
+                if skipped:
+                    FRAMES.labels('dropped').inc(skipped)
+        except (OSError, ValueError):
+            pass  # Viewer closed the page (or stopped reading for client_timeout)
+        finally:
+            self._remove_viewer(viewer)
+
+    def _handler(self):
+        stream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, body, kind):
+                self.send_response(200)
+                self.send_header('Content-Type', kind)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == '/stream.mjpg':
+                    stream._serve_stream(self)
+                elif path == '/snapshot.jpg':
+                    jpeg = stream.snapshot()
+                    if jpeg is None:
+                        self.send_error(503, "no camera frame yet")
+                    else:
+                        self._send(jpeg, 'image/jpeg')
+                elif path == '/stats':
+                    self._send(json.dumps({'stream': stream.stats(), 'viewers': stream.viewer_stats()}).encode(),
+                               'application/json')
+                elif path in ('/', '/index.html'):
+                    self._send(PAGE.format(name=stream.name).encode(), 'text/html')
+                else:
+                    self.send_error(404)
+
+        return Handler
+
+    def viewer_stats(self):
+        """Per-viewer frame rate, frames sent and dropped"""
+        now = time.monotonic()
+        with self._changed:
+            viewers = list(self.viewers.values())
+        return [{'viewer': viewer.number, 'address': viewer.address, 'fps': round(viewer.fps, 1),
+                 'sent': viewer.sent, 'dropped': viewer.dropped, 'bytes': viewer.bytes,
+                 'seconds': round(now - viewer.connected_at, 1)} for viewer in viewers]
+
+    def stats(self):
+        """Encoding cost and viewers (numbers only, for the metrics endpoint)"""
+        result = {
+            'viewers': len(self.viewers),
+            'encoded': self.encoded,
+            'encode_cpu_ms': 1000 * self.encode_cpu / self.encoded if self.encoded else 0.0,
+            'encode_ms': 1000 * self.encode_wall / self.encoded if self.encoded else 0.0,
+            'encode_cpu_seconds': self.encode_cpu,
+            'frame_bytes': len(self.jpeg) if self.jpeg else 0,
+            'errors': self.errors,
+        }
+        for viewer in self.viewer_stats():
+            number = viewer['viewer']
+            result.update({f"viewer{number}_fps": viewer['fps'], f"viewer{number}_sent": viewer['sent'],
+                           f"viewer{number}_dropped": viewer['dropped']})
+        return result
+
+def _lan_address():
+    """This machine's address on the local network (for printing a URL to open)"""
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # No packet is sent - this only picks the interface a LAN connection would use
+        probe.connect(("10.255.255.255", 1))
+        return probe.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+    finally:
+        probe.close()
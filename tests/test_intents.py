@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Intent matcher tests - run with: python3 -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from intents import IntentMatcher
+
+matcher = IntentMatcher()
+
+def actions(text):
+    return [intent.action for intent in matcher.actionable(text)]
+
+def test_everyday_back_and_straight_are_not_commands():
+    assert actions("welcome back") == []
+    assert actions("I will be back later") == []
+    assert actions("tell me straight") == []
+
+def test_back_and_straight_with_a_verb_are_commands():
+    assert actions("back up") == ['backward']
+    assert actions("go back 2 seconds") == ['backward']
+    assert actions("go straight") == ['forward']
+
+def test_clear_commands_are_confident():
+    intent = matcher.match("go forward 3 seconds slowly")
+    assert intent.action == 'forward'
+    assert intent.seconds == 3
+    assert intent.speed == 40
+    assert matcher.is_confident(intent)
+
+def test_act_confidence_comes_from_the_vocabulary():
+    # A direction with no verb is a 0.6 intent - acted on by default, not with a stricter setting
+    assert actions("maybe left") == ['left']
+    assert IntentMatcher({'act_confidence': 0.7}).actionable("maybe left") == []
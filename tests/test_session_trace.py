@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Session trace tests - run with: python3 -m pytest tests
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from fakes import FrameSource, install_fake_gpio
+from analyze_frame import synthetic_frames
+
+install_fake_gpio()
+from camera import Camera
+from robot import Robot
+from session_trace import (RecordingClient, RecordingProxy, ReplayClock, ReplayHardware, ReplayMotors,
+                           ReplayVoice, TraceReader, TraceRecorder, replay_session)
+
+class StreamingClient:
+    """Ollama client that streams a fixed two-sentence reply"""
+
+    def generate(self, stream=False, **kwargs):
+        tokens = ["Hello", " there.", " Nice", " to", " meet", " you."]
+        if not stream:
+            return {'response': "".join(tokens), 'done': True}
+        return ({'response': token, 'done': i == len(tokens) - 1} for i, token in enumerate(tokens))
+
+def test_records_a_streamed_spoken_turn(tmp_path):
+    recorder = TraceRecorder(str(tmp_path / "trace"))
+    voice = ReplayVoice(None)
+    robot = Robot(lazy=False, parts={
+        'hardware': lambda: ReplayHardware(SimpleNamespace(session={'hardware': "Board: Test"})),
+        'motors': lambda: ReplayMotors(ReplayClock()),
+        'camera': lambda: Camera(capture=FrameSource(synthetic_frames(2, 64, 48)), save=False,
+                                 detect=False, stream=False),
+        'voice': lambda: RecordingProxy(voice, recorder, 'voice', ('speak',)),
+        'ai': lambda: RecordingClient(StreamingClient(), recorder),
+    })
+    robot.response_cache = None
+    robot.memory = None
+    robot.speak_replies = True
+
+    response, speaking = robot._reply_streaming("hi")
+    recorder.close()
+    robot.motors.shutdown()
+
+    assert "glitched" not in response
+    assert speaking
+    assert voice.spoken == ["Hello there.", "Nice to meet you."]
+    trace = TraceReader(recorder.path)
+    spoken = [event['args'][0] for event in trace.of_kind('voice')]
+    assert spoken == voice.spoken
+    exchanges = [request['prompt'] for request, _ in trace.llm_exchanges()]
+    assert any("hi" in prompt for prompt in exchanges)
+
+def test_replay_reruns_a_recorded_turn_without_writing_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    recorder = TraceRecorder(str(tmp_path / "trace"))
+    recorder.event('session', name="LlamaBot", model="tinyllama", mode='sync', hardware="Board: Test",
+                   components={'board': "Test"})
+    recorder.event('input', source='keyboard', text="go forward 2 seconds")
+    recorder.event('llm_request', id=0, prompt="go forward 2 seconds", stream=True, context=False)
+    recorder.event('llm_response', id=0, final={'response': "", 'done': True},
+                   chunks=[[0.01, "Moving"], [0.02, " forward!"]])
+    recorder.event('motor', method='move_forward', args=[2, 80], kwargs={})
+    recorder.close()
+
+    result = replay_session(recorder.path)
+
+    assert result['motor_calls'] == ['move_forward']
+    assert sorted(os.listdir(tmp_path)) == ["trace"]
@@ -3,10 +3,43 @@
 REAL VOICE CONTROL - No simulations!
 Actual speech recognition and text-to-speech
 """
-import speech_recognition as sr
-import pyttsx3
+import itertools
+import json
+import os
+import queue
 import time
 import threading
+import metrics
+from config import load_config, setting
+from recognizers import GoogleRecognizer, make_recognizer, stream_chunks, wav_chunks
+
+try:
+    import speech_recognition as sr
+except ImportError:
+    sr = None
+
+try:
+    import pyttsx3
+except ImportError:
+    pyttsx3 = None
+
+LISTEN_SECONDS = metrics.histogram('voice_listen_seconds', "Voice.listen, start to text")
+RECOGNIZE_SECONDS = metrics.histogram('voice_recognize_seconds', "End of speech to recognised text")
+SPEAK_WAIT_SECONDS = metrics.histogram('voice_speak_wait_seconds', "Voice.speak call to first sound")
+SPEAK_SECONDS = metrics.histogram('voice_speak_seconds', "Time spent saying one utterance")
+UTTERANCES = metrics.counter('voice_utterances', "Utterances by how they ended", labels=('result',))
+
+class Utterance:
+    """One piece of text waiting to be spoken"""
+    
+    def __init__(self, text, on_start=None):
+        self.text = text
+        self.on_start = on_start
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.interrupted = False
+        self.queued_at = time.monotonic()
+        self.started_at = None
 
 class Voice:
     def __init__(self):
@@ -16,35 +49,70 @@ class Voice:
         self.microphone = None
         self.tts_engine = None
         self.voice_available = False
+        self.last_latency = None
+        self.audio_tap = None  # called with (raw audio, sample rate) - used for recording sessions
         
+        # Speech worker - one long-lived thread owns the TTS engine
+        config = load_config()
+        self.speech_rate = setting(config, 'voice.speech_speed', 150)
+        self.speech_volume = setting(config, 'voice.speech_volume', 0.8)
+        self.calibration_file = setting(config, 'voice.calibration_file', ".voice_calibration.json")
+        self.calibration_valid = setting(config, 'voice.calibration_valid_seconds', 600)
+        self.utterances = queue.Queue()
+        self._speaking = {}
+        self._utterance_ids = itertools.count(1)
+        self._interrupt = threading.Event()
+        self._tts_ready = threading.Event()
+        self._tts_error = None
+        self._speech_thread = None
+        
+        self._setup_recognizer()
         self._setup_voice()
     
+    def _setup_recognizer(self):
+        """Pick the speech-to-text engine from config.json (Google if unsure)"""
+        config = load_config()
+        name = setting(config, 'voice.recognizer', "google")
+        
+        try:
+            self.speech_to_text = make_recognizer(
+                name,
+                model_path=setting(config, 'voice.vosk_model', "models/vosk-model-small-en-us-0.15"),
+                sample_rate=setting(config, 'voice.sample_rate', 16000),
+            )
+        except Exception as e:
+            print(f"❌ Can't start {name} speech recognition ({e}) - using Google")
+            self.speech_to_text = GoogleRecognizer()
+        
+        print(f"✅ Speech recognition: {self.speech_to_text.name}")
+    
     def _setup_voice(self):
         """Setup actual microphone and speaker"""
         try:
+            if sr is None or pyttsx3 is None:
+                raise RuntimeError("speech_recognition and pyttsx3 are needed for voice")
+            
             # Initialize speech recognition
             self.recognizer = sr.Recognizer()
             self.recognizer.energy_threshold = 300
             self.recognizer.dynamic_energy_threshold = True
             
-            # Initialize microphone
-            self.microphone = sr.Microphone()
-            
-            # Adjust for ambient noise
-            print("🔇 Calibrating microphone for ambient noise...")
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=2)
-            
-            # Initialize text-to-speech
-            self.tts_engine = pyttsx3.init()
+            # Initialize microphone (streaming recognizers need their own sample rate)
+            if self.speech_to_text.streaming:
+                self.microphone = sr.Microphone(sample_rate=self.speech_to_text.sample_rate)
+            else:
+                self.microphone = sr.Microphone()
             
-            # Configure TTS voice
-            voices = self.tts_engine.getProperty('voices')
-            if voices:
-                self.tts_engine.setProperty('voice', voices[0].id)
+            # Adjust for ambient noise (or reuse a recent calibration)
+            self._calibrate_microphone()
             
-            self.tts_engine.setProperty('rate', 150)  # Speech speed
-            self.tts_engine.setProperty('volume', 0.8)  # Volume level
+            # Start the speech worker, which creates and owns the TTS engine
+            self._speech_thread = threading.Thread(target=self._speech_loop, daemon=True)
+            self._speech_thread.start()
+            if not self._tts_ready.wait(timeout=10):
+                raise RuntimeError("speech engine didn't start within 10 seconds")
+            if self._tts_error:
+                raise self._tts_error
             
             self.voice_available = True
             print("✅ Voice system ready - microphone and speaker working")
@@ -53,12 +121,47 @@ class Voice:
             print(f"❌ Voice setup failed: {e}")
             print("💡 Check microphone and speaker connections")
     
-    def listen(self, timeout=5):
+    def _calibrate_microphone(self):
+        """Measure background noise, unless we did it recently"""
+        sample_rate = getattr(self.microphone, 'SAMPLE_RATE', None)
+        
+        try:
+            with open(self.calibration_file, 'r') as f:
+                saved = json.load(f)
+            age = time.time() - saved['time']
+            if age < self.calibration_valid and saved.get('sample_rate') == sample_rate:
+                self.recognizer.energy_threshold = saved['energy_threshold']
+                print(f"♻️ Reusing microphone calibration from {age:.0f}s ago")
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        print("🔇 Calibrating microphone for ambient noise...")
+        with self.microphone as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=2)
+        
+        try:
+            tmp_path = f"{self.calibration_file}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'time': time.time(),
+                    'sample_rate': sample_rate,
+                    'energy_threshold': self.recognizer.energy_threshold,
+                }, f)
+            os.replace(tmp_path, self.calibration_file)
+        except OSError as e:
+            print(f"⚠️ Could not save microphone calibration: {e}")
+    
+    @metrics.timed(LISTEN_SECONDS)
+    def listen(self, timeout=5, on_partial=None):
         """Listen for REAL voice commands"""
         if not self.voice_available:
             print("❌ Voice system not available")
             return None
         
+        if self.speech_to_text.streaming:
+            return self._listen_streaming(timeout, on_partial)
+        
         try:
             print(f"🎤 Listening for {timeout} seconds... SPEAK NOW")
             
@@ -66,10 +169,16 @@ class Voice:
                 # Listen for audio with timeout
                 audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=10)
             
+            if self.audio_tap:
+                self.audio_tap(audio.get_raw_data(), audio.sample_rate)
+            
             print("👂 Processing speech...")
             
             # Recognize speech using Google
-            text = self.recognizer.recognize_google(audio)
+            started = time.monotonic()
+            text = self.speech_to_text.transcribe(self.recognizer, audio)
+            self.last_latency = time.monotonic() - started
+            RECOGNIZE_SECONDS.observe(self.last_latency)
             print(f"💬 Heard: '{text}'")
             return text
             
@@ -86,8 +195,127 @@ class Voice:
             print(f"❌ Voice listening error: {e}")
             return None
     
-    def speak(self, text):
-        """Speak text out loud - REAL speech"""
+    def _listen_streaming(self, timeout, on_partial=None, phrase_time_limit=10):
+        """Decode microphone audio while it is still being spoken"""
+        try:
+            print(f"🎤 Listening for {timeout} seconds... SPEAK NOW")
+            
+            with self.microphone as source:
+                def _mic_chunks():
+                    stop_at = time.monotonic() + timeout + phrase_time_limit
+                    while time.monotonic() < stop_at:
+                        chunk = source.stream.read(source.CHUNK)
+                        if self.audio_tap:
+                            self.audio_tap(chunk, source.SAMPLE_RATE)
+                        yield chunk
+                
+                text, self.last_latency = stream_chunks(
+                    self.speech_to_text, _mic_chunks(), on_partial, timeout=timeout
+                )
+            
+            if not text:
+                print("⏰ No speech detected within timeout")
+                return None
+            
+            RECOGNIZE_SECONDS.observe(self.last_latency)
+            print(f"💬 Heard: '{text}' ({self.last_latency:.2f}s after you stopped)")
+            return text
+            
+        except Exception as e:
+            print(f"❌ Voice listening error: {e}")
+            return None
+    
+    def transcribe_wav(self, path, on_partial=None, realtime=False):
+        """Recognize speech from a WAV file instead of the microphone (for testing)"""
+        if self.speech_to_text.streaming:
+            chunks = wav_chunks(path, self.speech_to_text.sample_rate, realtime=realtime)
+            text, self.last_latency = stream_chunks(self.speech_to_text, chunks, on_partial)
+            return text or None
+        
+        if sr is None:
+            raise RuntimeError("speech_recognition is needed to read WAV files for Google")
+        
+        recognizer = sr.Recognizer()
+        with sr.AudioFile(path) as source:
+            audio = recognizer.record(source)
+        
+        started = time.monotonic()
+        text = self.speech_to_text.transcribe(recognizer, audio)
+        self.last_latency = time.monotonic() - started
+        return text
+    
+    def _start_engine(self):
+        """Create and configure the TTS engine (speech thread only)"""
+        engine = pyttsx3.init()
+        
+        # Configure TTS voice
+        voices = engine.getProperty('voices')
+        if voices:
+            engine.setProperty('voice', voices[0].id)
+        
+        engine.setProperty('rate', self.speech_rate)  # Speech speed
+        engine.setProperty('volume', self.speech_volume)  # Volume level
+        
+        engine.connect('started-utterance', self._on_utterance_started)
+        engine.connect('finished-utterance', self._on_utterance_finished)
+        return engine
+    
+    def _on_utterance_started(self, name):
+        utterance = self._speaking.get(name)
+        if utterance and not utterance.started.is_set():
+            utterance.started_at = time.monotonic()
+            SPEAK_WAIT_SECONDS.observe(utterance.started_at - utterance.queued_at)
+            utterance.started.set()
+            if utterance.on_start:
+                utterance.on_start()
+    
+    def _on_utterance_finished(self, name, completed=True):
+        utterance = self._speaking.pop(name, None)
+        if utterance:
+            utterance.interrupted = not completed
+            if utterance.started_at is not None:
+                SPEAK_SECONDS.observe(time.monotonic() - utterance.started_at)
+            UTTERANCES.labels('completed' if completed else 'interrupted').inc()
+            utterance.done.set()
+    
+    def _speech_loop(self):
+        """Speech thread - feeds queued sentences to the engine's own loop"""
+        try:
+            self.tts_engine = self._start_engine()
+            self.tts_engine.startLoop(False)
+        except Exception as e:
+            self._tts_error = e
+            self._tts_ready.set()
+            return
+        
+        self._tts_ready.set()
+        
+        while True:
+            if self._interrupt.is_set():
+                self._interrupt.clear()
+                self.tts_engine.stop()
+                for utterance in self._speaking.values():
+                    utterance.interrupted = True
+                    utterance.done.set()
+                self._speaking.clear()
+            
+            # Hand every waiting sentence to the engine so there's no gap between them
+            try:
+                wait = 0.01 if self._speaking else 0.1
+                utterance = self.utterances.get(timeout=wait)
+                while utterance is not None:
+                    name = f"utterance-{next(self._utterance_ids)}"
+                    self._speaking[name] = utterance
+                    self.tts_engine.say(utterance.text, name)
+                    utterance = self.utterances.get_nowait()
+            except queue.Empty:
+                pass
+            
+            if self._speaking:
+                self.tts_engine.iterate()
+    
+    def speak(self, text, wait=False, on_start=None):
+        """Speak text out loud - REAL speech (returns right away unless wait=True)"""
         if not self.voice_available:
             print(f"🗣️ (Voice disabled): {text}")
             return False
@@ -95,22 +323,46 @@ class Voice:
         try:
             print(f"🗣️ Speaking: '{text}'")
             
-            # Speak in a separate thread to not block
-            def _speak():
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
+            utterance = Utterance(text, on_start)
+            self.utterances.put(utterance)
             
-            speak_thread = threading.Thread(target=_speak)
-            speak_thread.start()
-            
-            # Wait for speech to complete
-            speak_thread.join(timeout=10)
-            return True
+            # Never hang on a stuck engine - 10 seconds, plus time for long sentences (~15 chars/s)
+            if wait and not utterance.done.wait(timeout=10 + len(text) / 15):
+                print("⚠️ Speech is taking too long - not waiting for it")
+            return utterance
             
         except Exception as e:
             print(f"❌ Speech error: {e}")
             return False
     
+    def interrupt(self):
+        """Cut off whatever is being said and forget anything still waiting"""
+        if not self.voice_available:
+            return
+        
+        while True:
+            try:
+                utterance = self.utterances.get_nowait()
+            except queue.Empty:
+                break
+            utterance.interrupted = True
+            utterance.done.set()
+        
+        self._interrupt.set()
+    
+    def is_speaking(self):
+        """True while anything is being said or waiting to be said"""
+        return bool(self._speaking) or not self.utterances.empty()
+    
+    def wait_until_done(self, timeout=None):
+        """Block until everything queued has been said"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while self.is_speaking():
+            if deadline and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+    
     def continuous_listen(self, callback, listen_timeout=5):
         """Continuously listen for commands"""
         if not self.voice_available:
@@ -161,8 +413,7 @@ class Voice:
             
             # Test text-to-speech
             print("Testing speaker... you should hear speech.")
-            self.speak("Hello! My voice is working perfectly.")
-            time.sleep(2)
+            self.speak("Hello! My voice is working perfectly.", wait=True)
             
             print("✅ Speaker working!")
             return True
@@ -189,7 +440,7 @@ if __name__ == "__main__":
             
             def repeat_command(cmd):
                 print(f"🤖 Repeating: {cmd}")
-                voice.speak(f"You said: {cmd}")
+                voice.speak(f"You said: {cmd}", wait=True)
             
             start_time = time.time()
             while time.time() - start_time < 20: